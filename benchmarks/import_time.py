@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+"""
+Measures the import time of PyOpenVidu in fresh interpreters, and compares it to the budgets in import_budget.json.
+The budgets are kept in the repository, so changes of the import time show up in its history.
+Use `python -X importtime -c "import pyopenvidu"` to see which modules take the time.
+
+Usage: python benchmarks/import_time.py [--runs 10] [--check]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+
+
+def import_time(statement: str) -> float:
+    """
+    :param statement: The Python statement to measure, e.g. "import pyopenvidu".
+    :return: The time the statement takes in a fresh interpreter, in seconds.
+    """
+    code = f"from time import perf_counter\nstart = perf_counter()\n{statement}\nprint(perf_counter() - start)"
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help="Number of fresh interpreters started per statement")
+    parser.add_argument('--check', action='store_true', help="Exit with an error if a budget is exceeded")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budgets = json.load(f)
+
+    exceeded = False
+    print(f"{'statement':<40}{'median (ms)':>14}{'budget (ms)':>14}")
+    for statement, budget in budgets.items():
+        median = statistics.median(import_time(statement) for _ in range(args.runs))
+        exceeded |= median > budget
+        print(f"{statement:<40}{median * 1e3:>14.1f}{budget * 1e3:>14.1f}{'  EXCEEDED' if median > budget else ''}")
+
+    if args.check and exceeded:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
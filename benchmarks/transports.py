@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Compares the per call overhead of the transports, by issuing tokens from a FakeOpenViduServer running in-process.
+
+Usage: python benchmarks/transports.py [--calls 2000] [--transports requests urllib3 async] [--unix-socket]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+from time import perf_counter
+
+from pyopenvidu import OpenVidu
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from pyopenvidu.transport import TRANSPORTS
+
+SECRET = 'MY_SECRET'
+
+
+def measure(url: str, transport: str, calls: int) -> list:
+    openvidu = OpenVidu(url, SECRET, initial_fetch=False, transport=transport)
+    session = openvidu.create_session()
+
+    for _ in range(min(calls // 10, 100)):  # Warm up the connection pool
+        session.create_webrtc_connection()
+
+    durations = []
+    for _ in range(calls):
+        start = perf_counter()
+        session.create_webrtc_connection()
+        durations.append(perf_counter() - start)
+
+    session.close()
+    openvidu.close()
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=2000, help="Number of tokens issued with each transport")
+    parser.add_argument('--transports', nargs='+', default=list(TRANSPORTS), choices=list(TRANSPORTS))
+    parser.add_argument('--unix-socket', action='store_true', help="Serve on a Unix domain socket instead of TCP")
+    args = parser.parse_args()
+
+    unix_socket = os.path.join(tempfile.mkdtemp(), 'openvidu.sock') if args.unix_socket else None
+
+    with FakeOpenViduServer(SECRET, unix_socket=unix_socket) as server:
+        print(f"{'transport':<12}{'mean (us)':>12}{'median (us)':>14}{'p99 (us)':>12}")
+
+        for transport in args.transports:
+            try:
+                durations = measure(server.url, transport, args.calls)
+            except RuntimeError as e:  # Missing optional dependency
+                print(f"{transport:<12}skipped: {e}")
+                continue
+
+            durations.sort()
+            print(f"{transport:<12}{statistics.mean(durations) * 1e6:>12.1f}"
+                  f"{statistics.median(durations) * 1e6:>14.1f}"
+                  f"{durations[int(len(durations) * 0.99)] * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
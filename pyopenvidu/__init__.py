@@ -4,7 +4,43 @@ __author__ = """Marcell Pünkösd"""
 __email__ = 'punkosdmarcell@rocketmail.com'
 __version__ = '0.2.1'
 
-from .openvidu import OpenVidu
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-from .exceptions import OpenViduError, OpenViduSessionError, OpenViduSessionDoesNotExistsError, OpenViduConnectionError, \
-    OpenViduConnectionDoesNotExistsError, OpenViduStreamError, OpenViduStreamDoesNotExistsError, OpenViduSessionExistsError
+# The classes are imported when first accessed (PEP 562), so importing the package does not load requests
+_LAZY_ATTRIBUTES = {
+    'OpenVidu': '.openvidu',
+    'OpenViduCluster': '.openviducluster',
+    **{name: '.exceptions' for name in (
+        'OpenViduError', 'OpenViduSessionError', 'OpenViduSessionDoesNotExistsError', 'OpenViduConnectionError',
+        'OpenViduConnectionDoesNotExistsError', 'OpenViduStreamError', 'OpenViduStreamDoesNotExistsError',
+        'OpenViduSessionExistsError', 'OpenViduRecordingError', 'OpenViduRecordingDoesNotExistsError',
+        'OpenViduRecordingStatusError', 'OpenViduDeadlineExceededError', 'OpenViduReplayError',
+    )},
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+if TYPE_CHECKING:
+    from .openvidu import OpenVidu
+    from .openviducluster import OpenViduCluster
+
+    from .exceptions import OpenViduError, OpenViduSessionError, OpenViduSessionDoesNotExistsError, \
+        OpenViduConnectionError, OpenViduConnectionDoesNotExistsError, OpenViduStreamError, \
+        OpenViduStreamDoesNotExistsError, OpenViduSessionExistsError, OpenViduRecordingError, \
+        OpenViduRecordingDoesNotExistsError, OpenViduRecordingStatusError, OpenViduDeadlineExceededError, \
+        OpenViduReplayError
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # Later accesses don't reach __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,319 @@
+"""Columnar export of the cached sessions and connections for analytics."""
+from array import array
+from collections import Counter
+from datetime import timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import numpy
+except ImportError:  # Optional dependency, plain arrays are used without it
+    numpy = None
+
+from .openvidu import OpenVidu
+from .openvidusession import OpenViduSession
+
+
+class _ColumnTable(object):
+    """
+    Base class of the tables. Subclasses define their columns and add the rows in `_add_rows()`.
+    """
+
+    # Columns holding strings are dictionary encoded: the column stores indexes of the values in the categories
+    CATEGORICAL_COLUMNS: Tuple[str, ...] = ()
+    NUMERIC_COLUMNS: Dict[str, str] = {}  # name:array typecode
+
+    def __init__(self, sessions: Iterable[OpenViduSession]):
+        """
+        :param sessions: The sessions to export. Use `from_openvidu()` to export the cached sessions of a server.
+        """
+        self._codes = {name: array('l') for name in self.CATEGORICAL_COLUMNS}
+        self._encoding = {name: {} for name in self.CATEGORICAL_COLUMNS}  # name:{value:code}, dicts keep the order
+        self._numeric = {name: array(typecode) for name, typecode in self.NUMERIC_COLUMNS.items()}
+
+        self._add_rows(sessions)
+
+        self._categories = {name: list(values) for name, values in self._encoding.items()}
+        self._columns = {**self._codes, **self._numeric}
+        del self._codes, self._encoding, self._numeric
+
+        if numpy is not None:
+            self._columns = {name: numpy.frombuffer(column, dtype=column.typecode) if len(column) else
+                             numpy.array([], dtype=column.typecode) for name, column in self._columns.items()}
+
+    def _add_rows(self, sessions: Iterable[OpenViduSession]):
+        raise NotImplementedError()
+
+    def _category(self, name: str, value: Optional[str]) -> int:
+        return self._encoding[name].setdefault(value, len(self._encoding[name]))
+
+    def _append(self, **values):
+        for name, value in values.items():
+            if name in self._codes:
+                self._codes[name].append(self._category(name, value))
+            else:
+                self._numeric[name].append(value)
+
+    @classmethod
+    def from_openvidu(cls, openvidu: OpenVidu):
+        """
+        Export the cached sessions of an OpenVidu object. No requests are made, call `fetch()` before if needed.
+
+        :param openvidu: The OpenVidu object.
+        :return: A new table.
+        """
+        return cls(openvidu.sessions)
+
+    def __len__(self) -> int:
+        return len(next(iter(self._columns.values())))
+
+    @property
+    def column_names(self) -> List[str]:
+        """
+        :return: The names of the columns.
+        """
+        return list(self._columns)
+
+    def column(self, name: str) -> Union['numpy.ndarray', array]:
+        """
+        Get a column of the table. The returned array must not be modified.
+
+        :param name: The name of the column.
+        :return: The values of the column, codes of the categories for string columns.
+        """
+        return self._columns[name]
+
+    def categories(self, name: str) -> List[Optional[str]]:
+        """
+        Get the strings the codes of a string column refer to.
+
+        :param name: The name of a string column.
+        :return: The strings, indexed by their code.
+        """
+        return list(self._categories[name])
+
+    def to_structured_array(self) -> 'numpy.ndarray':
+        """
+        Get the table as a NumPy structured array with the strings decoded. Requires NumPy.
+
+        :return: A structured array with one record per row.
+        """
+        if numpy is None:
+            raise RuntimeError("NumPy is required for structured arrays")
+
+        columns = {}
+        for name, column in self._columns.items():
+            if name in self._categories:
+                columns[name] = numpy.array([str(value or '') for value in self._categories[name]])[column] \
+                    if len(column) else numpy.array([], dtype=str)
+            else:
+                columns[name] = column
+
+        records = numpy.empty(len(self), dtype=[(name, column.dtype) for name, column in columns.items()])
+        for name, column in columns.items():
+            records[name] = column
+
+        return records
+
+    def _count(self, name: str) -> Dict[Optional[str], int]:
+        if numpy is not None:
+            counts = numpy.bincount(self._columns[name], minlength=len(self._categories[name]))
+        else:
+            counter = Counter(self._columns[name])
+            counts = [counter[code] for code in range(len(self._categories[name]))]
+
+        return {value: int(count) for value, count in zip(self._categories[name], counts) if count}
+
+
+class ConnectionTable(_ColumnTable):
+    """
+    The connections of the cached sessions as columns, one row per connection.
+
+    The columns are NumPy arrays if NumPy is installed, `array.array` objects otherwise. String columns are
+    dictionary encoded: they hold integer codes, and `categories(name)` returns the strings the codes refer to.
+    Sessions without connections are not rows of the table, but are listed in `session_ids`.
+    """
+
+    CATEGORICAL_COLUMNS = ('session_id', 'type', 'platform', 'role')
+    NUMERIC_COLUMNS = {
+        'created_at': 'd',  # UNIX timestamp
+        'publishers': 'l',
+        'subscribers': 'l',
+        'max_send_kbps': 'd',  # videoMaxSendBandwidth of the kurento options, 0 when not set or for IPCAM connections
+        'max_recv_kbps': 'd',  # videoMaxRecvBandwidth of the kurento options, 0 when not set or for IPCAM connections
+    }
+
+    def _add_rows(self, sessions: Iterable[OpenViduSession]):
+        for session in sessions:
+            self._category('session_id', session.id)
+
+            for connection in session.connections:
+                kurento_options = getattr(connection, 'kurento_options', None) or {}  # Only WEBRTC connections have
+
+                self._append(
+                    session_id=session.id,
+                    type=connection.type,
+                    platform=connection.platform,
+                    role=getattr(connection, 'role', None),
+                    created_at=connection.created_at.replace(tzinfo=timezone.utc).timestamp(),  # Naive UTC
+                    publishers=len(connection.publishers),
+                    subscribers=len(connection.subscribers),
+                    max_send_kbps=kurento_options.get('videoMaxSendBandwidth') or 0,
+                    max_recv_kbps=kurento_options.get('videoMaxRecvBandwidth') or 0
+                )
+
+    @property
+    def session_ids(self) -> List[str]:
+        """
+        :return: The ids of the exported sessions, the categories of the `session_id` column.
+        """
+        return list(self._categories['session_id'])
+
+    def _sum_by_session(self, name: str) -> Dict[str, float]:
+        session_codes = self._columns['session_id']
+        session_ids = self._categories['session_id']
+
+        if numpy is not None:
+            sums = numpy.bincount(session_codes, weights=self._columns[name], minlength=len(session_ids))
+        else:
+            sums = [0.0] * len(session_ids)
+            for code, value in zip(session_codes, self._columns[name]):
+                sums[code] += value
+
+        return {session_id: float(value) for session_id, value in zip(session_ids, sums)}
+
+    def platform_breakdown(self) -> Dict[str, int]:
+        """
+        :return: The number of connections by platform.
+        """
+        return self._count('platform')
+
+    def type_breakdown(self) -> Dict[str, int]:
+        """
+        :return: The number of connections by type (WEBRTC or IPCAM).
+        """
+        return self._count('type')
+
+    def role_distribution(self) -> Dict[Optional[str], int]:
+        """
+        :return: The number of connections by role. IPCAM connections are counted with the role None.
+        """
+        return self._count('role')
+
+    def connections_per_session(self) -> Dict[str, int]:
+        """
+        :return: The number of connections of every exported session.
+        """
+        counts = self._count('session_id')
+        return {session_id: counts.get(session_id, 0) for session_id in self._categories['session_id']}
+
+    def max_send_bandwidth_per_session(self) -> Dict[str, float]:
+        """
+        :return: The sum of the requested maximum send bandwidths (kbps) of the connections of every exported session.
+        """
+        return self._sum_by_session('max_send_kbps')
+
+    def max_recv_bandwidth_per_session(self) -> Dict[str, float]:
+        """
+        :return: The sum of the requested maximum receive bandwidths (kbps) of the connections of every session.
+        """
+        return self._sum_by_session('max_recv_kbps')
+
+
+class StreamStatsTable(_ColumnTable):
+    """
+    The WebRTC statistics of every publisher and subscriber of the cached sessions as columns, one row per stream.
+
+    The statistics are sent by the server only if the OpenVidu object was created with `webrtc_stats=True`.
+    Numeric values are read from the `webrtc_stats` of the streams by the names in `STATS_FIELDS` (the names of the
+    WebRTC statistics API), and are NaN when missing. OpenVidu 2.16 reports the ICE candidates only, so only the
+    `connected` column is filled by it: 1 if a candidate pair is selected, 0 if not, -1 if there are no statistics.
+    """
+
+    CATEGORICAL_COLUMNS = ('session_id', 'connection_id', 'stream_id', 'kind')  # kind: publisher or subscriber
+    NUMERIC_COLUMNS = {
+        'fraction_lost': 'd',
+        'jitter': 'd',  # seconds
+        'rtt': 'd',  # seconds
+        'bitrate_kbps': 'd',
+        'connected': 'b',
+    }
+    STATS_FIELDS = {  # column:key in the webrtc_stats of the streams
+        'fraction_lost': 'fractionLost',
+        'jitter': 'jitter',
+        'rtt': 'roundTripTime',
+        'bitrate_kbps': 'bitrate',
+    }
+
+    def _add_rows(self, sessions: Iterable[OpenViduSession]):
+        for session in sessions:
+            for connection in session.connections:
+                streams = [('publisher', stream) for stream in connection.publishers] + \
+                          [('subscriber', stream) for stream in connection.subscribers]
+
+                for kind, stream in streams:
+                    stats = stream.webrtc_stats or {}
+                    values = {}
+
+                    for column, key in self.STATS_FIELDS.items():
+                        value = stats.get(key)
+                        values[column] = float(value) if isinstance(value, (int, float)) else float('nan')
+
+                    if not stats:
+                        connected = -1
+                    else:
+                        connected = int(bool(stats.get('localCandidate') and stats.get('remoteCandidate')))
+
+                    self._append(session_id=session.id, connection_id=connection.id, stream_id=stream.stream_id,
+                                 kind=kind, connected=connected, **values)
+
+    def degraded_mask(self, max_fraction_lost: float = 0.05, max_jitter: float = 0.03, max_rtt: float = 0.5,
+                      min_bitrate_kbps: Optional[float] = None,
+                      disconnected: bool = True) -> Union['numpy.ndarray', List[bool]]:
+        """
+        Flag the degraded streams in one pass over the columns. Missing statistics never flag a stream.
+
+        :param max_fraction_lost: Streams losing a greater fraction of their packets are degraded.
+        :param max_jitter: Streams with greater jitter (seconds) are degraded.
+        :param max_rtt: Streams with greater round trip time (seconds) are degraded.
+        :param min_bitrate_kbps: Streams with a lower bitrate are degraded. Default: None = Not checked.
+        :param disconnected: Streams without a selected ICE candidate pair are degraded.
+        :return: A boolean array (a list without NumPy), true for the degraded streams.
+        """
+        limits = [('fraction_lost', max_fraction_lost, False), ('jitter', max_jitter, False), ('rtt', max_rtt, False),
+                  ('bitrate_kbps', min_bitrate_kbps, True)]
+
+        if numpy is not None:
+            mask = numpy.zeros(len(self), dtype=bool)
+            for name, limit, is_minimum in limits:
+                if limit is not None:
+                    mask |= self._columns[name] < limit if is_minimum else self._columns[name] > limit
+
+            if disconnected:
+                mask |= self._columns['connected'] == 0
+
+            return mask
+
+        mask = [False] * len(self)
+        for name, limit, is_minimum in limits:
+            if limit is not None:
+                for i, value in enumerate(self._columns[name]):
+                    if value < limit if is_minimum else value > limit:  # Comparisons with NaN are always false
+                        mask[i] = True
+
+        if disconnected:
+            for i, connected in enumerate(self._columns['connected']):
+                if connected == 0:
+                    mask[i] = True
+
+        return mask
+
+    def degraded_streams(self, **limits) -> List[Tuple[str, str, str, str]]:
+        """
+        List the degraded streams. Accepts the same arguments as `degraded_mask()`.
+
+        :return: A list of (session id, connection id, stream id, kind) tuples.
+        """
+        names = ('session_id', 'connection_id', 'stream_id', 'kind')
+
+        return [tuple(self._categories[name][self._columns[name][i]] for name in names)
+                for i, degraded in enumerate(self.degraded_mask(**limits)) if degraded]
@@ -0,0 +1,185 @@
+"""Caching utilities."""
+from collections import OrderedDict
+from threading import Thread, Lock
+from time import monotonic
+from typing import Callable, Any, Hashable, Optional
+
+from .singleflight import SingleFlight
+
+
+class CachedValue(object):
+    """
+    Caches the return value of a loader function for a given time.
+
+    Concurrent callers share a single in-flight load. After the value expires, it is still served for `stale_ttl`
+    seconds while a background thread refreshes it (stale-while-revalidate).
+    """
+
+    def __init__(self, loader: Callable[[], Any], ttl: float, stale_ttl: float = 0.0):
+        """
+        :param loader: Function returning the value to be cached.
+        :param ttl: Seconds the value is considered fresh for.
+        :param stale_ttl: Seconds the value is served for after it expired, while it is being refreshed.
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._loader = loader
+        self._flight = SingleFlight()
+        self._lock = Lock()
+        self._entry = None  # (value, time of loading)
+        self._generation = 0  # Incremented by invalidate(), so loads started before it are not stored
+        self._refreshing = False
+
+    def _load(self) -> Any:
+        generation = self._generation
+        value = self._loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entry = (value, monotonic())
+
+        return value
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+
+            self._refreshing = True
+
+        def refresh():
+            try:
+                self._flight.do(None, self._load)
+            except Exception:
+                pass  # The stale value is kept, the next caller after it's gone will see the error
+            finally:
+                self._refreshing = False
+
+        Thread(target=refresh, name='CachedValueRefresh', daemon=True).start()
+
+    def get(self) -> Any:
+        """
+        Get the cached value, loading it if needed.
+
+        :return: The value returned by the loader.
+        """
+        entry = self._entry
+
+        if entry:
+            age = monotonic() - entry[1]
+
+            if age < self.ttl:
+                return entry[0]
+
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background()
+                return entry[0]
+
+        return self._flight.do(None, self._load)
+
+    def invalidate(self):
+        """
+        Drop the cached value. The next `get()` call will load it again.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entry = None
+
+
+class NegativeCache(object):
+    """
+    A bounded set of keys known to be missing on the server, each remembered for a limited time.
+    Used to answer requests for recently closed sessions and connections without a network call.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        """
+        :param ttl: Seconds a key is remembered for. Zero disables the cache.
+        :param maxsize: Maximum number of keys remembered. The oldest keys are dropped first.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = Lock()
+        self._entries = OrderedDict()  # key:expiry, in the order of insertion
+
+    def add(self, key: Hashable):
+        """
+        Remember a key as missing.
+
+        :param key: The key to remember.
+        """
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            now = monotonic()
+            self._entries.pop(key, None)
+            self._entries[key] = now + self.ttl
+
+            # The keys are in the order of their expiry, as every key is remembered for the same time
+            while self._entries and next(iter(self._entries.values())) <= now:
+                self._entries.popitem(last=False)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable):
+        """
+        Forget a key, because it exists again.
+
+        :param key: The key to forget.
+        """
+        if not self._entries:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _remembered(self, key: Hashable) -> bool:
+        expiry = self._entries.get(key)
+        return expiry is not None and expiry > monotonic()
+
+    def lookup(self, *keys: Hashable) -> Optional[Hashable]:
+        """
+        Check whether any of the keys is remembered as missing. Counted as a single hit or miss in the statistics.
+
+        :param keys: The keys to check, in order.
+        :return: The first remembered key, or None.
+        """
+        with self._lock:
+            for key in keys:
+                if self._remembered(key):
+                    self.hits += 1
+                    return key
+
+            self.misses += 1
+            return None
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:  # Does not count in the statistics, use lookup() for that
+            return self._remembered(key)
+
+    def __len__(self) -> int:
+        now = monotonic()
+        with self._lock:
+            return sum(expiry > now for expiry in self._entries.values())  # Expired keys are dropped by add()
+
+    def clear(self):
+        """
+        Forget every key and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        :return: The number of hits, misses and the number of keys remembered.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
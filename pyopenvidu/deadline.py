@@ -0,0 +1,104 @@
+"""Deadlines spanning multiple requests."""
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from time import monotonic
+from typing import Callable, Iterator, Optional, Union
+
+from .exceptions import OpenViduDeadlineExceededError
+
+_deadline: ContextVar[Optional[float]] = ContextVar('pyopenvidu_deadline', default=None)  # monotonic() time
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Limits the total time of every request made inside the block.
+
+    The timeout of each request is shrunk to the time remaining until the deadline, and requests started after it
+    fail with `OpenViduDeadlineExceededError`. Nested deadlines can only shorten the outer one.
+    The deadline follows the code into the worker threads started by this library.
+
+    Example::
+
+        with deadline(2.0):
+            session.fetch()
+            session.create_webrtc_connection()
+
+    :param seconds: The time available for the block.
+    """
+    end = monotonic() + seconds
+
+    outer = _deadline.get()
+    if outer is not None:
+        end = min(end, outer)
+
+    token = _deadline.set(end)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Get the time remaining until the deadline of the current context.
+
+    :return: The remaining seconds, negative if the deadline has passed, or None if there is no deadline.
+    """
+    end = _deadline.get()
+    if end is None:
+        return None
+
+    return end - monotonic()
+
+
+def check_deadline():
+    """
+    Raises `OpenViduDeadlineExceededError` if the deadline of the current context has passed.
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise OpenViduDeadlineExceededError()
+
+
+def _limit(timeout: Optional[float], left: float) -> float:
+    return left if timeout is None else min(timeout, left)
+
+
+def deadline_timeout(timeout: Union[float, tuple, None]) -> Union[float, tuple, None]:
+    """
+    Shrink a requests style timeout to the time remaining until the deadline of the current context.
+
+    :param timeout: A timeout in seconds, a (connect, read) tuple or None.
+    :return: The timeout to use for the request.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+
+    if left <= 0:
+        raise OpenViduDeadlineExceededError()
+
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return _limit(connect, left), _limit(read, left)
+
+    return _limit(timeout, left)
+
+
+def in_context(fn: Callable) -> Callable:
+    """
+    Binds a function to a copy of the current context, so the deadline is kept when it's run by a worker thread.
+    A context can't be entered by multiple threads at once, so bind the function separately for every thread.
+
+    :param fn: The function to bind.
+    :return: The bound function.
+    """
+    context = copy_context()
+
+    @wraps(fn)
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+
+    return run
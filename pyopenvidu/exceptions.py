@@ -37,3 +37,29 @@ class OpenViduStreamError(OpenViduConnectionError):
 
 class OpenViduStreamDoesNotExistsError(OpenViduStreamError):
     pass
+
+
+# Recording errors
+
+class OpenViduRecordingError(OpenViduError):
+    pass
+
+
+class OpenViduRecordingDoesNotExistsError(OpenViduRecordingError):
+    pass
+
+
+class OpenViduRecordingStatusError(OpenViduRecordingError):
+    pass
+
+
+# Deadline errors
+
+class OpenViduDeadlineExceededError(OpenViduError):
+    pass
+
+
+# Replay errors
+
+class OpenViduReplayError(OpenViduError):  # No recorded response matches the request
+    pass
@@ -0,0 +1,507 @@
+"""FakeOpenViduServer class."""
+import json
+import os
+import random
+import re
+import ssl
+import string
+import threading
+import time
+from base64 import b64encode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from typing import Callable, Optional, Tuple
+from urllib.parse import quote, urlparse
+
+API_PREFIX = '/openvidu/api/'
+
+DEFAULT_CONFIG = {
+    "VERSION": "2.16.0",
+    "DOMAIN_OR_PUBLIC_IP": "localhost",
+    "HTTPS_PORT": 4443,
+    "OPENVIDU_PUBLICURL": "https://localhost:4443",
+    "OPENVIDU_CDR": False,
+    "OPENVIDU_STREAMS_VIDEO_MAX_RECV_BANDWIDTH": 1000,
+    "OPENVIDU_STREAMS_VIDEO_MIN_RECV_BANDWIDTH": 300,
+    "OPENVIDU_STREAMS_VIDEO_MAX_SEND_BANDWIDTH": 1000,
+    "OPENVIDU_STREAMS_VIDEO_MIN_SEND_BANDWIDTH": 300,
+    "OPENVIDU_SESSIONS_GARBAGE_INTERVAL": 900,
+    "OPENVIDU_SESSIONS_GARBAGE_THRESHOLD": 3600,
+    "OPENVIDU_RECORDING": False,
+    "OPENVIDU_WEBHOOK": False
+}
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _random_id(prefix: str, length: int = 10) -> str:
+    return prefix + ''.join(random.choice(string.ascii_letters + string.digits) for _ in range(length))
+
+
+class _FakeOpenViduRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, just like the real thing
+    disable_nagle_algorithm = True  # Headers and body are sent separately, don't wait for delayed ACKs between them
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass  # Keep the output of the load tests clean
+
+    def _read_json(self) -> Optional[dict]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+
+    def _respond(self, status: int, payload: bytes = b''):
+        self.send_response(status)
+        if payload:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str):
+        server: FakeOpenViduServer = self.server.fake_openvidu
+        with server._lock:
+            server.request_count += 1
+
+        body = self._read_json() if method in ['POST', 'PUT'] else {}
+
+        server._simulate_latency()
+
+        if self.headers.get('Authorization') != server._expected_authorization:
+            self._respond(401)
+            return
+
+        error_status = server._pick_injected_error()
+        if error_status:
+            self._respond(error_status)
+            return
+
+        path = urlparse(self.path).path
+        if not path.startswith(API_PREFIX):
+            self._respond(404)
+            return
+
+        if body is None:
+            self._respond(400)
+            return
+
+        if method == 'POST' and body.get('type') == 'IPCAM' and server.ipcam_probe_time is not None:
+            time.sleep(server.ipcam_probe_time(body.get('rtspUri', '')))  # The media server connects to the camera
+
+        status, payload = server._dispatch(method, path[len(API_PREFIX):].strip('/'), body)
+        self._respond(status, payload)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_DELETE(self):
+        self._handle('DELETE')
+
+
+class _UnixFakeOpenViduRequestHandler(_FakeOpenViduRequestHandler):
+    disable_nagle_algorithm = False  # Not a TCP socket
+
+
+class _ThreadingUnixHTTPServer(ThreadingUnixStreamServer):
+    def server_bind(self):
+        super().server_bind()
+        self.server_name, self.server_port = 'localhost', 0  # Used by BaseHTTPRequestHandler
+
+
+class FakeOpenViduServer(object):
+    """
+    An in-memory stand-in for OpenVidu Server, useful for load and latency testing without a real media server.
+
+    Implements the REST endpoints used by PyOpenVidu with the same status codes the real server uses,
+    so every exception mapping of the library can be exercised. Latency, jitter and random errors can be injected.
+    """
+
+    def __init__(self, secret: str = 'MY_SECRET', host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 500, config: dict = None,
+                 seed: int = None, ssl_context: Optional[ssl.SSLContext] = None, unix_socket: Optional[str] = None,
+                 ipcam_probe_time: Optional[Callable[[str], float]] = None):
+        """
+        :param secret: The secret clients must authenticate with.
+        :param host: Address to listen on.
+        :param port: Port to listen on. Default: 0 = Pick a free port.
+        :param latency: Delay added to every response in seconds.
+        :param jitter: Random delay in seconds added to or subtracted from `latency` uniformly.
+        :param error_rate: Probability (0.0 - 1.0) of answering a request with `error_status` instead of serving it.
+        :param error_status: HTTP status code used for the injected errors.
+        :param config: Overrides for the values returned by the `config` endpoint.
+        :param seed: Seed of the random generator used for jitter and error injection.
+        :param ssl_context: Server side SSLContext to serve HTTPS with. Default: None = Serve plain HTTP.
+        :param unix_socket: Path of a Unix domain socket to listen on, instead of `host` and `port`.
+        :param ipcam_probe_time: Called with the RTSP URI of every new IPCAM connection, returns the seconds the media
+            server takes to connect to the camera. Useful to simulate slow or unreachable cameras.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.ipcam_probe_time = ipcam_probe_time
+        self.config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.request_count = 0
+
+        self._expected_authorization = 'Basic ' + b64encode(f'OPENVIDUAPP:{secret}'.encode()).decode()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions = {}  # id:dict in the same format the REST API returns
+
+        self._unix_socket = unix_socket
+        if unix_socket is not None:
+            self._httpd = _ThreadingUnixHTTPServer(unix_socket, _UnixFakeOpenViduRequestHandler)
+        else:
+            self._httpd = ThreadingHTTPServer((host, port), _FakeOpenViduRequestHandler)
+
+        self._httpd.daemon_threads = True
+        self._httpd.fake_openvidu = self
+        self._thread = None
+
+        self._scheme = 'http'
+        if ssl_context is not None:
+            self._httpd.socket = ssl_context.wrap_socket(self._httpd.socket, server_side=True)
+            self._scheme = 'https'
+
+    @property
+    def url(self) -> str:
+        """
+        The url to pass to the `OpenVidu` object.
+        """
+        if self._unix_socket is not None:
+            return f"unix://{quote(self._unix_socket, safe='')}{API_PREFIX}"
+
+        host, port = self._httpd.server_address[:2]
+        return f"{self._scheme}://{host}:{port}{API_PREFIX}"
+
+    def start(self):
+        """
+        Starts serving requests on a background thread.
+        """
+        if self._thread:
+            return
+
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05},
+                                        name='FakeOpenViduServer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops serving requests and releases the listening socket.
+        """
+        if self._thread:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+
+        self._httpd.server_close()
+        if self._unix_socket is not None and os.path.exists(self._unix_socket):
+            os.unlink(self._unix_socket)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def add_publisher(self, session_id: str, connection_id: str, type_of_video: str = 'CAMERA') -> str:
+        """
+        Simulates a client publishing a stream on a connection, as there are no real browsers around.
+
+        :param session_id: The id of the session the connection belongs to.
+        :param connection_id: The id of the connection that should publish.
+        :param type_of_video: Value of the `typeOfVideo` media option.
+        :return: The id of the new stream.
+        """
+        with self._lock:
+            connection = self._find_connection(session_id, connection_id)
+            if not connection:
+                raise KeyError(connection_id)
+
+            stream_id = f"str_{type_of_video[:3]}_{_random_id('', 4)}_{connection_id}"
+            connection['status'] = 'active'
+            connection['activeAt'] = connection['activeAt'] or _now_ms()
+            connection['publishers'].append({
+                "createdAt": _now_ms(),
+                "streamId": stream_id,
+                "mediaOptions": {
+                    "hasAudio": True,
+                    "audioActive": True,
+                    "hasVideo": True,
+                    "videoActive": True,
+                    "typeOfVideo": type_of_video,
+                    "frameRate": 30,
+                    "videoDimensions": "{\"width\":640,\"height\":480}",
+                    "filter": {}
+                }
+            })
+
+            return stream_id
+
+    def _simulate_latency(self):
+        if not (self.latency or self.jitter):
+            return
+
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pick_injected_error(self) -> Optional[int]:
+        if self.error_rate and self._random.random() < self.error_rate:
+            return self.error_status
+
+        return None
+
+    def _find_connection(self, session_id: str, connection_id: str) -> Optional[dict]:
+        session = self._sessions.get(session_id)
+        if not session:
+            return None
+
+        for connection in session['connections']['content']:
+            if connection['id'] == connection_id:
+                return connection
+
+        return None
+
+    def _dispatch(self, method: str, path: str, body: dict) -> Tuple[int, bytes]:
+        with self._lock:
+            for route_method, route, handler in _ROUTES:
+                if route_method != method:
+                    continue
+
+                match = route.fullmatch(path)
+                if match:
+                    status, response = handler(self, body, *match.groups())
+                    # Serialize while holding the lock, so concurrent requests can't modify the state mid-way
+                    return status, json.dumps(response).encode() if response is not None else b''
+
+        return 405, b''
+
+    #
+    # Route handlers, all of them are called with the lock held
+    #
+
+    def _get_sessions(self, body: dict):
+        content = list(self._sessions.values())
+        return 200, {"numberOfElements": len(content), "content": content}
+
+    def _post_sessions(self, body: dict):
+        media_mode = body.get('mediaMode', 'ROUTED')
+        if media_mode not in ['ROUTED', 'RELAYED']:
+            return 400, None
+
+        session_id = body.get('customSessionId') or _random_id('ses_')
+        if session_id in self._sessions:
+            return 409, None
+
+        session = {
+            "id": session_id,
+            "object": "session",
+            "createdAt": _now_ms(),
+            "mediaMode": media_mode,
+            "recordingMode": body.get('recordingMode', 'MANUAL'),
+            "defaultOutputMode": "COMPOSED",
+            "defaultRecordingLayout": "BEST_FIT",
+            "customSessionId": body.get('customSessionId', ''),
+            "connections": {"numberOfElements": 0, "content": []},
+            "recording": False
+        }
+
+        self._sessions[session_id] = session
+        return 200, session
+
+    def _get_session(self, body: dict, session_id: str):
+        session = self._sessions.get(session_id)
+        if not session:
+            return 404, None
+
+        return 200, session
+
+    def _delete_session(self, body: dict, session_id: str):
+        if self._sessions.pop(session_id, None) is None:
+            return 404, None
+
+        return 204, None
+
+    def _get_connections(self, body: dict, session_id: str):
+        session = self._sessions.get(session_id)
+        if not session:
+            return 404, None
+
+        return 200, session['connections']
+
+    def _post_connection(self, body: dict, session_id: str):
+        session = self._sessions.get(session_id)
+        if not session:
+            return 404, None
+
+        connection_type = body.get('type', 'WEBRTC')
+        now = _now_ms()
+
+        if connection_type == 'WEBRTC':
+            role = body.get('role', 'PUBLISHER')
+            if role not in ['SUBSCRIBER', 'PUBLISHER', 'MODERATOR']:
+                return 400, None
+
+            connection_id = _random_id('con_')
+            kurento_options = {
+                "videoMaxRecvBandwidth": self.config['OPENVIDU_STREAMS_VIDEO_MAX_RECV_BANDWIDTH'],
+                "videoMinRecvBandwidth": self.config['OPENVIDU_STREAMS_VIDEO_MIN_RECV_BANDWIDTH'],
+                "videoMaxSendBandwidth": self.config['OPENVIDU_STREAMS_VIDEO_MAX_SEND_BANDWIDTH'],
+                "videoMinSendBandwidth": self.config['OPENVIDU_STREAMS_VIDEO_MIN_SEND_BANDWIDTH'],
+                "allowedFilters": []
+            }
+            kurento_options.update(body.get('kurentoOptions', {}))
+
+            connection = {
+                "id": connection_id,
+                "object": "connection",
+                "type": "WEBRTC",
+                "status": "pending",
+                "sessionId": session_id,
+                "createdAt": now,
+                "activeAt": None,
+                "location": None,
+                "platform": None,
+                "token": f"wss://localhost:4443?sessionId={session_id}&token={_random_id('tok_', 16)}",
+                "serverData": body.get('data', ''),
+                "clientData": None,
+                "record": body.get('record', True),
+                "role": role,
+                "kurentoOptions": kurento_options,
+                "publishers": [],
+                "subscribers": []
+            }
+
+        elif connection_type == 'IPCAM':
+            rtsp_uri = body.get('rtspUri')
+            if not rtsp_uri:
+                return 400, None
+
+            connection_id = _random_id('ipc_IPCAM_')
+            connection = {
+                "id": connection_id,
+                "object": "connection",
+                "type": "IPCAM",
+                "status": "active",
+                "sessionId": session_id,
+                "createdAt": now,
+                "activeAt": now,
+                "location": "unknown",
+                "platform": "IPCAM",
+                "token": None,
+                "serverData": body.get('data', ''),
+                "clientData": None,
+                "record": body.get('record', True),
+                "rtspUri": rtsp_uri,
+                "adaptativeBitrate": body.get('adaptativeBitrate', True),
+                "onlyPlayWithSubscribers": body.get('onlyPlayWithSubscribers', True),
+                "networkCache": body.get('networkCache', 2000),
+                "publishers": [{
+                    "createdAt": now,
+                    "streamId": f"str_IPC_{_random_id('', 4)}_{connection_id}",
+                    "mediaOptions": {
+                        "hasAudio": True,
+                        "audioActive": True,
+                        "hasVideo": True,
+                        "videoActive": True,
+                        "typeOfVideo": "IPCAM",
+                        "frameRate": None,
+                        "videoDimensions": None,
+                        "filter": {}
+                    }
+                }],
+                "subscribers": []
+            }
+
+        else:
+            return 400, None
+
+        session['connections']['content'].append(connection)
+        session['connections']['numberOfElements'] = len(session['connections']['content'])
+        return 200, connection
+
+    def _get_connection(self, body: dict, session_id: str, connection_id: str):
+        if session_id not in self._sessions:
+            return 400, None
+
+        connection = self._find_connection(session_id, connection_id)
+        if not connection:
+            return 404, None
+
+        return 200, connection
+
+    def _delete_connection(self, body: dict, session_id: str, connection_id: str):
+        if session_id not in self._sessions:
+            return 400, None
+
+        connection = self._find_connection(session_id, connection_id)
+        if not connection:
+            return 404, None
+
+        connections = self._sessions[session_id]['connections']
+        connections['content'].remove(connection)
+        connections['numberOfElements'] = len(connections['content'])
+        return 204, None
+
+    def _delete_stream(self, body: dict, session_id: str, stream_id: str):
+        session = self._sessions.get(session_id)
+        if not session:
+            return 400, None
+
+        for connection in session['connections']['content']:
+            for publisher in connection['publishers']:
+                if publisher['streamId'] == stream_id:
+                    if connection['type'] == 'IPCAM':
+                        return 405, None
+
+                    connection['publishers'].remove(publisher)
+                    return 204, None
+
+        return 404, None
+
+    def _post_signal(self, body: dict):
+        session_id = body.get('session')
+        if not session_id:
+            return 400, None
+
+        if not isinstance(body.get('to', []), list):
+            return 400, None
+
+        if session_id not in self._sessions:
+            return 404, None
+
+        for connection_id in body.get('to', []):
+            if not self._find_connection(session_id, connection_id):
+                return 406, None
+
+        return 200, None
+
+    def _get_config(self, body: dict):
+        return 200, self.config
+
+
+_ROUTES = [
+    ('GET', re.compile(r'sessions'), FakeOpenViduServer._get_sessions),
+    ('POST', re.compile(r'sessions'), FakeOpenViduServer._post_sessions),
+    ('GET', re.compile(r'sessions/([^/]+)'), FakeOpenViduServer._get_session),
+    ('DELETE', re.compile(r'sessions/([^/]+)'), FakeOpenViduServer._delete_session),
+    ('GET', re.compile(r'sessions/([^/]+)/connection'), FakeOpenViduServer._get_connections),
+    ('POST', re.compile(r'sessions/([^/]+)/connection'), FakeOpenViduServer._post_connection),
+    ('GET', re.compile(r'sessions/([^/]+)/connection/([^/]+)'), FakeOpenViduServer._get_connection),
+    ('DELETE', re.compile(r'sessions/([^/]+)/connection/([^/]+)'), FakeOpenViduServer._delete_connection),
+    ('DELETE', re.compile(r'sessions/([^/]+)/stream/([^/]+)'), FakeOpenViduServer._delete_stream),
+    ('POST', re.compile(r'signal'), FakeOpenViduServer._post_signal),
+    ('GET', re.compile(r'config'), FakeOpenViduServer._get_config),
+]
@@ -1,14 +1,42 @@
 """OpenVidu class."""
-from typing import List, Union, Optional
-from functools import partial
-
-from requests_toolbelt.sessions import BaseUrlSession
-from requests.auth import HTTPBasicAuth
-from requests_toolbelt import user_agent
+import os
+import sys
+import platform
+from time import monotonic
+from datetime import datetime
+from typing import List, Union, Optional, Iterator, Callable
+from threading import Lock, Thread
 
 from . import __version__
 from .exceptions import OpenViduSessionDoesNotExistsError, OpenViduSessionExistsError
 from .openvidusession import OpenViduSession
+from .openviduconnection import OpenViduConnection
+from .cache import CachedValue, NegativeCache
+from .query import SessionIndex
+from .singleflight import coalesced_get
+from .transport import Transport, TRANSPORTS
+from .openvidurecording import OpenViduRecording, OpenViduRecordingCollection, _start_recording, _iter_recordings, \
+    _list_recordings, _get_recording_data, _stop_recording, _delete_recording
+
+
+def _user_agent(name: str, version: str) -> str:
+    # Same format as requests_toolbelt.user_agent(), without importing it
+    implementation = platform.python_implementation()
+    if implementation == 'PyPy':
+        implementation_version = '.'.join(str(part) for part in sys.pypy_version_info[:3])
+        if sys.pypy_version_info.releaselevel != 'final':
+            implementation_version += sys.pypy_version_info.releaselevel
+    elif implementation in ('CPython', 'Jython', 'IronPython'):
+        implementation_version = platform.python_version()
+    else:
+        implementation_version = 'Unknown'
+
+    try:
+        system, release = platform.system(), platform.release()
+    except IOError:
+        system, release = 'Unknown', 'Unknown'
+
+    return f"{name}/{version} {implementation}/{implementation_version} {system}/{release}"
 
 
 class OpenVidu(object):
@@ -17,35 +45,77 @@ class OpenVidu(object):
     """
 
     def __init__(self, url: str, secret: str, initial_fetch: bool = True, timeout: Union[int, tuple, None] = None,
-                 verify: Optional[Union[str, bool]] = None, cert: Optional[Union[tuple, str]] = None):
+                 verify: Optional[Union[str, bool]] = None, cert: Optional[Union[tuple, str]] = None,
+                 config_ttl: float = 300.0, config_stale_ttl: float = 60.0, negative_cache_ttl: float = 10.0,
+                 negative_cache_size: int = 1024, webrtc_stats: bool = False,
+                 transport: Union[str, Callable[..., Transport]] = 'requests', pool_size: int = 10,
+                 pool_block: bool = False, keep_alive: Optional[float] = None, warm_up: int = 0,
+                 tls_session_reuse: bool = True, unix_socket: Optional[str] = None):
         """
         :param url: The url to reach your OpenVidu Server instance. Typically, something like https://localhost:4443/
+            To connect through a Unix domain socket, use its percent-encoded path as the host with the unix scheme,
+            like unix://%2Frun%2Fopenvidu.sock/openvidu/api/
         :param secret: Secret for your OpenVidu Server
         :param initial_fetch: Enable the initial fetching on object creation.
             Defaults to `True`. If set to `False` a `fetch()` must be called before doing anything with the object.
             In most scenarios you won't need to change this.
         :param timeout: Set the `timeout` property of the underlying requests call. Default: None = No timeout.
             See https://2.python-requests.org/en/latest/user/advanced/#timeouts for possible values.
+            It is shrunk to the remaining time, when a request is made inside a `pyopenvidu.deadline.deadline()` block.
         :param verify: Set the `verify` property of the underlying requests call. Default: None = Use certifi.
             See https://docs.python-requests.org/en/master/user/advanced/#ssl-cert-verification.
         :param cert: Set the `cert` property of the underlying requests call. Default: None = No client cert.
             See https://docs.python-requests.org/en/master/user/advanced/#ssl-cert-verification
+        :param config_ttl: Seconds the config returned by `get_cached_config()` is considered fresh for.
+        :param config_stale_ttl: Seconds the expired config is still returned by `get_cached_config()` for,
+            while it is being refreshed in the background.
+        :param negative_cache_ttl: Seconds the ids of sessions and connections found to be missing on the server
+            are remembered for. Fetching them in this time fails without a network call. Zero disables the cache.
+        :param negative_cache_size: Maximum number of missing ids remembered.
+        :param webrtc_stats: Request the WebRTC statistics of the publishers and subscribers when fetching.
+            They are available through the `webrtc_stats` property of those objects.
+        :param transport: The transport sending the requests: 'requests' (default), 'urllib3', 'async', 'http2',
+            a subclass of `pyopenvidu.transport.Transport`, or a callable creating one with the same arguments
+            (like the value returned by `ReplayTransport.from_recording()`).
+        :param pool_size: Maximum number of connections kept open to the server.
+        :param pool_block: Wait for a free connection when every pooled connection is in use,
+            instead of opening one that's discarded after the request. Default: False.
+        :param keep_alive: Seconds an idle connection is reused for. Default: None = Until the server closes it.
+        :param warm_up: Number of keep-alive connections opened on object creation. Default: 0 = Opened when needed.
+        :param tls_session_reuse: Resume the TLS session of an earlier connection when opening a new one,
+            instead of doing a full handshake. Default: True.
+        :param unix_socket: Path of a Unix domain socket to send the requests through, e.g. of a co-located proxy.
+            The url still sets the scheme, the path and the Host header of the requests. Default: None = Use TCP.
         """
-        self._session = BaseUrlSession(base_url=url)
-        self._session.auth = HTTPBasicAuth('OPENVIDUAPP', secret)
+        transport_class = TRANSPORTS[transport] if isinstance(transport, str) else transport
 
-        self._session.headers.update({
-            'User-Agent': user_agent('PyOpenVidu', __version__)
-        })
+        self._session: Transport = transport_class(url, ('OPENVIDUAPP', secret),
+                                                   headers={'User-Agent': _user_agent('PyOpenVidu', __version__)},
+                                                   timeout=timeout, verify=verify, cert=cert,
+                                                   pool_size=pool_size, pool_block=pool_block, keep_alive=keep_alive,
+                                                   tls_session_reuse=tls_session_reuse, unix_socket=unix_socket)
 
-        self._session.verify = verify
-        self._session.cert = cert
+        self._session.negative_cache = NegativeCache(negative_cache_ttl, negative_cache_size)
+        # Query parameters of every request fetching sessions or connections
+        self._session.fetch_params = {'webRtcStats': 'true'} if webrtc_stats else None
 
-        self._session.request = partial(self._session.request, timeout=timeout)
+        self._config_cache = CachedValue(self.get_config, config_ttl, config_stale_ttl)
 
         self._openvidu_sessions = {}  # id:object
+        self._session_index = SessionIndex()  # Connection attributes of the cached sessions
+        self._snapshot = None  # Sessions loaded by load_snapshot(), not yet turned into objects
+        self._snapshot_lock = Lock()
+        self._followed_snapshot = None  # Path of the snapshot followed instead of fetching
+        self._followed_snapshot_signature = None
+        self._recordings = OpenViduRecordingCollection()
 
         self._last_fetch_result = {}  # Used only to calculate the return value of the fetch() call
+        self._fetch_generation = 0  # Incremented every time the fetched data changes
+        self._last_fetch_time = None  # monotonic() time of the last successful fetch
+
+        if warm_up:
+            self._session.warm_up(warm_up)
+
         if initial_fetch:
             self.fetch()  # initial fetch
 
@@ -58,20 +128,44 @@ class OpenVidu(object):
             This applies to any property or sub-property of the object.
         """
 
-        r = self._session.get("sessions")
+        if self._followed_snapshot is not None:
+            return self._update_from_followed_snapshot()
+
+        request_time = monotonic()
+        r, response_data = coalesced_get(self._session, "sessions", self._session.fetch_params)
         r.raise_for_status()
-        new_data = r.json()['content']
+        new_data = response_data['content']
+        self._last_fetch_time = request_time
+
+        self._materialize_snapshot()  # So the sessions loaded from a snapshot are compared and kept as well
 
         data_changed = new_data != self._last_fetch_result
         self._last_fetch_result = new_data
 
         if data_changed:
-            self._openvidu_sessions = {}
+            openvidu_sessions = {}
 
             # update, create valid streams
             for session_data in new_data:
                 session_id = session_data['id']
-                self._openvidu_sessions[session_id] = OpenViduSession(self._session, session_data)
+                session = self._openvidu_sessions.get(session_id)
+                self._session.negative_cache.discard(('session', session_id))
+
+                # Unchanged sessions are kept, only the changed ones are parsed again
+                if not (session and session._is_unchanged_since_fetch(session_data)):
+                    session = OpenViduSession(self._session, session_data)
+
+                openvidu_sessions[session_id] = session
+
+            for session_id in self._openvidu_sessions.keys() - openvidu_sessions.keys():
+                self._session_index.detach(session_id)
+
+            for session_id, session in openvidu_sessions.items():
+                self._session_index.attach(session_id, session._connection_index)
+
+            # Replaced at once, so readers never see a half-updated list
+            self._openvidu_sessions = openvidu_sessions
+            self._fetch_generation += 1
 
         return data_changed
 
@@ -82,10 +176,11 @@ class OpenVidu(object):
         :param session_id: The ID of the session to acquire.
         :return: An OpenViduSession object.
         """
-        if session_id not in self._openvidu_sessions:
-            raise OpenViduSessionDoesNotExistsError()
+        self._update_from_followed_snapshot()
+        session = self._openvidu_sessions.get(session_id) or self._materialize_session(session_id)
 
-        session = self._openvidu_sessions[session_id]
+        if not session:
+            raise OpenViduSessionDoesNotExistsError()
 
         if not session.is_valid:
             raise OpenViduSessionDoesNotExistsError()
@@ -121,10 +216,61 @@ class OpenVidu(object):
 
         # As of OpenVidu 2.16.0 the server returns the created session object
         new_session = OpenViduSession(self._session, r.json())
+        self._session.negative_cache.discard(('session', new_session.id))
         self._openvidu_sessions[new_session.id] = new_session
+        self._session_index.attach(new_session.id, new_session._connection_index)
 
         return new_session
 
+    def get_or_create_session(self, custom_session_id: str, media_mode: str = None) -> OpenViduSession:
+        """
+        Get the session with the given id, creating it if it does not exist.
+
+        The cached sessions are looked at first, without any request. If the session is not cached, it's created,
+        and if the server reports that it already exists, only that session is fetched.
+        Concurrent calls with the same id share a single server round trip.
+
+        The media mode of a session that already exists is not changed.
+
+        :param custom_session_id: The id of the session.
+        :param media_mode: ROUTED (default) or RELAYED, used when the session is created.
+        :return: The OpenViduSession instance.
+        """
+        try:
+            return self.get_session(custom_session_id)
+        except OpenViduSessionDoesNotExistsError:
+            pass
+
+        return self._session.single_flight.do(
+            ('get_or_create_session', custom_session_id),
+            lambda: self._get_or_create_session(custom_session_id, media_mode)
+        )
+
+    def _get_or_create_session(self, session_id: str, media_mode: Optional[str]) -> OpenViduSession:
+        session = self._openvidu_sessions.get(session_id)
+        if session is not None and session.is_valid:  # Created by a call finished since the cache was checked
+            return session
+
+        for _ in range(2):  # The session may be closed between the two requests, then it's created again
+            try:
+                return self.create_session(session_id, media_mode)
+            except OpenViduSessionExistsError:
+                pass
+
+            r, data = coalesced_get(self._session, f"sessions/{session_id}", self._session.fetch_params)
+            if r.status_code == 404:
+                continue
+
+            r.raise_for_status()
+
+            session = OpenViduSession(self._session, data)
+            self._session.negative_cache.discard(('session', session_id))
+            self._openvidu_sessions[session_id] = session
+            self._session_index.attach(session_id, session._connection_index)
+            return session
+
+        raise OpenViduSessionDoesNotExistsError()
+
     @property
     def sessions(self) -> List[OpenViduSession]:
         """
@@ -132,10 +278,31 @@ class OpenVidu(object):
 
         :return: A list of OpenViduSession objects.
         """
+        self._update_from_followed_snapshot()
+        self._materialize_snapshot()
+
         return [
             sess for sess in self._openvidu_sessions.values() if sess.is_valid
         ]
 
+    def close(self):
+        """
+        Releases the connections of the transport. The object should not be used after this call.
+        """
+        self._session.close()
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """
+        Get the age of the session data, measured from the start of the last successful `fetch()`.
+
+        :return: The age in seconds, or None if the sessions were never fetched.
+        """
+        if self._last_fetch_time is None:
+            return None
+
+        return monotonic() - self._last_fetch_time
+
     @property
     def session_count(self) -> int:
         """
@@ -145,6 +312,120 @@ class OpenVidu(object):
         """
         return len(self.sessions)
 
+    def _materialize_session(self, session_id: str) -> Optional[OpenViduSession]:
+        snapshot = self._snapshot
+        if snapshot is None or session_id not in snapshot:
+            return None
+
+        with self._snapshot_lock:
+            session = self._openvidu_sessions.get(session_id)
+
+            if session is None and self._snapshot is snapshot:
+                session = OpenViduSession(self._session, snapshot.read(session_id))
+                self._openvidu_sessions[session_id] = session
+                self._session_index.attach(session_id, session._connection_index)
+
+        return session
+
+    def _materialize_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+
+        for session_id in snapshot.session_ids:
+            self._materialize_session(session_id)
+
+        with self._snapshot_lock:
+            if self._snapshot is snapshot:
+                self._last_fetch_result = [
+                    self._openvidu_sessions[session_id]._last_fetch_result for session_id in snapshot.session_ids
+                ]
+                self._snapshot = None
+                snapshot.close()
+
+    def save_snapshot(self, path: Union[str, os.PathLike]):
+        """
+        Saves the state of the sessions to a compact binary file, which can be loaded with `load_snapshot()`.
+        The file is replaced atomically.
+
+        :param path: The path of the snapshot file.
+        """
+        from .snapshot import write_snapshot  # Loaded only by the applications using snapshots
+
+        write_snapshot(path, [session._last_fetch_result for session in self.sessions])
+
+    def load_snapshot(self, path: Union[str, os.PathLike], reconcile: bool = True) -> Optional[Thread]:
+        """
+        Loads the state of the sessions from a file saved by `save_snapshot()`, instead of fetching them.
+        Useful for warm restarts: create the object with `initial_fetch=False` and load a recent snapshot.
+
+        The file is memory-mapped, and a session is parsed only when it's first accessed through `get_session()`.
+        Accessing the `sessions` property or calling `fetch()` parses every remaining session.
+
+        :param path: The path of the snapshot file.
+        :param reconcile: Call `fetch()` on a background thread to update the state loaded from the snapshot.
+        :return: The background thread if `reconcile` is set, None otherwise.
+        """
+        from .snapshot import SessionSnapshot
+
+        snapshot = SessionSnapshot(path)
+
+        with self._snapshot_lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+
+            self._openvidu_sessions = {}
+            self._session_index.clear()
+            self._snapshot = snapshot
+            self._last_fetch_result = {}
+            self._fetch_generation += 1
+
+        if not reconcile:
+            return None
+
+        thread = Thread(target=self.fetch, name='OpenViduSnapshotReconcile', daemon=True)
+        thread.start()
+        return thread
+
+    def follow_snapshot(self, path: Union[str, os.PathLike]):
+        """
+        Use the snapshot file regularly saved by another process (typically by `SharedSessionCache`) as the source
+        of the session data, instead of the server.
+
+        The file is checked for changes whenever the sessions are accessed, and loaded with `load_snapshot()`
+        if it was replaced. `fetch()` only checks the file, and does not make any requests to the server.
+
+        :param path: The path of the snapshot file.
+        """
+        self._followed_snapshot = path
+        self._followed_snapshot_signature = None
+        self._update_from_followed_snapshot()
+
+    def unfollow_snapshot(self):
+        """
+        Stop following the snapshot file set by `follow_snapshot()`. The next `fetch()` requests the server again.
+        """
+        self._followed_snapshot = None
+
+    def _update_from_followed_snapshot(self) -> bool:
+        path = self._followed_snapshot
+        if path is None:
+            return False
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False  # Not published yet
+
+        # The file is replaced by every save, so a new inode means new content
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if signature == self._followed_snapshot_signature:
+            return False
+
+        self._followed_snapshot_signature = signature
+        self.load_snapshot(path, reconcile=False)
+        return True
+
     def get_config(self) -> dict:
         """
         Get OpenVidu active configuration.
@@ -158,7 +439,170 @@ class OpenVidu(object):
         """
         # Note: Since 2.16.0 This endpoint is moved from toplevel under /api
         # https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#get-openviduapiconfig
-        r = self._session.get('config')
+        r, config = coalesced_get(self._session, 'config')
         r.raise_for_status()
 
-        return r.json()
+        return config
+
+    def get_cached_config(self) -> dict:
+        """
+        Get OpenVidu active configuration from a cache.
+
+        The configuration of the server changes only when it is restarted, so it is requested only when the cached
+        one is older than `config_ttl`. Concurrent callers share a single request. An expired config is still
+        returned for `config_stale_ttl` seconds while it's being refreshed in the background.
+        Use `config_cache.invalidate()` to drop the cached config.
+
+        :return: The response of the server as a dict. It is shared between the callers, so it must not be modified.
+        """
+        return self._config_cache.get()
+
+    @property
+    def negative_cache(self) -> NegativeCache:
+        """
+        The cache of the sessions and connections recently found to be missing on the server.
+        Its `stats` property can be used to monitor its efficiency.
+
+        :return: A NegativeCache object.
+        """
+        return self._session.negative_cache
+
+    @property
+    def config_cache(self) -> CachedValue:
+        """
+        The cache used by `get_cached_config()`.
+
+        :return: A CachedValue object.
+        """
+        return self._config_cache
+
+    def start_recording(self, session_id: str, name: str = None, output_mode: str = None, has_audio: bool = None,
+                        has_video: bool = None, resolution: str = None, recording_layout: str = None,
+                        custom_layout: str = None) -> OpenViduRecording:
+        """
+        Starts the recording of a session.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#post-openviduapirecordingsstart
+
+        :param session_id: The ID of the session to record.
+        :param name: The name you want to give to the video file.
+        :param output_mode: COMPOSED (default) or INDIVIDUAL
+        :param has_audio: Whether to record audio or not.
+        :param has_video: Whether to record video or not.
+        :param resolution: The resolution of the recorded video file, like `1920x1080`.
+        :param recording_layout: The layout to use in COMPOSED recordings.
+        :param custom_layout: Relative path to the index.html file of a custom layout.
+        :return: The created OpenViduRecording instance.
+        """
+        return _start_recording(self._session, session_id, name, output_mode, has_audio, has_video, resolution,
+                                recording_layout, custom_layout)
+
+    def stop_recording(self, recording_id: str) -> OpenViduRecording:
+        """
+        Stops a recording.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#post-openviduapirecordingsstopltrecording_idgt
+
+        :param recording_id: The ID of the recording to stop.
+        :return: The stopped OpenViduRecording instance.
+        """
+        return OpenViduRecording(self._session, _stop_recording(self._session, recording_id))
+
+    def get_recording(self, recording_id: str) -> OpenViduRecording:
+        """
+        Get a recording from the server.
+        Using this function will always result an API call to the backend.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#get-openviduapirecordingsltrecording_idgt
+
+        :param recording_id: The ID of the recording to acquire.
+        :return: An OpenViduRecording object.
+        """
+        return OpenViduRecording(self._session, _get_recording_data(self._session, recording_id))
+
+    def query_connections(self, role: str = None, type_: str = None, platform: str = None, server_data: str = None,
+                          has_publishers: bool = None, created_after: datetime = None, created_before: datetime = None,
+                          predicate: Optional[Callable[[OpenViduConnection], bool]] = None) -> List[OpenViduConnection]:
+        """
+        Find the valid connections of every cached session matching every given filter.
+        The filters are resolved using indexes maintained at fetch time, no API call is made. Only the sessions
+        having connections with the values of every filter are queried.
+        See `OpenViduSession.query_connections()` for the description of the filters.
+
+        :return: A list of OpenViduConnection objects, grouped by session.
+        """
+        filters = {
+            'role': role,
+            'type': type_,
+            'platform': platform,
+            'server_data': server_data,
+            'has_publishers': has_publishers
+        }
+
+        filters = {k: v for k, v in filters.items() if v is not None}
+
+        sessions = self.sessions  # Also loads the sessions of a snapshot, which attaches them to the index
+        session_ids = self._session_index.candidates(**filters)
+        if session_ids is not None:
+            sessions = [self._openvidu_sessions.get(session_id) for session_id in session_ids]
+
+        return [
+            connection for session in sessions if session is not None and session.is_valid
+            for connection in session._connection_index.query(predicate, created_after, created_before, **filters)
+        ]
+
+    def list_recordings(self) -> List[OpenViduRecording]:
+        """
+        Get a list of every recording available on the server.
+        Using this function will always result an API call to the backend.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#get-openviduapirecordings
+
+        :return: A list of OpenViduRecording objects.
+        """
+        return _list_recordings(self._session)
+
+    def iter_recordings(self, session_id: str = None, status: str = None) -> Iterator[OpenViduRecording]:
+        """
+        Iterate over the recordings available on the server.
+        The response is parsed incrementally, so only the recording being yielded is held in memory.
+        Using this function will always result an API call to the backend.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#get-openviduapirecordings
+
+        :param session_id: Only yield the recordings of this session.
+        :param status: Only yield recordings with this status.
+        :return: An iterator of OpenViduRecording objects.
+        """
+        for recording in _iter_recordings(self._session):
+            if (session_id is None or recording.session_id == session_id) and \
+                    (status is None or recording.status == status):
+                yield recording
+
+    def fetch_recordings(self) -> OpenViduRecordingCollection:
+        """
+        Updates the list of recordings available through the `recordings` property.
+
+        :return: The updated OpenViduRecordingCollection.
+        """
+        self._recordings = OpenViduRecordingCollection(_iter_recordings(self._session))
+        return self._recordings
+
+    @property
+    def recordings(self) -> OpenViduRecordingCollection:
+        """
+        Get the indexed collection of recordings as of the last `fetch_recordings()` call.
+
+        :return: An OpenViduRecordingCollection object.
+        """
+        return self._recordings
+
+    def delete_recording(self, recording_id: str):
+        """
+        Deletes a recording and its files from the server. The recording must be stopped before deleting it.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#delete-openviduapirecordingsltrecording_idgt
+
+        :param recording_id: The ID of the recording to delete.
+        """
+        _delete_recording(self._session, recording_id)
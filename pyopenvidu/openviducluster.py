@@ -0,0 +1,141 @@
+"""OpenViduCluster class."""
+from typing import List, Dict, Union, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from .openvidu import OpenVidu
+from .openvidusession import OpenViduSession
+from .exceptions import OpenViduSessionDoesNotExistsError, OpenViduSessionExistsError
+from .placement import PlacementStrategy, ConsistentHashPlacement
+from .deadline import in_context
+
+
+class OpenViduCluster(object):
+    """
+    This object represents multiple independent OpenVidu server instances as one.
+    Sessions are routed to the server hosting them, new sessions are placed by a pluggable strategy.
+    """
+
+    def __init__(self, servers: Union[Dict[str, OpenVidu], List[OpenVidu]],
+                 placement: Optional[PlacementStrategy] = None, initial_fetch: bool = True):
+        """
+        :param servers: The OpenVidu objects of the servers by an arbitrary, but stable name.
+            If a list is given, the servers are named by their position.
+        :param placement: Strategy to select the server for new sessions.
+            Default: ConsistentHashPlacement, which falls back to LeastConnectionsPlacement for random session ids.
+        :param initial_fetch: Enable the initial fetching of every server on object creation.
+            The OpenVidu objects themselves may be created with `initial_fetch=False` to avoid fetching twice.
+        """
+        if isinstance(servers, dict):
+            self._servers = dict(servers)
+        else:
+            self._servers = {str(i): server for i, server in enumerate(servers)}
+
+        if not self._servers:
+            raise ValueError("At least one server is required")
+
+        self.placement = placement or ConsistentHashPlacement()
+
+        self._session_index = {}  # session id:server name
+
+        if initial_fetch:
+            self.fetch()
+        else:
+            self._rebuild_index()
+
+    def _rebuild_index(self):
+        index = {}
+        for name, server in self._servers.items():
+            for session in server.sessions:
+                index[session.id] = name
+
+        self._session_index = index
+
+    def fetch(self) -> bool:
+        """
+        Fetches every server concurrently, then updates the session index used for routing.
+
+        If fetching any of the servers fail, the first exception is raised after every other fetch is finished.
+        The index is updated even in that case, using the last known state of the failed servers.
+
+        :return: true if the status of any server has changed, false if not.
+        """
+        with ThreadPoolExecutor(max_workers=len(self._servers)) as executor:
+            futures = [executor.submit(in_context(server.fetch)) for server in self._servers.values()]
+
+        self._rebuild_index()
+
+        changed = False
+        for future in futures:
+            changed |= future.result()
+
+        return changed
+
+    def get_server(self, session_id: str) -> OpenVidu:
+        """
+        Get the server hosting a session.
+
+        :param session_id: The ID of the session.
+        :return: The OpenVidu object of the server.
+        """
+        if session_id not in self._session_index:
+            raise OpenViduSessionDoesNotExistsError()
+
+        return self._servers[self._session_index[session_id]]
+
+    def get_session(self, session_id: str) -> OpenViduSession:
+        """
+        Get a currently active session from the server hosting it.
+
+        :param session_id: The ID of the session to acquire.
+        :return: An OpenViduSession object.
+        """
+        return self.get_server(session_id).get_session(session_id)
+
+    def create_session(self, custom_session_id: str = None, media_mode: str = None) -> OpenViduSession:
+        """
+        Creates a new OpenVidu session on the server selected by the placement strategy.
+
+        :param custom_session_id: You can fix the sessionId that will be assigned to the session with this parameter.
+        :param media_mode: ROUTED (default) or RELAYED
+        :return: The created OpenViduSession instance.
+        """
+        if custom_session_id and custom_session_id in self._session_index:
+            try:
+                self.get_session(custom_session_id)
+            except OpenViduSessionDoesNotExistsError:
+                pass  # Closed since, it's fine to create it again
+            else:
+                raise OpenViduSessionExistsError()
+
+        name = self.placement.select(self._servers, custom_session_id)
+        session = self._servers[name].create_session(custom_session_id, media_mode)
+        self._session_index[session.id] = name
+
+        return session
+
+    @property
+    def servers(self) -> Dict[str, OpenVidu]:
+        """
+        Get the servers of the cluster by their name.
+
+        :return: A dict of OpenVidu objects.
+        """
+        return dict(self._servers)
+
+    @property
+    def sessions(self) -> List[OpenViduSession]:
+        """
+        Get a list of currently active sessions of every server.
+
+        :return: A list of OpenViduSession objects.
+        """
+        return [session for server in self._servers.values() for session in server.sessions]
+
+    @property
+    def session_count(self) -> int:
+        """
+        Get the number of active sessions on every server.
+
+        :return: The number of active sessions.
+        """
+        return len(self.sessions)
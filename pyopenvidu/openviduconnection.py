@@ -1,9 +1,10 @@
 """OpenViduConnection class."""
 from typing import List, Optional
-from requests_toolbelt.sessions import BaseUrlSession
 from dataclasses import dataclass
 from .exceptions import OpenViduConnectionDoesNotExistsError, OpenViduSessionDoesNotExistsError
 from datetime import datetime
+from .singleflight import coalesced_get
+from .transport import Transport
 from .openvidupublisher import OpenViduPublisher
 from .openvidusubscriber import OpenViduSubscriber
 
@@ -59,13 +60,14 @@ class OpenViduConnection(object):
         self.is_valid = True
         # Specific properties will be set in the inherited functions
 
-    def __init__(self, session: BaseUrlSession, data: dict):
+    def __init__(self, session: Transport, data: dict):
         """
         Direct instantiation of this class is not supported!
         Use `OpenViduSession.connections` to get an instance of this class.
         """
 
         self._session = session
+        self._index = None  # The ConnectionIndex of the session, set when indexed
         self._update_from_data(data)
         self._last_fetch_result = data
 
@@ -80,17 +82,27 @@ class OpenViduConnection(object):
         if not self.is_valid:
             raise OpenViduConnectionDoesNotExistsError()
 
-        r = self._session.get(f"sessions/{self.session_id}/connection/{self.id}")
+        missing = self._session.negative_cache.lookup(('session', self.session_id),
+                                                      ('connection', self.session_id, self.id))
+        if missing is not None:
+            self.is_valid = False
+            if missing[0] == 'session':
+                raise OpenViduSessionDoesNotExistsError()
+            raise OpenViduConnectionDoesNotExistsError()
+
+        r, new_data = coalesced_get(self._session, f"sessions/{self.session_id}/connection/{self.id}",
+                                    self._session.fetch_params)
 
         if r.status_code == 404:
             self.is_valid = False
+            self._session.negative_cache.add(('connection', self.session_id, self.id))
             raise OpenViduConnectionDoesNotExistsError()
         elif r.status_code == 400:
             self.is_valid = False
+            self._session.negative_cache.add(('session', self.session_id))
             raise OpenViduSessionDoesNotExistsError()
 
         r.raise_for_status()
-        new_data = r.json()
 
         is_changed = new_data != self._last_fetch_result
 
@@ -98,6 +110,9 @@ class OpenViduConnection(object):
             self._update_from_data(new_data)
             self._last_fetch_result = new_data
 
+            if self._index is not None:
+                self._index.update(self)
+
         return is_changed
 
     def force_disconnect(self):
@@ -113,13 +128,16 @@ class OpenViduConnection(object):
         r = self._session.delete(f"sessions/{self.session_id}/connection/{self.id}")
         if r.status_code == 404:
             self.is_valid = False
+            self._session.negative_cache.add(('connection', self.session_id, self.id))
             raise OpenViduConnectionDoesNotExistsError()
         if r.status_code == 400:
             self.is_valid = False
+            self._session.negative_cache.add(('session', self.session_id))
             raise OpenViduSessionDoesNotExistsError()
 
         r.raise_for_status()
         self.is_valid = False
+        self._session.negative_cache.add(('connection', self.session_id, self.id))
 
     def signal(self, type_: str = None, data: str = None):
         """
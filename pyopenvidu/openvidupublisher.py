@@ -1,9 +1,9 @@
 """OpenViduPublisher class."""
 from typing import Optional
-from requests_toolbelt.sessions import BaseUrlSession
 from dataclasses import dataclass
 from datetime import datetime
 from .exceptions import OpenViduSessionDoesNotExistsError, OpenViduStreamDoesNotExistsError, OpenViduStreamError
+from .transport import Transport
 
 
 # Notice: Frozen should be changed to True in later versions of Python3 where a nice method for custom initializer is implemented
@@ -13,8 +13,9 @@ class OpenViduPublisher(object):
     stream_id: str
     created_at: datetime
     media_options: Optional[dict]
+    webrtc_stats: Optional[dict]
 
-    def __init__(self, session: BaseUrlSession, session_id: str, data: dict):
+    def __init__(self, session: Transport, session_id: str, data: dict):
         """
         Direct instantiation of this class is not supported!
         Use `OpenViduConnection.publishers` to get an instance of this class.
@@ -25,6 +26,8 @@ class OpenViduPublisher(object):
         self.stream_id = data['streamId']
         self.created_at = datetime.utcfromtimestamp(data['createdAt'] / 1000.0)
         self.media_options = data.get('mediaOptions')
+        # Everything else is WebRTC information, sent only when requested by the `webrtc_stats` option of OpenVidu
+        self.webrtc_stats = {k: v for k, v in data.items() if k not in ('streamId', 'createdAt', 'mediaOptions')} or None
 
     def force_unpublish(self):
         """
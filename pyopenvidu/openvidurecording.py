@@ -0,0 +1,500 @@
+"""OpenViduRecording class."""
+import os
+import json
+import codecs
+from bisect import bisect_left, bisect_right
+from typing import Optional, Union, BinaryIO, Iterable, Iterator, List
+from dataclasses import dataclass
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import OpenViduSessionDoesNotExistsError, OpenViduRecordingError, \
+    OpenViduRecordingDoesNotExistsError, OpenViduRecordingStatusError
+from .deadline import check_deadline, in_context
+from .transport import Transport
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+LISTING_CHUNK_SIZE = 64 * 1024
+
+
+class _StreamingJSONReader(object):
+    """
+    Minimal pull parser, that decodes JSON values one by one from a stream of text chunks.
+    Only the value being decoded is kept in memory.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buffer = ''
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            return False
+
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON data at {self._buffer[self._pos:self._pos + 16]!r}")
+
+        self._pos += 1
+
+    def skip(self, char: str) -> bool:
+        if self.peek() == char:
+            self._pos += 1
+            return True
+
+        return False
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending at the end of the buffer may be truncated (numbers, literals), unless it's the last one
+                if end < len(self._buffer):
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                pass
+
+            if not self._fill():
+                value, self._pos = self._decoder.raw_decode(self._buffer, self._pos)
+                return value
+
+
+def _start_recording(session: Transport, session_id: str, name: str = None, output_mode: str = None,
+                     has_audio: bool = None, has_video: bool = None, resolution: str = None,
+                     recording_layout: str = None, custom_layout: str = None) -> 'OpenViduRecording':
+    if output_mode not in ['COMPOSED', 'INDIVIDUAL', None]:
+        raise ValueError(f"output_mode must be any of COMPOSED or INDIVIDUAL, not {output_mode}")
+
+    parameters = {
+        "session": session_id,
+        "name": name,
+        "outputMode": output_mode,
+        "hasAudio": has_audio,
+        "hasVideo": has_video,
+        "resolution": resolution,
+        "recordingLayout": recording_layout,
+        "customLayout": custom_layout
+    }
+
+    parameters = {k: v for k, v in parameters.items() if v is not None}
+
+    # send request
+    r = session.post('recordings/start', json=parameters)
+
+    if r.status_code == 404:
+        raise OpenViduSessionDoesNotExistsError()
+    elif r.status_code in [400, 422]:
+        raise ValueError()
+    elif r.status_code == 406:
+        raise OpenViduRecordingError("The session has no connected participants.")
+    elif r.status_code == 409:
+        raise OpenViduRecordingStatusError("The session is already being recorded or it is not in ROUTED media mode.")
+    elif r.status_code == 501:
+        raise OpenViduRecordingError("The recording module is disabled on the server.")
+
+    r.raise_for_status()
+
+    return OpenViduRecording(session, r.json())
+
+
+def _iter_recordings(session: Transport) -> Iterator['OpenViduRecording']:
+    with session.get('recordings', stream=True) as r:
+        r.raise_for_status()
+
+        decoder = codecs.getincrementaldecoder(r.encoding or 'utf-8')()
+        reader = _StreamingJSONReader(decoder.decode(chunk) for chunk in r.iter_content(LISTING_CHUNK_SIZE))
+
+        # The response looks like {"count": 2, "items": [...]}, only the items are streamed
+        reader.expect('{')
+        while not reader.skip('}'):
+            key = reader.value()
+            reader.expect(':')
+
+            if key == 'items':
+                reader.expect('[')
+                while not reader.skip(']'):
+                    yield OpenViduRecording(session, reader.value())
+                    reader.skip(',')
+            else:
+                reader.value()
+
+            reader.skip(',')
+
+
+def _list_recordings(session: Transport) -> list:
+    return list(_iter_recordings(session))
+
+
+def _get_recording_data(session: Transport, recording_id: str) -> dict:
+    r = session.get(f"recordings/{recording_id}")
+
+    if r.status_code == 404:
+        raise OpenViduRecordingDoesNotExistsError()
+
+    r.raise_for_status()
+
+    return r.json()
+
+
+def _stop_recording(session: Transport, recording_id: str) -> dict:
+    r = session.post(f"recordings/stop/{recording_id}")
+
+    if r.status_code == 404:
+        raise OpenViduRecordingDoesNotExistsError()
+    elif r.status_code == 406:
+        raise OpenViduRecordingStatusError("The recording is still starting.")
+
+    r.raise_for_status()
+
+    return r.json()
+
+
+def _delete_recording(session: Transport, recording_id: str):
+    r = session.delete(f"recordings/{recording_id}")
+
+    if r.status_code == 404:
+        raise OpenViduRecordingDoesNotExistsError()
+    elif r.status_code == 409:
+        raise OpenViduRecordingStatusError("The recording must be stopped before deleting it.")
+
+    r.raise_for_status()
+
+
+# Notice: Frozen should be changed to True in later versions of Python3 where a nice method for custom initializer is implemented
+@dataclass(frozen=False, init=False)
+class OpenViduRecording(object):
+    """
+    This object represents an OpenVidu Recording.
+    """
+
+    id: str
+    name: str
+    session_id: str
+    created_at: datetime
+    output_mode: str
+    has_audio: bool
+    has_video: bool
+    resolution: Optional[str]
+    recording_layout: Optional[str]
+    custom_layout: Optional[str]
+    size: int
+    duration: float
+    url: Optional[str]
+    status: str
+    is_valid: bool
+
+    def _update_from_data(self, data: dict):
+        self.id = data['id']
+        self.name = data['name']
+        self.session_id = data['sessionId']
+        self.created_at = datetime.utcfromtimestamp(data['createdAt'] / 1000.0)
+        self.output_mode = data['outputMode']
+        self.has_audio = data['hasAudio']
+        self.has_video = data['hasVideo']
+        self.resolution = data.get('resolution')
+        self.recording_layout = data.get('recordingLayout')
+        self.custom_layout = data.get('customLayout')
+        self.size = data['size']
+        self.duration = data['duration']
+        self.url = data.get('url')
+        self.status = data['status']  # starting, started, stopped, ready or failed
+        self.is_valid = True
+
+    def __init__(self, session: Transport, data: dict):
+        """
+        Direct instantiation of this class is not supported!
+        Use `OpenVidu.get_recording` or `OpenVidu.start_recording` to get an instance of this class.
+        """
+
+        self._session = session
+        self._update_from_data(data)
+        self._last_fetch_result = data
+
+    def fetch(self) -> bool:
+        """
+        Updates every property of the recording object.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#get-openviduapirecordingsltrecording_idgt
+
+        :return: True if the OpenViduRecording status has changed with respect to the server, False if not.
+        """
+        if not self.is_valid:
+            raise OpenViduRecordingDoesNotExistsError()
+
+        try:
+            new_data = _get_recording_data(self._session, self.id)
+        except OpenViduRecordingDoesNotExistsError:
+            self.is_valid = False
+            raise
+
+        is_changed = new_data != self._last_fetch_result
+
+        if is_changed:
+            self._update_from_data(new_data)
+            self._last_fetch_result = new_data
+
+        return is_changed
+
+    def stop(self):
+        """
+        Stops the recording. The properties of the object are updated with the response of the server.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#post-openviduapirecordingsstopltrecording_idgt
+        """
+        if not self.is_valid:
+            raise OpenViduRecordingDoesNotExistsError()
+
+        try:
+            new_data = _stop_recording(self._session, self.id)
+        except OpenViduRecordingDoesNotExistsError:
+            self.is_valid = False
+            raise
+
+        self._update_from_data(new_data)
+        self._last_fetch_result = new_data
+
+    def delete(self):
+        """
+        Deletes the recording and its files from the server. Further calls to this object will fail.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#delete-openviduapirecordingsltrecording_idgt
+        """
+        if not self.is_valid:
+            raise OpenViduRecordingDoesNotExistsError()
+
+        try:
+            _delete_recording(self._session, self.id)
+        except OpenViduRecordingDoesNotExistsError:
+            self.is_valid = False
+            raise
+
+        self.is_valid = False
+
+    def download(self, target: Union[str, os.PathLike, BinaryIO], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 resume: bool = True, parallel: int = 1) -> int:
+        """
+        Downloads the recorded file. The file is streamed in chunks, so the memory usage is constant
+        regardless of the size of the recording.
+
+        The `url` property is only available when the `status` of the recording is `ready`,
+        call `fetch()` to update it if needed.
+
+        :param target: A path to save the file to, or a writable binary file-like object.
+        :param chunk_size: Size of the chunks in bytes the file is transferred in.
+        :param resume: If `target` is a path to a partially downloaded file, continue downloading from its end
+            using a HTTP Range request instead of starting over.
+        :param parallel: Number of parallel ranged requests to download the file with. Only used when `target`
+            is a path and the size of the recording is known. Parallel downloads always start from scratch,
+            and are written to `target` + '.part', which is renamed to `target` when every range is downloaded.
+        :return: The number of bytes transferred.
+        """
+        if not self.is_valid:
+            raise OpenViduRecordingDoesNotExistsError()
+
+        if not self.url:
+            raise OpenViduRecordingStatusError("The recording is not ready to be downloaded.")
+
+        if chunk_size <= 0 or parallel <= 0:
+            raise ValueError("chunk_size and parallel must be positive")
+
+        if not isinstance(target, (str, os.PathLike)):
+            return self._download_stream(target, 0, chunk_size)
+
+        if parallel > 1 and self.size:
+            return self._download_parallel(target, chunk_size, parallel)
+
+        offset = 0
+        if resume and os.path.exists(target):
+            offset = os.path.getsize(target)
+            if self.size and offset >= self.size:
+                return 0  # Already downloaded
+
+        with open(target, 'ab' if offset else 'wb') as f:
+            return self._download_stream(f, offset, chunk_size)
+
+    def _download_stream(self, f: BinaryIO, offset: int, chunk_size: int) -> int:
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+        with self._session.get(self.url, headers=headers, stream=True) as r:
+            if r.status_code == 404:
+                raise OpenViduRecordingDoesNotExistsError()
+
+            r.raise_for_status()
+
+            if offset and r.status_code != 206:
+                # The server ignored the range request, so the whole file is being sent
+                f.seek(0)
+                f.truncate()
+
+            transferred = 0
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                transferred += len(chunk)
+                check_deadline()  # The timeout of the request limits the wait for each chunk only
+
+        return transferred
+
+    def _download_range(self, target: Union[str, os.PathLike], start: int, end: int, chunk_size: int) -> int:
+        with self._session.get(self.url, headers={'Range': f'bytes={start}-{end}'}, stream=True) as r:
+            if r.status_code == 404:
+                raise OpenViduRecordingDoesNotExistsError()
+
+            r.raise_for_status()
+
+            if r.status_code != 206:
+                raise OpenViduRecordingError("The server does not support ranged downloads.")
+
+            transferred = 0
+            with open(target, 'r+b') as f:
+                f.seek(start)
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+                    transferred += len(chunk)
+                    check_deadline()
+
+        return transferred
+
+    def _download_parallel(self, target: Union[str, os.PathLike], chunk_size: int, parallel: int) -> int:
+        # The preallocated file has the full size from the start, so it's only moved to the target when complete.
+        # Otherwise a failed download would be mistaken for a finished one when resumed.
+        part = f"{os.fspath(target)}.part"
+        with open(part, 'wb') as f:
+            f.truncate(self.size)  # Preallocate, so every worker can write to its own region
+
+        part_size = -(-self.size // parallel)  # Ceiling division
+        ranges = [(start, min(start + part_size, self.size) - 1) for start in range(0, self.size, part_size)]
+
+        try:
+            with ThreadPoolExecutor(max_workers=parallel) as executor:
+                futures = [
+                    executor.submit(in_context(self._download_range), part, start, end, chunk_size)
+                    for start, end in ranges
+                ]
+                transferred = sum(future.result() for future in futures)
+        except BaseException:  # Removed on interrupts too
+            os.remove(part)
+            raise
+
+        os.replace(part, target)
+        return transferred
+
+
+class OpenViduRecordingCollection(object):
+    """
+    An indexed, in-memory collection of OpenViduRecording objects.
+    Lookups by session, by status and by creation date do not scan the whole collection.
+    """
+
+    def __init__(self, recordings: Iterable[OpenViduRecording] = ()):
+        """
+        Direct instantiation of this class is not supported!
+        Use `OpenVidu.fetch_recordings` to get an instance of this class.
+        """
+
+        self._by_id = {}
+        self._by_session = {}
+        self._by_status = {}
+        self._created_at_keys = []  # Sorted, parallel to _created_at_recordings
+        self._created_at_recordings = []
+
+        for recording in recordings:
+            self._by_id[recording.id] = recording
+            self._by_session.setdefault(recording.session_id, []).append(recording)
+            self._by_status.setdefault(recording.status, []).append(recording)
+
+        for recording in sorted(self._by_id.values(), key=lambda rec: rec.created_at):
+            self._created_at_keys.append(recording.created_at)
+            self._created_at_recordings.append(recording)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[OpenViduRecording]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, recording_id: str) -> bool:
+        return recording_id in self._by_id
+
+    def get(self, recording_id: str) -> OpenViduRecording:
+        """
+        Get a recording from the collection.
+
+        :param recording_id: The ID of the recording to acquire.
+        :return: An OpenViduRecording object.
+        """
+        if recording_id not in self._by_id:
+            raise OpenViduRecordingDoesNotExistsError()
+
+        return self._by_id[recording_id]
+
+    def by_session(self, session_id: str) -> List[OpenViduRecording]:
+        """
+        :param session_id: The ID of the recorded session.
+        :return: The recordings of the session.
+        """
+        return list(self._by_session.get(session_id, []))
+
+    def by_status(self, status: str) -> List[OpenViduRecording]:
+        """
+        :param status: One of `starting`, `started`, `stopped`, `ready` or `failed`.
+        :return: The recordings with the given status.
+        """
+        return list(self._by_status.get(status, []))
+
+    def created_between(self, start: Optional[datetime] = None,
+                        end: Optional[datetime] = None) -> List[OpenViduRecording]:
+        """
+        :param start: Inclusive lower bound of the creation time (UTC). None means unbounded.
+        :param end: Inclusive upper bound of the creation time (UTC). None means unbounded.
+        :return: The recordings created in the given range, ordered by their creation time.
+        """
+        low = bisect_left(self._created_at_keys, start) if start else 0
+        high = bisect_right(self._created_at_keys, end) if end else len(self._created_at_keys)
+
+        return self._created_at_recordings[low:high]
+
+    def filter(self, session_id: str = None, status: str = None, created_after: Optional[datetime] = None,
+               created_before: Optional[datetime] = None) -> List[OpenViduRecording]:
+        """
+        Get the recordings matching every given criteria. The most selective index is used as a starting point.
+
+        :param session_id: The ID of the recorded session.
+        :param status: One of `starting`, `started`, `stopped`, `ready` or `failed`.
+        :param created_after: Inclusive lower bound of the creation time (UTC).
+        :param created_before: Inclusive upper bound of the creation time (UTC).
+        :return: The matching recordings, ordered by their creation time.
+        """
+        candidates = [self.created_between(created_after, created_before)]
+        if session_id is not None:
+            candidates.append(self._by_session.get(session_id, []))
+        if status is not None:
+            candidates.append(self._by_status.get(status, []))
+
+        def matches(recording: OpenViduRecording) -> bool:
+            return (session_id is None or recording.session_id == session_id) and \
+                (status is None or recording.status == status) and \
+                (created_after is None or recording.created_at >= created_after) and \
+                (created_before is None or recording.created_at <= created_before)
+
+        result = [recording for recording in min(candidates, key=len) if matches(recording)]
+        return sorted(result, key=lambda rec: rec.created_at)
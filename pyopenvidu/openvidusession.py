@@ -1,11 +1,31 @@
 """OpenViduSession class."""
-from typing import List, Optional
+from typing import List, Optional, Iterator, AsyncIterator, Callable, Iterable, Union, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-from requests_toolbelt.sessions import BaseUrlSession
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from .deadline import deadline, in_context
 from .exceptions import OpenViduSessionDoesNotExistsError, OpenViduConnectionDoesNotExistsError, OpenViduError
 from .openviduconnection import OpenViduConnection, OpenViduWEBRTCConnection, OpenViduIPCAMConnection
+from .singleflight import coalesced_get
+from .transport import Transport
+from .openvidurecording import OpenViduRecording, _start_recording, _iter_recordings
+from .query import ConnectionIndex
+
+
+@dataclass
+class IPCAMConnectionResult(object):
+    """
+    The outcome of creating the connection of a camera with `OpenViduSession.create_ipcam_connections()`.
+    """
+    camera: Union[str, dict]  # As it was given
+    connection: Optional[OpenViduIPCAMConnection] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 @dataclass(frozen=False, init=False)
@@ -42,9 +62,14 @@ class OpenViduSession(object):
                 self.__get_proper_connection_type(connection_info)
             )
         self.connections = connections
+
+        previous_index = getattr(self, '_connection_index', None)
+        self._connection_index = ConnectionIndex(connections)
+        if previous_index is not None and previous_index._parent is not None:  # Fetched in place
+            previous_index._parent.attach(self.id, self._connection_index)
         self.is_valid = True
 
-    def __init__(self, session: BaseUrlSession, data: dict):
+    def __init__(self, session: Transport, data: dict):
         """
         Direct instantiation of this class is not supported!
         Use `OpenVidu.get_session` to get an instance of this class.
@@ -55,6 +80,12 @@ class OpenViduSession(object):
         self.__update_from_data(data)
         self._last_fetch_result = data
 
+    def _is_unchanged_since_fetch(self, data: dict) -> bool:
+        # Also false if connections were created or invalidated locally since the last fetch
+        return self.is_valid and data == self._last_fetch_result and \
+            len(self.connections) == len(data['connections']['content']) and \
+            all(connection.is_valid for connection in self.connections)
+
     def fetch(self):
         """
         Updates every property of the OpenViduSession with the current status it has in OpenVidu Server.
@@ -65,19 +96,23 @@ class OpenViduSession(object):
             This applies to any property or sub-property of the object
         """
 
-        r = self._session.get(f"sessions/{self.id}")
+        if self._session.negative_cache.lookup(('session', self.id)) is not None:
+            self.is_valid = False
+            raise OpenViduSessionDoesNotExistsError()
+
+        r, new_data = coalesced_get(self._session, f"sessions/{self.id}", self._session.fetch_params)
 
         if r.status_code == 404:
             self.is_valid = False
+            self._session.negative_cache.add(('session', self.id))
             raise OpenViduSessionDoesNotExistsError()
 
         r.raise_for_status()
 
-        new_data = r.json()
         is_changed = self._last_fetch_result != new_data
 
         if is_changed:
-            self.__update_from_data(r.json())
+            self.__update_from_data(new_data)
             self._last_fetch_result = new_data
 
         return is_changed
@@ -92,10 +127,12 @@ class OpenViduSession(object):
 
         if r.status_code == 404:
             self.is_valid = False
+            self._session.negative_cache.add(('session', self.id))
             raise OpenViduSessionDoesNotExistsError()
 
         r.raise_for_status()
         self.is_valid = False
+        self._session.negative_cache.add(('session', self.id))
 
     def get_connection(self, connection_id: str) -> OpenViduConnection:
         """
@@ -229,6 +266,7 @@ class OpenViduSession(object):
         response = self.__create_connection(parameters)
         new_connection = OpenViduWEBRTCConnection(self._session, response)
         self.connections.append(new_connection)
+        self._connection_index.add(new_connection)
         return new_connection
 
     def create_ipcam_connection(self, rtsp_uri: str, data: str = None, adaptive_bitrate: bool = None,
@@ -253,6 +291,13 @@ class OpenViduSession(object):
         if not self.is_valid:  # Fail early... and always
             raise OpenViduSessionDoesNotExistsError()
 
+        response = self.__create_connection(self.__ipcam_parameters(rtsp_uri, data, adaptive_bitrate,
+                                                                    only_play_with_subscribers, network_cache))
+        return self.__add_ipcam_connection(response)
+
+    @staticmethod
+    def __ipcam_parameters(rtsp_uri: str, data: str = None, adaptive_bitrate: bool = None,
+                           only_play_with_subscribers: bool = None, network_cache: int = None) -> dict:
         parameters = {
             "type": "IPCAM",
             "data": data,
@@ -262,13 +307,190 @@ class OpenViduSession(object):
             "networkCache": network_cache
         }
 
-        parameters = {k: v for k, v in parameters.items() if v is not None}
+        return {k: v for k, v in parameters.items() if v is not None}
 
-        response = self.__create_connection(parameters)
+    def __add_ipcam_connection(self, response: dict) -> OpenViduIPCAMConnection:
         new_connection = OpenViduIPCAMConnection(self._session, response)
         self.connections.append(new_connection)
+        self._connection_index.add(new_connection)
         return new_connection
 
+    def _post_ipcam_connection(self, camera: Union[str, dict], timeout: Optional[float]) -> Tuple:
+        # Runs on the worker threads, the connection objects are created by the caller (see Reconciler too)
+        options = {'rtsp_uri': camera} if isinstance(camera, str) else camera
+        try:
+            with deadline(timeout) if timeout is not None else nullcontext():
+                return camera, self.__create_connection(self.__ipcam_parameters(**options)), None
+        except (OpenViduError, Exception) as e:  # OpenViduError is derived from BaseException
+            return camera, None, e
+
+    def _ipcam_result(self, camera: Union[str, dict], response: Optional[dict],
+                      error: Optional[BaseException]) -> IPCAMConnectionResult:
+        if error is not None:
+            return IPCAMConnectionResult(camera, error=error)
+
+        return IPCAMConnectionResult(camera, connection=self.__add_ipcam_connection(response))
+
+    def create_ipcam_connections(self, cameras: Iterable[Union[str, dict]], max_workers: int = 8,
+                                 timeout: Optional[float] = None) -> Iterator[IPCAMConnectionResult]:
+        """
+        Publishes many IPCAM rtsp streams to the session concurrently.
+        The results are yielded as the connections are created, so slow cameras don't hold back the others.
+        A failing camera does not raise, its error is returned in its result.
+
+        A camera whose request timed out may still get connected by the server, call `fetch()` to find out.
+        Stopping the iteration early cancels the cameras not started yet.
+
+        :param cameras: RTSP URIs, or dicts of the arguments of `create_ipcam_connection()` (e.g. `rtsp_uri`, `data`).
+        :param max_workers: The maximum number of connections created at the same time.
+        :param timeout: The maximum time for the connection of each camera, in seconds. Default: None = No limit.
+        :return: An iterator of the results in the order of completion.
+        """
+        if not self.is_valid:  # Fail early... and always
+            raise OpenViduSessionDoesNotExistsError()
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='OpenViduIPCAM')
+        futures = []
+        try:
+            # Bound separately to each camera, a context can't be entered by multiple threads at once
+            futures = [executor.submit(in_context(self._post_ipcam_connection), camera, timeout) for camera in cameras]
+
+            for future in as_completed(futures):
+                yield self._ipcam_result(*future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    async def acreate_ipcam_connections(self, cameras: Iterable[Union[str, dict]], max_workers: int = 8,
+                                        timeout: Optional[float] = None) -> AsyncIterator[IPCAMConnectionResult]:
+        """
+        The asyncio variant of `create_ipcam_connections()`, the results are awaited without blocking the event loop.
+        See `create_ipcam_connections()` for the parameters.
+
+        :return: An async iterator of the results in the order of completion.
+        """
+        import asyncio  # Slow to import, only loaded when needed
+
+        if not self.is_valid:  # Fail early... and always
+            raise OpenViduSessionDoesNotExistsError()
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='OpenViduIPCAM')
+        futures = []
+        try:
+            futures = [
+                loop.run_in_executor(executor, in_context(self._post_ipcam_connection), camera, timeout)
+                for camera in cameras
+            ]
+
+            for future in asyncio.as_completed(futures):
+                yield self._ipcam_result(*await future)
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)  # Don't block the event loop, the started requests finish on their own
+
+    def start_recording(self, name: str = None, output_mode: str = None, has_audio: bool = None,
+                        has_video: bool = None, resolution: str = None, recording_layout: str = None,
+                        custom_layout: str = None) -> OpenViduRecording:
+        """
+        Starts the recording of the session.
+        The `is_being_recorded` property is not updated until `fetch()` is called.
+
+        https://docs.openvidu.io/en/2.16.0/reference-docs/REST-API/#post-openviduapirecordingsstart
+
+        :param name: The name you want to give to the video file.
+        :param output_mode: COMPOSED (default) or INDIVIDUAL
+        :param has_audio: Whether to record audio or not.
+        :param has_video: Whether to record video or not.
+        :param resolution: The resolution of the recorded video file, like `1920x1080`.
+        :param recording_layout: The layout to use in COMPOSED recordings.
+        :param custom_layout: Relative path to the index.html file of a custom layout.
+        :return: The created OpenViduRecording instance.
+        """
+
+        if not self.is_valid:  # Fail early... and always
+            raise OpenViduSessionDoesNotExistsError()
+
+        try:
+            return _start_recording(self._session, self.id, name, output_mode, has_audio, has_video, resolution,
+                                    recording_layout, custom_layout)
+        except OpenViduSessionDoesNotExistsError:
+            self.is_valid = False
+            raise
+
+    def stop_recording(self) -> List[OpenViduRecording]:
+        """
+        Stops every ongoing recording of the session.
+        The `is_being_recorded` property is not updated until `fetch()` is called.
+
+        :return: The list of the stopped OpenViduRecording instances.
+        """
+
+        if not self.is_valid:  # Fail early... and always
+            raise OpenViduSessionDoesNotExistsError()
+
+        stopped = list(self.iter_recordings('started'))
+        for recording in stopped:
+            recording.stop()
+
+        return stopped
+
+    def list_recordings(self) -> List[OpenViduRecording]:
+        """
+        Get a list of every recording of this session available on the server.
+        Using this function will always result an API call to the backend.
+
+        :return: A list of OpenViduRecording objects.
+        """
+
+        return list(self.iter_recordings())
+
+    def iter_recordings(self, status: str = None) -> Iterator[OpenViduRecording]:
+        """
+        Iterate over the recordings of this session available on the server.
+        The response is parsed incrementally, so only the recording being yielded is held in memory.
+        Using this function will always result an API call to the backend.
+
+        :param status: Only yield recordings with this status.
+        :return: An iterator of OpenViduRecording objects.
+        """
+
+        for recording in _iter_recordings(self._session):
+            if recording.session_id == self.id and (status is None or recording.status == status):
+                yield recording
+
+    def query_connections(self, role: str = None, type_: str = None, platform: str = None, server_data: str = None,
+                          has_publishers: bool = None, created_after: datetime = None, created_before: datetime = None,
+                          predicate: Optional[Callable[[OpenViduConnection], bool]] = None) -> List[OpenViduConnection]:
+        """
+        Find the valid connections of this session matching every given filter.
+        The filters are resolved using indexes maintained when the session is fetched, no API call is made.
+
+        :param role: Only connections with this role (WEBRTC connections only).
+        :param type_: Only connections of this type: WEBRTC or IPCAM.
+        :param platform: Only connections from this platform.
+        :param server_data: Only connections having exactly this server data.
+        :param has_publishers: Only connections that are (True) or are not (False) publishing.
+        :param created_after: Only connections created at or after this time (naive UTC, as `created_at`).
+        :param created_before: Only connections created at or before this time (naive UTC, as `created_at`).
+        :param predicate: A function called with every matching connection, to filter by non-indexed attributes.
+        :return: A list of OpenViduConnection objects.
+        """
+
+        filters = {
+            'role': role,
+            'type': type_,
+            'platform': platform,
+            'server_data': server_data,
+            'has_publishers': has_publishers
+        }
+
+        filters = {k: v for k, v in filters.items() if v is not None}
+
+        return self._connection_index.query(predicate, created_after, created_before, **filters)
+
     @property
     def connection_count(self) -> int:
         """
@@ -1,8 +1,10 @@
 """OpenViduSubscriber class."""
-from requests_toolbelt.sessions import BaseUrlSession
+from typing import Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+from .transport import Transport
+
 
 # Notice: Frozen should be changed to True in later versions of Python3 where a nice method for custom initializer is implemented
 @dataclass(frozen=False, init=False)
@@ -10,8 +12,9 @@ class OpenViduSubscriber(object):
     session_id: str
     stream_id: str
     created_at: datetime
+    webrtc_stats: Optional[dict]
 
-    def __init__(self, session: BaseUrlSession, session_id: str, data: dict):
+    def __init__(self, session: Transport, session_id: str, data: dict):
         """
         Direct instantiation of this class is not supported!
         Use `OpenViduConnection.subscribers` to get an instance of this class.
@@ -21,3 +24,5 @@ class OpenViduSubscriber(object):
         self.session_id = session_id
         self.stream_id = data['streamId']
         self.created_at = datetime.utcfromtimestamp(data['createdAt'] / 1000.0)
+        # Everything else is WebRTC information, sent only when requested by the `webrtc_stats` option of OpenVidu
+        self.webrtc_stats = {k: v for k, v in data.items() if k not in ('streamId', 'createdAt')} or None
@@ -0,0 +1,232 @@
+"""Session placement strategies for OpenViduCluster."""
+from bisect import bisect
+from hashlib import md5
+from threading import Lock
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union
+
+from .openvidu import OpenVidu
+from .openvidusession import OpenViduSession
+
+
+class PlacementStrategy(object):
+    """
+    Base class of the strategies deciding which server of an `OpenViduCluster` should host a new session.
+    """
+
+    def select(self, servers: Dict[str, OpenVidu], custom_session_id: Optional[str] = None) -> str:
+        """
+        Select a server for a new session.
+
+        :param servers: The servers of the cluster by their name.
+        :param custom_session_id: The custom session id requested by the caller, if any.
+        :return: The name of the selected server.
+        """
+        raise NotImplementedError()
+
+
+class LeastConnectionsPlacement(PlacementStrategy):
+    """
+    Places new sessions on the server having the least connections according to the cached state of the servers.
+    Ties are broken by the number of sessions.
+    """
+
+    def select(self, servers: Dict[str, OpenVidu], custom_session_id: Optional[str] = None) -> str:
+        def load(name: str) -> Tuple[int, int]:
+            sessions = servers[name].sessions
+            return sum(session.connection_count for session in sessions), len(sessions)
+
+        return min(servers, key=load)
+
+
+class ConsistentHashPlacement(PlacementStrategy):
+    """
+    Places new sessions by consistent hashing of their custom session id, so the same id always maps to the same
+    server, and adding or removing a server only moves a small portion of the ids.
+    Sessions without a custom session id are placed by the `fallback` strategy.
+    """
+
+    def __init__(self, replicas: int = 100, fallback: Optional[PlacementStrategy] = None):
+        """
+        :param replicas: Number of points each server occupies on the hash ring. More points mean more even spread.
+        :param fallback: Strategy used for sessions without a custom session id.
+            Default: LeastConnectionsPlacement.
+        """
+        self.replicas = replicas
+        self.fallback = fallback or LeastConnectionsPlacement()
+
+        self._ring = ((), [], [])  # server names, sorted hashes and the names parallel to them
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(md5(key.encode()).digest()[:8], 'big')
+
+    def _build_ring(self, names: Tuple[str, ...]):
+        ring = sorted((self._hash(f"{name}#{i}"), name) for name in names for i in range(self.replicas))
+        # Replaced in one step, so concurrent callers never see a half-built ring
+        self._ring = (names, [key for key, _ in ring], [name for _, name in ring])
+
+    def select(self, servers: Dict[str, OpenVidu], custom_session_id: Optional[str] = None) -> str:
+        if not custom_session_id:
+            return self.fallback.select(servers, custom_session_id)
+
+        names = tuple(sorted(servers))
+        if names != self._ring[0]:
+            self._build_ring(names)
+
+        _, ring_keys, ring_names = self._ring
+        return ring_names[bisect(ring_keys, self._hash(custom_session_id)) % len(ring_keys)]
+
+
+@dataclass
+class ServerLoad(object):
+    """
+    The estimated load of a server, as tracked by `LoadAwarePlacement`.
+    """
+
+    publishers: int = 0
+    subscribers: int = 0
+    bandwidth_kbps: float = 0.0  # Bandwidth allowed for the streams by the server config and the kurento options
+    pending_kbps: float = 0.0  # Estimated bandwidth of the sessions placed since the last change of the server
+
+    _generation: int = field(default=-1, repr=False)
+    _sessions: dict = field(default_factory=dict, repr=False)  # session id:(fetched data, pubs, subs, kbps)
+
+
+class LoadAwarePlacement(PlacementStrategy):
+    """
+    Places new sessions on the server with the most bandwidth headroom.
+
+    The load of a server is estimated from the publishers and subscribers of its sessions, each counted with the
+    maximum bandwidth allowed for them (kurento options of the connection, or the `OPENVIDU_STREAMS_VIDEO_*` values
+    of the server config). The estimates are updated incrementally: only the sessions that changed since the last
+    fetch of a server are counted again, and nothing is done between fetches. The config of a server is read with
+    `get_cached_config()`, so it's requested again only after the `config_ttl` of the server expired, and an expired
+    config is still used for `config_stale_ttl` seconds while it's refreshed in the background. Placement decisions
+    cause no other REST calls.
+    """
+
+    def __init__(self, capacity_kbps: Union[float, Dict[str, float]] = 1000000.0,
+                 new_session_kbps: Optional[float] = None, unconstrained_kbps: float = 10000.0):
+        """
+        :param capacity_kbps: The bandwidth a server can handle in kbps, or a dict of them by server name.
+        :param new_session_kbps: The bandwidth a new session is expected to use, until it shows up in a fetch.
+            Default: One participant with the maximum send and receive bandwidth of the server config.
+        :param unconstrained_kbps: The bandwidth counted for a stream if its bandwidth is unconstrained (0).
+        """
+        self.capacity_kbps = capacity_kbps
+        self.new_session_kbps = new_session_kbps
+        self.unconstrained_kbps = unconstrained_kbps
+
+        self._loads = {}  # server name:ServerLoad
+        self._lock = Lock()
+
+    def _capacity(self, name: str) -> float:
+        if isinstance(self.capacity_kbps, dict):
+            return self.capacity_kbps[name]
+
+        return self.capacity_kbps
+
+    def _bandwidth_limits(self, server: OpenVidu) -> Tuple[float, float]:
+        config = server.get_cached_config()
+        return (config.get('OPENVIDU_STREAMS_VIDEO_MAX_SEND_BANDWIDTH') or self.unconstrained_kbps,
+                config.get('OPENVIDU_STREAMS_VIDEO_MAX_RECV_BANDWIDTH') or self.unconstrained_kbps)
+
+    def _session_load(self, session: OpenViduSession, send_kbps: float, recv_kbps: float) -> Tuple[int, int, float]:
+        publishers = subscribers = 0
+        kbps = 0.0
+
+        for connection in session.connections:
+            options = getattr(connection, 'kurento_options', None) or {}  # Only WEBRTC connections have this
+            connection_send = options.get('videoMaxSendBandwidth', send_kbps) or self.unconstrained_kbps
+            connection_recv = options.get('videoMaxRecvBandwidth', recv_kbps) or self.unconstrained_kbps
+
+            publishers += connection.publisher_count
+            subscribers += connection.subscriber_count
+            kbps += connection.publisher_count * connection_send + connection.subscriber_count * connection_recv
+
+        return publishers, subscribers, kbps
+
+    def _update(self, name: str, server: OpenVidu, limits: Tuple[float, float]) -> ServerLoad:
+        load = self._loads.setdefault(name, ServerLoad())
+
+        if load._generation == server._fetch_generation:
+            return load  # Nothing changed since the last update
+
+        send_kbps, recv_kbps = limits
+        sessions = {}
+
+        for session in server.sessions:
+            known = load._sessions.get(session.id)
+            # The fetched data of a session is replaced whenever it changes, even if the session is updated in place
+            if known and known[0] is session._last_fetch_result:
+                sessions[session.id] = known
+                continue
+
+            if known:
+                load.publishers -= known[1]
+                load.subscribers -= known[2]
+                load.bandwidth_kbps -= known[3]
+
+            publishers, subscribers, kbps = self._session_load(session, send_kbps, recv_kbps)
+            load.publishers += publishers
+            load.subscribers += subscribers
+            load.bandwidth_kbps += kbps
+            sessions[session.id] = (session._last_fetch_result, publishers, subscribers, kbps)
+
+        for session_id, known in load._sessions.items():
+            if session_id not in sessions:  # Gone
+                load.publishers -= known[1]
+                load.subscribers -= known[2]
+                load.bandwidth_kbps -= known[3]
+
+        load._sessions = sessions
+        load._generation = server._fetch_generation
+        load.pending_kbps = 0.0  # The placed sessions are now part of the fetched state
+        return load
+
+    def load(self, name: str, server: OpenVidu) -> ServerLoad:
+        """
+        Get the estimated load of a server.
+
+        :param name: The name of the server.
+        :param server: The OpenVidu object of the server.
+        :return: The ServerLoad of the server.
+        """
+        limits = self._bandwidth_limits(server)  # May request the config, the other servers are not blocked by it
+
+        with self._lock:
+            return self._update(name, server, limits)
+
+    def score(self, name: str, server: OpenVidu) -> float:
+        """
+        Get the free bandwidth ratio of a server. Higher is better, negative means overloaded.
+
+        :param name: The name of the server.
+        :param server: The OpenVidu object of the server.
+        :return: The score of the server.
+        """
+        return self._score(name, self.load(name, server))
+
+    def _score(self, name: str, load: ServerLoad) -> float:
+        return 1.0 - (load.bandwidth_kbps + load.pending_kbps) / self._capacity(name)
+
+    def select(self, servers: Dict[str, OpenVidu], custom_session_id: Optional[str] = None) -> str:
+        # Read before taking the lock, as an expired config is requested again
+        limits = {name: self._bandwidth_limits(server) for name, server in servers.items()}
+
+        with self._lock:
+            best_name, best_score = None, None
+
+            for name, server in servers.items():
+                score = self._score(name, self._update(name, server, limits[name]))
+
+                if best_score is None or score > best_score:
+                    best_name, best_score = name, score
+
+            if self.new_session_kbps is None:
+                self._loads[best_name].pending_kbps += sum(limits[best_name])
+            else:
+                self._loads[best_name].pending_kbps += self.new_session_kbps
+
+            return best_name
@@ -0,0 +1,239 @@
+"""Creating the sessions of scheduled meetings ahead of time."""
+import time
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from threading import BoundedSemaphore, Event, Lock, Thread
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .exceptions import OpenViduError
+from .openvidusession import OpenViduSession
+
+
+@dataclass
+class ScheduledSession(object):
+    """
+    A session to create before the start of its meeting.
+    """
+    custom_session_id: str
+    start_time: Union[datetime, float]  # Naive datetimes are in UTC (as `created_at`), floats are UNIX timestamps
+    media_mode: Optional[str] = None
+
+    @property
+    def start_timestamp(self) -> float:
+        if isinstance(self.start_time, datetime):
+            start_time = self.start_time
+            if start_time.tzinfo is None:
+                start_time = start_time.replace(tzinfo=timezone.utc)
+            return start_time.timestamp()
+
+        return float(self.start_time)
+
+
+class _Provision(object):
+    def __init__(self, scheduled: ScheduledSession, planned_at: float):
+        self.scheduled = scheduled
+        self.planned_at = planned_at  # time.time() of the planned creation
+        self.started = False
+        self.done = Event()
+        self.session = None
+        self.error = None
+
+
+def plan_creations(schedule: Iterable[ScheduledSession], rate: float,
+                   min_lead: float) -> List[Tuple[float, ScheduledSession]]:
+    """
+    Plan the creation times of the sessions, so at most `rate` sessions are created per second, and every session
+    is created at least `min_lead` seconds before its start. Sessions starting at the same time are spread out
+    backwards from their start, instead of being created at once.
+
+    :param schedule: The sessions to create.
+    :param rate: The maximum number of sessions created per second.
+    :param min_lead: The minimum time between the creation and the start of the sessions, in seconds.
+    :return: (planned creation time, session) pairs ordered by the planned time. Some times may be in the past.
+    """
+    interval = 1.0 / rate
+    planned = []
+    next_time = float('inf')
+    for scheduled in sorted(schedule, key=lambda s: s.start_timestamp, reverse=True):
+        next_time = min(scheduled.start_timestamp - min_lead, next_time - interval)
+        planned.append((next_time, scheduled))
+
+    planned.reverse()
+    return planned
+
+
+class SessionProvisioner(object):
+    """
+    Creates the sessions of scheduled meetings ahead of time, as a steady trickle of requests instead of a spike
+    at the start of the meetings, and hands out the created `OpenViduSession` objects when they start.
+
+    The creations are planned backwards from the start times with at most `rate` creations per second, and run
+    on at most `max_concurrency` threads. Sessions are created with `OpenVidu.get_or_create_session()`,
+    so sessions that already exist on the server are reused.
+
+    Note that OpenVidu Server closes the sessions without participants after `OPENVIDU_SESSIONS_GARBAGE_THRESHOLD`
+    seconds, so sessions should not be created earlier than that before their start.
+    """
+
+    def __init__(self, openvidu, schedule: Iterable[Union[ScheduledSession, tuple]], rate: float = 10.0,
+                 max_concurrency: int = 4, min_lead: float = 60.0):
+        """
+        :param openvidu: The OpenVidu object to create the sessions with.
+        :param schedule: The sessions to create, as ScheduledSession objects or
+            (custom_session_id, start_time, media_mode) tuples. The media mode is optional.
+        :param rate: The maximum number of sessions created per second.
+        :param max_concurrency: The maximum number of creations in flight at the same time.
+        :param min_lead: Every session is created at least this many seconds before its start, if possible.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self._openvidu = openvidu
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.min_lead = min_lead
+
+        scheduled = [item if isinstance(item, ScheduledSession) else ScheduledSession(*item) for item in schedule]
+        self._provisions: Dict[str, _Provision] = {}
+        self._plan: List[_Provision] = []
+        for planned_at, item in plan_creations(scheduled, rate, min_lead):
+            provision = _Provision(item, planned_at)
+            self._provisions[item.custom_session_id] = provision
+            self._plan.append(provision)
+
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    @property
+    def errors(self) -> Dict[str, BaseException]:
+        """
+        The errors of the failed creations by custom session id. `get()` tries to create these sessions again.
+        """
+        with self._lock:
+            return {
+                session_id: provision.error for session_id, provision in self._provisions.items()
+                if provision.error is not None
+            }
+
+    @property
+    def pending(self) -> int:
+        """
+        The number of sessions not created (or failed) yet.
+        """
+        return sum(not provision.done.is_set() for provision in self._plan)
+
+    def start(self):
+        """
+        Starts creating the sessions on a background thread.
+        """
+        if self._thread is not None:
+            return
+
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='SessionProvisioner', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops creating sessions. Creations already in flight are finished.
+        """
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every session is created (or failed).
+
+        :param timeout: The maximum time to wait in seconds. Default: None = No limit.
+        :return: True if every creation finished.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for provision in self._plan:
+            left = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not provision.done.wait(left):
+                return False
+
+        return True
+
+    def _run(self):
+        slots = BoundedSemaphore(self.max_concurrency)
+        interval = 1.0 / self.rate
+        next_allowed = 0.0  # monotonic() time of the next creation allowed by the rate
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='SessionProvisioner') as executor:
+            for provision in self._plan:
+                # Sessions planned in the past (e.g. when started late) still follow the rate
+                delay = max(provision.planned_at - time.time(), next_allowed - time.monotonic())
+                if delay > 0 and self._stop.wait(delay):
+                    return
+
+                while not slots.acquire(timeout=0.1):
+                    if self._stop.is_set():
+                        return
+
+                with self._lock:
+                    if provision.started:  # Created by get() in the meantime
+                        slots.release()
+                        continue
+                    provision.started = True
+
+                next_allowed = time.monotonic() + interval
+                executor.submit(self._create, provision, slots)
+
+    def _create(self, provision: _Provision, slots: Optional[BoundedSemaphore] = None):
+        scheduled = provision.scheduled
+        try:
+            session = self._openvidu.get_or_create_session(scheduled.custom_session_id, scheduled.media_mode)
+        except (OpenViduError, Exception) as e:  # OpenViduError is derived from BaseException
+            with self._lock:
+                provision.error = e
+        else:
+            with self._lock:
+                provision.session = session
+                provision.error = None
+        finally:
+            provision.done.set()
+            if slots is not None:
+                slots.release()
+
+    def get(self, custom_session_id: str, timeout: Optional[float] = None) -> OpenViduSession:
+        """
+        Get the session of a scheduled meeting. If its creation is in flight, it's waited for.
+        If it was not created yet, or its creation failed, it's created now.
+
+        :param custom_session_id: The id of the session.
+        :param timeout: The maximum time to wait for a creation in flight, before creating the session directly.
+        :return: The OpenViduSession instance.
+        """
+        provision = self._provisions[custom_session_id]
+
+        with self._lock:
+            started = provision.started
+            provision.started = True  # The background thread skips it, if not started yet
+
+        if started:
+            provision.done.wait(timeout)
+            with self._lock:
+                if provision.session is not None:
+                    return provision.session
+
+        # get_or_create_session() is single-flighted, so a creation still in flight is shared
+        provision.done.clear()
+        self._create(provision)
+        if provision.error is not None:
+            raise provision.error
+
+        return provision.session
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,234 @@
+"""Indexed queries over the cached connections."""
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from itertools import count
+from typing import Callable, Iterable, List, Optional
+
+from .openviduconnection import OpenViduConnection
+
+# Attributes with an equality index. IPCAM connections have no role, they are indexed with None.
+INDEXED_ATTRIBUTES = ('type', 'role', 'platform', 'server_data', 'has_publishers')
+
+
+def _index_keys(connection: OpenViduConnection) -> dict:
+    return {
+        'type': connection.type,
+        'role': getattr(connection, 'role', None),
+        'platform': connection.platform,
+        'server_data': connection.server_data,
+        'has_publishers': bool(connection.publishers),
+    }
+
+
+class ConnectionIndex(object):
+    """
+    Secondary indexes of the connections of a session.
+
+    The index is built when the session is fetched, and updated when a connection is created through the session
+    or fetched on its own, so queries only look at the connections matching their most selective filter.
+    """
+
+    def __init__(self, connections: Iterable[OpenViduConnection] = ()):
+        """
+        :param connections: The connections to index.
+        """
+        self._sequence = count()
+        self._entries = {}  # id of the connection:(order, connection, index keys)
+        self._buckets = {attribute: {} for attribute in INDEXED_ATTRIBUTES}  # attribute:{value:{id:connection}}
+        self._created_at = []  # sorted (created_at, order, id of the connection)
+        self._parent = None  # The SessionIndex of the client, set when attached
+        self._session_id = None
+
+        for connection in connections:
+            self.add(connection)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, connection: OpenViduConnection):
+        """
+        Add a connection to the index. The connection updates the index when it's fetched and its data changes.
+
+        :param connection: The connection to add.
+        """
+        order = next(self._sequence)
+        keys = _index_keys(connection)
+
+        for attribute, value in keys.items():
+            self._buckets[attribute].setdefault(value, {})[id(connection)] = connection
+
+        insort(self._created_at, (connection.created_at, order, id(connection)))
+        self._entries[id(connection)] = (order, connection, keys)
+        connection._index = self
+
+        if self._parent is not None:
+            self._parent._count(self._session_id, keys, 1)
+
+    def update(self, connection: OpenViduConnection):
+        """
+        Re-index a connection after its data changed.
+
+        :param connection: The changed connection.
+        """
+        order, _, keys = self._entries[id(connection)]
+        new_keys = _index_keys(connection)
+
+        for attribute, value in keys.items():
+            if new_keys[attribute] != value:
+                bucket = self._buckets[attribute][value]
+                del bucket[id(connection)]
+                if not bucket:
+                    del self._buckets[attribute][value]
+                self._buckets[attribute].setdefault(new_keys[attribute], {})[id(connection)] = connection
+
+        self._entries[id(connection)] = (order, connection, new_keys)
+
+        if self._parent is not None:
+            changed = [attribute for attribute, value in keys.items() if new_keys[attribute] != value]
+            self._parent._count(self._session_id, {attribute: keys[attribute] for attribute in changed}, -1)
+            self._parent._count(self._session_id, {attribute: new_keys[attribute] for attribute in changed}, 1)
+
+    def query(self, predicate: Optional[Callable[[OpenViduConnection], bool]] = None,
+              created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+              **filters) -> List[OpenViduConnection]:
+        """
+        Find the valid connections matching every given filter.
+
+        :param predicate: A function called with every candidate connection, to filter by non-indexed attributes.
+        :param created_after: Only connections created at or after this time (naive UTC, as `created_at`).
+        :param created_before: Only connections created at or before this time (naive UTC, as `created_at`).
+        :param filters: Required values of the indexed attributes: type, role, platform, server_data, has_publishers.
+        :return: The matching connections in the order they were indexed.
+        """
+        unknown = set(filters) - set(INDEXED_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Unsupported filters: {', '.join(sorted(unknown))}")
+
+        candidates = None  # id of the connection:connection, None means every connection
+        for attribute, value in filters.items():
+            bucket = self._buckets[attribute].get(value, {})
+            if candidates is None or len(bucket) < len(candidates):
+                candidates = bucket
+
+        if created_after is not None or created_before is not None:
+            start = 0 if created_after is None else bisect_left(self._created_at, (created_after,))
+            end = len(self._created_at) if created_before is None else \
+                bisect_right(self._created_at, (created_before, float('inf')))
+
+            if candidates is None or end - start < len(candidates):
+                candidates = {key: self._entries[key][1] for _, _, key in self._created_at[start:end]}
+
+        if candidates is None:
+            candidates = {key: entry[1] for key, entry in self._entries.items()}
+
+        results = []
+        for key, connection in candidates.items():
+            order, _, keys = self._entries[key]
+
+            if not connection.is_valid:
+                continue
+
+            if any(keys[attribute] != value for attribute, value in filters.items()):
+                continue
+
+            if created_after is not None and connection.created_at < created_after:
+                continue
+
+            if created_before is not None and connection.created_at > created_before:
+                continue
+
+            if predicate is not None and not predicate(connection):
+                continue
+
+            results.append((order, connection))
+
+        results.sort(key=lambda result: result[0])
+        return [connection for _, connection in results]
+
+
+class SessionIndex(object):
+    """
+    Index of the sessions of a client by the indexed attributes of their connections.
+
+    The ConnectionIndex of every cached session is attached to it, and keeps it updated when a connection is added or
+    changes, so queries over every session only look at the sessions having connections matching every filter.
+    """
+
+    def __init__(self):
+        self._indexes = {}  # session id:ConnectionIndex
+        self._buckets = {attribute: {} for attribute in INDEXED_ATTRIBUTES}  # attribute:{value:{session id:count}}
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    def attach(self, session_id: str, index: ConnectionIndex):
+        """
+        Index the connections of a session, replacing the index previously attached for the same session.
+
+        :param session_id: The id of the session.
+        :param index: The ConnectionIndex of the session.
+        """
+        if self._indexes.get(session_id) is index:
+            return
+
+        self.detach(session_id)
+
+        for _, _, keys in index._entries.values():
+            self._count(session_id, keys, 1)
+
+        index._parent = self
+        index._session_id = session_id
+        self._indexes[session_id] = index
+
+    def detach(self, session_id: str):
+        """
+        Remove a session from the index. Nothing happens if it's not indexed.
+
+        :param session_id: The id of the session.
+        """
+        index = self._indexes.pop(session_id, None)
+        if index is None:
+            return
+
+        index._parent = None
+        for _, _, keys in index._entries.values():
+            self._count(session_id, keys, -1)
+
+    def clear(self):
+        """
+        Remove every session from the index.
+        """
+        for session_id in list(self._indexes):
+            self.detach(session_id)
+
+    def _count(self, session_id: str, keys: dict, delta: int):
+        for attribute, value in keys.items():
+            buckets = self._buckets[attribute]
+            bucket = buckets.setdefault(value, {})
+            remaining = bucket.get(session_id, 0) + delta
+
+            if remaining:
+                bucket[session_id] = remaining
+            else:
+                del bucket[session_id]
+                if not bucket:
+                    del buckets[value]
+
+    def candidates(self, **filters) -> Optional[List[str]]:
+        """
+        Find the sessions having connections with every given value. A session may be returned even if no single
+        connection matches every filter, the connections still have to be queried.
+
+        :param filters: Required values of the indexed attributes: type, role, platform, server_data, has_publishers.
+        :return: The ids of the sessions, or None if no filter was given.
+        """
+        unknown = set(filters) - set(INDEXED_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"Unsupported filters: {', '.join(sorted(unknown))}")
+
+        buckets = sorted((self._buckets[attribute].get(value, {}) for attribute, value in filters.items()), key=len)
+        if not buckets:
+            return None
+
+        smallest, others = buckets[0], buckets[1:]
+        return [session_id for session_id in smallest if all(session_id in bucket for bucket in others)]
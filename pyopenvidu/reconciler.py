@@ -0,0 +1,338 @@
+"""Converging the sessions and IPCAM connections of a server to a declarative desired state."""
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from .exceptions import OpenViduError, OpenViduSessionDoesNotExistsError, OpenViduConnectionDoesNotExistsError
+from .openvidusession import OpenViduSession
+from .openviduconnection import OpenViduConnection, OpenViduIPCAMConnection
+
+CREATE_SESSION = 'create_session'
+CLOSE_SESSION = 'close_session'
+CREATE_IPCAM_CONNECTION = 'create_ipcam_connection'
+FORCE_DISCONNECT = 'force_disconnect'
+
+# Applied in this order, the operations of a phase run concurrently
+_PHASES = ((FORCE_DISCONNECT, CLOSE_SESSION), (CREATE_SESSION,), (CREATE_IPCAM_CONNECTION,))
+
+# Options of DesiredCamera:attribute of OpenViduIPCAMConnection
+_CAMERA_ATTRIBUTES = {
+    'data': 'server_data',
+    'adaptive_bitrate': 'adaptive_bitrate',
+    'only_play_with_subscribers': 'only_play_with_subscribers',
+    'network_cache': 'network_cache',
+}
+
+
+@dataclass(frozen=True)
+class DesiredCamera(object):
+    """
+    An IPCAM connection that should exist. Cameras are identified by their RTSP URI within a session,
+    options left None are not compared to the existing connection.
+    """
+    rtsp_uri: str
+    data: Optional[str] = None
+    adaptive_bitrate: Optional[bool] = None
+    only_play_with_subscribers: Optional[bool] = None
+    network_cache: Optional[int] = None
+
+    def differences(self, connection: OpenViduIPCAMConnection) -> List[str]:
+        """
+        :param connection: The existing connection of the camera.
+        :return: The names of the options the connection differs in.
+        """
+        return [
+            option for option, attribute in _CAMERA_ATTRIBUTES.items()
+            if getattr(self, option) is not None and getattr(self, option) != getattr(connection, attribute)
+        ]
+
+
+@dataclass(frozen=True)
+class DesiredSession(object):
+    """
+    A session that should exist, with exactly these IPCAM connections.
+    WEBRTC connections (the participants) are never touched by the reconciler.
+    """
+    custom_session_id: str
+    media_mode: Optional[str] = None  # None = Any media mode is accepted
+    cameras: Tuple[DesiredCamera, ...] = ()  # RTSP URIs or dicts of the DesiredCamera fields are accepted too
+
+    def __post_init__(self):
+        cameras = tuple(
+            camera if isinstance(camera, DesiredCamera) else
+            DesiredCamera(camera) if isinstance(camera, str) else DesiredCamera(**camera)
+            for camera in self.cameras
+        )
+
+        if len({camera.rtsp_uri for camera in cameras}) != len(cameras):
+            raise ValueError(f"The cameras of session {self.custom_session_id} must have unique RTSP URIs")
+
+        object.__setattr__(self, 'cameras', cameras)  # Frozen
+
+
+@dataclass
+class Drift(object):
+    """
+    A difference between the desired and the cached state.
+    """
+    session_id: str
+    kind: str  # missing_session, unexpected_session, media_mode, missing_camera, unexpected_camera or camera_options
+    detail: str = ''
+
+
+@dataclass
+class Operation(object):
+    """
+    A REST call that moves the server towards the desired state.
+    """
+    action: str  # CREATE_SESSION, CLOSE_SESSION, CREATE_IPCAM_CONNECTION or FORCE_DISCONNECT
+    session_id: str
+    media_mode: Optional[str] = None  # Of CREATE_SESSION
+    camera: Optional[DesiredCamera] = None  # Of CREATE_IPCAM_CONNECTION
+    recreate: bool = False  # CLOSE_SESSION and CREATE_SESSION of a session created again with another media mode
+    target: Union[OpenViduSession, OpenViduConnection, None] = field(default=None, repr=False, compare=False)
+
+
+@dataclass
+class ReconcilePlan(object):
+    """
+    The drift found by `Reconciler.plan()` and the operations resolving it.
+    """
+    drift: List[Drift] = field(default_factory=list)
+    operations: List[Operation] = field(default_factory=list)
+
+    @property
+    def converged(self) -> bool:
+        return not self.drift
+
+
+@dataclass
+class ReconcileReport(object):
+    """
+    The outcome of `Reconciler.apply()`.
+    """
+    plan: ReconcilePlan
+    applied: List[Operation] = field(default_factory=list)
+    errors: List[Tuple[Operation, BaseException]] = field(default_factory=list)
+    skipped: List[Operation] = field(default_factory=list)  # Of sessions that could not be (re)created
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.skipped
+
+
+def _parse_spec(spec: Union[Iterable[DesiredSession], Mapping[str, dict]]) -> Dict[str, DesiredSession]:
+    if isinstance(spec, Mapping):
+        spec = [DesiredSession(session_id, **(options or {})) for session_id, options in spec.items()]
+
+    desired = {}
+    for session in spec:
+        if session.custom_session_id in desired:
+            raise ValueError(f"Session {session.custom_session_id} is in the spec multiple times")
+        desired[session.custom_session_id] = session
+
+    return desired
+
+
+class Reconciler(object):
+    """
+    Converges the sessions and IPCAM connections of an OpenVidu server to a desired state.
+
+    The desired state is diffed against the cached sessions of the `OpenVidu` object, so planning makes no
+    requests, and applying the plan makes exactly one request per difference. Sessions missing from the server
+    are created, IPCAM connections not in the spec are disconnected, and cameras whose options differ are
+    connected again. Sessions not in the spec are only closed with `prune=True`.
+
+    The spec is a list of `DesiredSession` objects, or a dict loaded from configuration::
+
+        {'lobby': {'media_mode': 'ROUTED', 'cameras': ['rtsp://10.0.0.11/stream', {'rtsp_uri': ..., 'data': ...}]}}
+    """
+
+    def __init__(self, openvidu, spec: Union[Iterable[DesiredSession], Mapping[str, dict]], max_workers: int = 8,
+                 prune: bool = False, recreate: bool = False):
+        """
+        :param openvidu: The OpenVidu object to reconcile.
+        :param spec: The desired state.
+        :param max_workers: The maximum number of operations running at the same time.
+        :param prune: Close the sessions not in the spec. Default: False = Sessions not in the spec are ignored.
+        :param recreate: Close and create again the sessions with a different media mode, which disconnects
+            their participants. Default: False = Media mode differences are only reported as drift.
+        """
+        self._openvidu = openvidu
+        self.desired = _parse_spec(spec)
+        self.max_workers = max_workers
+        self.prune = prune
+        self.recreate = recreate
+
+    def plan(self, fetch: bool = False) -> ReconcilePlan:
+        """
+        Diff the desired state against the cached state.
+
+        :param fetch: Fetch every session first, so the plan is based on the current state of the server.
+        :return: The drift and the operations resolving it.
+        """
+        if fetch:
+            self._openvidu.fetch()
+
+        plan = ReconcilePlan()
+        existing = {session.id: session for session in self._openvidu.sessions}
+
+        for session_id, desired in self.desired.items():
+            session = existing.get(session_id)
+            recreate = False
+
+            if session is not None and desired.media_mode is not None and session.media_mode != desired.media_mode:
+                plan.drift.append(Drift(session_id, 'media_mode', f"{session.media_mode} != {desired.media_mode}"))
+                if self.recreate:
+                    plan.operations.append(Operation(CLOSE_SESSION, session_id, recreate=True, target=session))
+                    session = None
+                    recreate = True
+            elif session is None:
+                plan.drift.append(Drift(session_id, 'missing_session'))
+
+            if session is None:
+                plan.operations.append(
+                    Operation(CREATE_SESSION, session_id, media_mode=desired.media_mode, recreate=recreate)
+                )
+                plan.operations.extend(
+                    Operation(CREATE_IPCAM_CONNECTION, session_id, camera=camera) for camera in desired.cameras
+                )
+                plan.drift.extend(Drift(session_id, 'missing_camera', camera.rtsp_uri) for camera in desired.cameras)
+                continue
+
+            self.__plan_cameras(plan, session, desired)
+
+        if self.prune:
+            for session_id, session in existing.items():
+                if session_id not in self.desired:
+                    plan.drift.append(Drift(session_id, 'unexpected_session'))
+                    plan.operations.append(Operation(CLOSE_SESSION, session_id, target=session))
+
+        return plan
+
+    @staticmethod
+    def __plan_cameras(plan: ReconcilePlan, session: OpenViduSession, desired: DesiredSession):
+        cameras = {camera.rtsp_uri: camera for camera in desired.cameras}
+        matched = set()
+        replaced = set()
+
+        for connection in session.connections:
+            if not isinstance(connection, OpenViduIPCAMConnection) or not connection.is_valid:
+                continue
+
+            rtsp_uri = connection.rtsp_uri
+            camera = cameras.get(rtsp_uri)
+            if camera is None or rtsp_uri in matched:  # Duplicates of a desired camera are extra too
+                plan.drift.append(Drift(session.id, 'unexpected_camera', rtsp_uri))
+                plan.operations.append(Operation(FORCE_DISCONNECT, session.id, target=connection))
+                continue
+
+            differences = camera.differences(connection)
+            if differences:
+                plan.drift.append(Drift(session.id, 'camera_options', f"{rtsp_uri}: {', '.join(differences)}"))
+                plan.operations.append(Operation(FORCE_DISCONNECT, session.id, target=connection))
+                replaced.add(rtsp_uri)
+                continue
+
+            matched.add(rtsp_uri)
+
+        for rtsp_uri, camera in cameras.items():
+            if rtsp_uri in matched:
+                continue
+
+            if rtsp_uri not in replaced:
+                plan.drift.append(Drift(session.id, 'missing_camera', rtsp_uri))
+            plan.operations.append(Operation(CREATE_IPCAM_CONNECTION, session.id, camera=camera))
+
+    def apply(self, plan: Optional[ReconcilePlan] = None) -> ReconcileReport:
+        """
+        Run the operations of a plan. Disconnections and closes run first, then the session creations, then the
+        camera connections, each phase on at most `max_workers` threads. A failing operation does not stop the
+        others, but when a session can't be created (or closed to be created again) its later operations are skipped.
+        Objects already gone from the server count as applied.
+
+        Call `OpenVidu.fetch()` afterwards to see the disconnected connections and closed sessions disappear.
+
+        :param plan: The plan to run. Default: None = A plan of the cached state is made.
+        :return: The report of the applied and failed operations.
+        """
+        if plan is None:
+            plan = self.plan()
+
+        report = ReconcileReport(plan)
+        failed_sessions = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='Reconciler') as executor:
+            for actions in _PHASES:
+                operations = []
+                for operation in plan.operations:
+                    if operation.action not in actions:
+                        continue
+                    if operation.action in (CREATE_SESSION, CREATE_IPCAM_CONNECTION) and \
+                            operation.session_id in failed_sessions:
+                        report.skipped.append(operation)
+                        continue
+                    operations.append(operation)
+
+                futures = {}
+                for operation in operations:
+                    if operation.action != CREATE_IPCAM_CONNECTION:
+                        futures[executor.submit(self.__run, operation)] = operation, None
+                        continue
+
+                    try:
+                        session = self._openvidu.get_session(operation.session_id)
+                    except OpenViduSessionDoesNotExistsError as e:
+                        report.errors.append((operation, e))
+                        continue
+
+                    # Only the request runs on the pool, the connections of a session are not thread-safe
+                    future = executor.submit(session._post_ipcam_connection, asdict(operation.camera), None)
+                    futures[future] = operation, session
+
+                for future in as_completed(futures):
+                    operation, session = futures[future]
+                    if session is None:
+                        error = future.result()
+                    else:  # The connection is created and indexed on this thread
+                        error = session._ipcam_result(*future.result()).error
+
+                    if error is None:
+                        report.applied.append(operation)
+                    else:
+                        report.errors.append((operation, error))
+                        if operation.action == CREATE_SESSION or operation.recreate:
+                            failed_sessions.add(operation.session_id)  # Its cameras would be connected twice
+
+        return report
+
+    def reconcile(self, fetch: bool = True) -> ReconcileReport:
+        """
+        Plan and apply in one step.
+
+        :param fetch: Fetch every session before planning. Default: True.
+        :return: The report of the applied and failed operations. Its plan holds the drift found.
+        """
+        return self.apply(self.plan(fetch=fetch))
+
+    def __run(self, operation: Operation) -> Optional[BaseException]:
+        try:
+            if operation.action == FORCE_DISCONNECT:
+                operation.target.force_disconnect()
+            elif operation.action == CLOSE_SESSION:
+                operation.target.close()
+            elif operation.action == CREATE_SESSION and operation.recreate:
+                # Fails if the old session survived, instead of reusing it with the other media mode
+                self._openvidu.create_session(operation.session_id, operation.media_mode)
+            elif operation.action == CREATE_SESSION:
+                self._openvidu.get_or_create_session(operation.session_id, operation.media_mode)
+            else:
+                raise ValueError(f"Unknown action: {operation.action}")
+        except (OpenViduSessionDoesNotExistsError, OpenViduConnectionDoesNotExistsError) as e:
+            if operation.action in (FORCE_DISCONNECT, CLOSE_SESSION):  # Already gone
+                return None
+            return e
+        except (OpenViduError, Exception) as e:  # OpenViduError is derived from BaseException
+            return e
+
+        return None
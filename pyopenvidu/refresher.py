@@ -0,0 +1,167 @@
+"""Background refreshing of the OpenVidu object."""
+import asyncio
+from threading import Thread, Event
+from time import monotonic
+from typing import Optional
+
+from .exceptions import OpenViduDeadlineExceededError
+from .openvidu import OpenVidu
+
+
+class AutoRefresher(object):
+    """
+    Calls `OpenVidu.fetch()` periodically on a background thread.
+
+    The interval adapts to the observed rate of changes: after a fetch with changes the next one is done after
+    `min_interval`, each fetch without changes (or failing) multiplies the interval by `backoff`,
+    up to `max_interval`. If `max_staleness` is set, the interval is further limited, so the session data read from
+    the OpenVidu object is never older than that (as long as the server is reachable).
+
+    The `sessions` property of the OpenVidu object is replaced at once by `fetch()`, so readers always see a
+    consistent state. Its age can be checked through `OpenVidu.staleness`.
+    """
+
+    def __init__(self, openvidu: OpenVidu, min_interval: float = 1.0, max_interval: float = 30.0,
+                 backoff: float = 2.0, max_staleness: Optional[float] = None):
+        """
+        :param openvidu: The OpenVidu object to refresh.
+        :param min_interval: Seconds between fetches while the sessions are changing.
+        :param max_interval: Upper limit of the seconds between fetches while nothing changes.
+        :param backoff: Factor the interval grows with after each fetch without changes.
+        :param max_staleness: Maximum age of the session data in seconds. Default: None = No limit.
+        """
+        if min_interval <= 0 or max_interval < min_interval or backoff < 1:
+            raise ValueError("0 < min_interval <= max_interval and backoff >= 1 must hold")
+
+        if max_staleness is not None and max_staleness < min_interval:
+            raise ValueError("max_staleness must not be smaller than min_interval")
+
+        self.openvidu = openvidu
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_staleness = max_staleness
+        self.last_error = None  # The exception raised by the last fetch, if it failed
+
+        self._interval = min_interval
+        self._fetch_duration = 0.0
+        self._stop = Event()
+        self._thread = None
+
+    @property
+    def interval(self) -> float:
+        """
+        :return: The current number of seconds between fetches.
+        """
+        return self._interval
+
+    def _refresh(self):
+        start = monotonic()
+
+        try:
+            changed = self.openvidu.fetch()
+            self.last_error = None
+        except (OpenViduDeadlineExceededError, Exception) as e:  # OpenViduError is derived from BaseException
+            changed = False  # Back off, so an unreachable server is not hammered
+            self.last_error = e
+
+        self._fetch_duration = monotonic() - start
+        self._update_interval(changed)
+
+    def _update_interval(self, changed: bool):
+        if changed:
+            interval = self.min_interval
+        else:
+            interval = min(self._interval * self.backoff, self.max_interval)
+
+        if self.max_staleness is not None:
+            # The data is as old as the fetch duration when it arrives
+            interval = min(interval, max(self.max_staleness - self._fetch_duration, self.min_interval))
+
+        self._interval = interval
+
+    def _run(self):
+        while True:
+            self._refresh()
+
+            if self._stop.wait(self._interval):
+                break
+
+    def start(self):
+        """
+        Starts refreshing on a background thread. The first fetch is done immediately.
+        """
+        if self._thread:
+            return
+
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='OpenViduAutoRefresher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops refreshing and waits for the background thread to finish.
+        """
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+class AsyncAutoRefresher(AutoRefresher):
+    """
+    The asyncio variant of AutoRefresher. The refreshing runs as a task of the running event loop,
+    the blocking `fetch()` calls are made in the default executor of the loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._task = None
+
+    async def _run_async(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await loop.run_in_executor(None, self._refresh)
+            await asyncio.sleep(self._interval)
+
+    def start(self):
+        """
+        Starts refreshing as a task of the running event loop. The first fetch is done immediately.
+        """
+        if self._task:
+            return
+
+        self._task = asyncio.get_running_loop().create_task(self._run_async())
+
+    async def stop(self):
+        """
+        Stops refreshing and waits for the task to finish.
+        """
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def __enter__(self):
+        raise TypeError("AsyncAutoRefresher must be used with 'async with'")
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        raise TypeError("AsyncAutoRefresher must be used with 'async with'")
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -0,0 +1,249 @@
+"""Recording and replaying the REST traffic of OpenVidu objects."""
+import os
+import gzip
+import json
+import base64
+from time import monotonic, sleep
+from functools import partial
+from threading import Lock
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Union
+
+import requests.exceptions
+
+from .exceptions import OpenViduReplayError
+from .transport import Transport, TransportResponse
+
+
+@dataclass
+class RecordedExchange(object):
+    """
+    A request and the response it got, as stored by `TrafficRecorder`.
+    """
+    offset: float  # Seconds since the start of the recording when the request was sent
+    duration: float  # Seconds until the response arrived
+    method: str
+    url: str  # Relative to the base url of the transport, if it was under it
+    params: Optional[dict]
+    json: object
+    status_code: Optional[int] = None
+    headers: dict = field(default_factory=dict)
+    body: bytes = b''
+    error: Optional[str] = None  # Name of the requests exception raised instead of a response
+
+    def _key(self) -> tuple:
+        return self.method, self.url, json.dumps(self.params, sort_keys=True), json.dumps(self.json, sort_keys=True)
+
+    def to_json(self) -> str:
+        data = {
+            'offset': round(self.offset, 6), 'duration': round(self.duration, 6), 'method': self.method,
+            'url': self.url, 'params': self.params, 'json': self.json,
+        }
+
+        if self.error is not None:
+            data['error'] = self.error
+            return json.dumps(data, separators=(',', ':'))
+
+        data['status_code'] = self.status_code
+        data['headers'] = self.headers
+        try:
+            data['body'] = self.body.decode('utf-8')
+        except UnicodeDecodeError:
+            data['body_b64'] = base64.b64encode(self.body).decode('ascii')
+
+        return json.dumps(data, separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, line: str) -> 'RecordedExchange':
+        data = json.loads(line)
+        body = base64.b64decode(data.pop('body_b64')) if 'body_b64' in data else data.pop('body', '').encode('utf-8')
+        return cls(body=body, **data)
+
+
+def read_recording(path: Union[str, os.PathLike]) -> Iterator[RecordedExchange]:
+    """
+    Read the exchanges of a recording made by `TrafficRecorder`.
+
+    :param path: The path of the recording.
+    :return: The exchanges in the order they were sent.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield RecordedExchange.from_json(line)
+
+
+class TrafficRecorder(object):
+    """
+    Records every request sent through the transport of an `OpenVidu` object with its response and timing,
+    to a gzip compressed JSON lines file. The recording can be served by `ReplayTransport`.
+
+    Bodies of streamed responses (e.g. recording downloads) are read into memory to record them.
+    Only the blocking requests are recorded, not the ones made with `AsyncTransport.arequest()`.
+    """
+
+    def __init__(self, openvidu, path: Union[str, os.PathLike]):
+        """
+        :param openvidu: The OpenVidu object (or a Transport) to record.
+        :param path: The path of the recording, overwritten if it exists.
+        """
+        self._transport: Transport = getattr(openvidu, '_session', openvidu)
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = Lock()
+        self._start = monotonic()
+        self._original_send = self._transport._send
+        self._replaced_send = vars(self._transport).get('_send')  # Set by another recorder, restored on close
+        self._transport._send = self._send  # Shared by every object created through the OpenVidu object
+
+        self.count = 0
+
+    def _relative(self, url: str) -> str:
+        base_url = self._transport.base_url
+        return url[len(base_url):] if url.startswith(base_url) else url
+
+    def _send(self, method, url, params, json, headers, stream, timeout):
+        start = monotonic()
+        exchange = RecordedExchange(start - self._start, 0.0, method, self._relative(url), params, json)
+
+        try:
+            response = self._original_send(method, url, params, json, headers, stream, timeout)
+            exchange.body = response.content  # Buffers streamed responses, they are served from memory
+        except requests.exceptions.RequestException as e:
+            exchange.duration = monotonic() - start
+            exchange.error = type(e).__name__
+            self._write(exchange)
+            raise
+
+        exchange.duration = monotonic() - start
+        exchange.status_code = response.status_code
+        exchange.headers = dict(response.headers)
+        self._write(exchange)
+
+        return response
+
+    def _write(self, exchange: RecordedExchange):
+        line = exchange.to_json()
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+                self.count += 1
+
+    def close(self):
+        """
+        Stops recording and closes the file. Nested recorders of the same transport must be closed in reverse order.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+
+            if self._replaced_send is None:
+                del self._transport._send  # Back to the method of the class
+            else:
+                self._transport._send = self._replaced_send
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ReplayTransport(Transport):
+    """
+    Serves the responses of a recording made by `TrafficRecorder` instead of sending the requests,
+    so `fetch()` and other operations can be benchmarked deterministically without a server.
+
+    A request gets the next unserved response recorded for the same method, url, parameters and body.
+    If there is none, the next one recorded for the same method and url is used, so requests with generated bodies
+    can be replayed too. `OpenViduReplayError` is raised when the recording has no more responses for the url.
+
+    Create the `OpenVidu` object with `transport=ReplayTransport.from_recording(path)`.
+    """
+
+    def __init__(self, *args, recording: Union[str, os.PathLike, List[RecordedExchange]] = (),
+                 speed: Optional[float] = 1.0, **kwargs):
+        """
+        :param recording: The path of the recording, or the exchanges read from it.
+        :param speed: The recorded latencies are divided by this. Default: 1.0 = The original latencies.
+            None = Answer every request instantly.
+        """
+        super().__init__(*args, **kwargs)
+
+        exchanges = list(read_recording(recording) if isinstance(recording, (str, os.PathLike)) else recording)
+        self.speed = speed
+
+        self._lock = Lock()
+        self._served = [False] * len(exchanges)
+        self._exchanges = exchanges
+        self._by_key = {}  # (method, url, params, body):deque of indexes of the exchanges
+        self._by_url = {}  # (method, url):deque of indexes of the exchanges
+        for index, exchange in enumerate(exchanges):
+            self._by_key.setdefault(exchange._key(), deque()).append(index)
+            self._by_url.setdefault((exchange.method, exchange.url), deque()).append(index)
+
+    @classmethod
+    def from_recording(cls, recording: Union[str, os.PathLike, List[RecordedExchange]],
+                       speed: Optional[float] = 1.0) -> Callable[..., 'ReplayTransport']:
+        """
+        :param recording: The path of the recording, or the exchanges read from it.
+        :param speed: The recorded latencies are divided by this. None = Answer every request instantly.
+        :return: The value to pass as the `transport` argument of `OpenVidu`.
+        """
+        return partial(cls, recording=recording, speed=speed)
+
+    @property
+    def remaining(self) -> int:
+        """
+        The number of recorded responses not served yet.
+        """
+        with self._lock:
+            return self._served.count(False)
+
+    def _next(self, queue: Optional[deque]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if not self._served[index]:
+                self._served[index] = True
+                return index
+
+        return None
+
+    def _take(self, method: str, url: str, params: Optional[dict], json_data) -> RecordedExchange:
+        base_url = self.base_url
+        relative = url[len(base_url):] if url.startswith(base_url) else url
+        key = RecordedExchange(0.0, 0.0, method, relative, params, json_data)._key()
+
+        with self._lock:
+            index = self._next(self._by_key.get(key))
+            if index is None:
+                index = self._next(self._by_url.get((method, relative)))
+
+        if index is None:
+            raise OpenViduReplayError(f"No recorded response left for {method} {relative}")
+
+        return self._exchanges[index]
+
+    @staticmethod
+    def _read_timeout(timeout: Union[float, tuple, None]) -> Optional[float]:
+        return timeout[1] if isinstance(timeout, tuple) else timeout
+
+    def _send(self, method, url, params, json, headers, stream, timeout):
+        exchange = self._take(method, url, params, json)
+
+        if self.speed:
+            delay = exchange.duration / self.speed
+            read_timeout = self._read_timeout(timeout)
+            if read_timeout is not None and delay > read_timeout:
+                sleep(read_timeout)
+                raise requests.exceptions.ReadTimeout(f"Replayed response took {delay:.3f}s")
+
+            sleep(delay)
+
+        if exchange.error is not None:
+            error_class = getattr(requests.exceptions, exchange.error, requests.exceptions.ConnectionError)
+            raise error_class(f"Replayed {exchange.error} for {method} {exchange.url}")
+
+        return TransportResponse(url, exchange.status_code, exchange.headers, content=exchange.body)
@@ -0,0 +1,124 @@
+"""SharedSessionCache class."""
+import os
+from threading import Thread, Event
+from typing import Union, Optional
+
+from .exceptions import OpenViduDeadlineExceededError
+from .openvidu import OpenVidu
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+
+class SharedSessionCache(object):
+    """
+    Shares the session data of an OpenVidu server between multiple processes on the same host,
+    e.g. between the workers of a web server.
+
+    One of the processes is elected as the leader using a lock file. The leader polls the server with `fetch()`,
+    and publishes the changes to a snapshot file. The other processes follow that file with
+    `OpenVidu.follow_snapshot()`, so they don't make any requests to fetch the sessions. If the leader exits,
+    one of the followers takes its place.
+
+    Place the snapshot on a memory backed filesystem (like `/dev/shm`), so publishing and reading it does not
+    touch the disk. The snapshot file is memory-mapped by the readers.
+    """
+
+    def __init__(self, openvidu: OpenVidu, path: Union[str, os.PathLike], interval: float = 1.0,
+                 leader: Optional[bool] = None):
+        """
+        :param openvidu: The OpenVidu object to share the session data of. Create it with `initial_fetch=False`.
+        :param path: The path of the snapshot file. A lock file is created next to it with a `.lock` suffix.
+        :param interval: Seconds between the polls of the leader, and between the leadership attempts of followers.
+        :param leader: Set to True or False to decide the role of the process without an election.
+            Default: None = Elect the leader using the lock file (requires `fcntl`, not available on Windows).
+        """
+        if leader is None and fcntl is None:
+            raise RuntimeError("Leader election is not supported on this platform, set the leader argument")
+
+        self.openvidu = openvidu
+        self.path = path
+        self.interval = interval
+        self.last_error = None  # The last exception raised while polling
+
+        self._elect = leader is None
+        self._is_leader = bool(leader)
+        self._lock_file = None
+        self._stop = Event()
+        self._thread = None
+
+    @property
+    def is_leader(self) -> bool:
+        """
+        :return: True if this process polls the server and publishes the snapshot.
+        """
+        return self._is_leader
+
+    def _try_become_leader(self) -> bool:
+        lock_file = open(f"{os.fspath(self.path)}.lock", 'a')
+
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file  # Kept open, the lock is held until it's closed (or the process exits)
+        return True
+
+    def _poll(self):
+        try:
+            if self.openvidu.fetch() or not os.path.exists(self.path):
+                self.openvidu.save_snapshot(self.path)
+            self.last_error = None
+        except (OpenViduDeadlineExceededError, Exception) as e:  # OpenViduError is derived from BaseException
+            self.last_error = e  # The followers keep using the last published snapshot
+
+    def _run(self):
+        while True:
+            if not self._is_leader and self._elect and self._try_become_leader():
+                self._is_leader = True
+                self.openvidu.unfollow_snapshot()
+
+            if self._is_leader:
+                self._poll()
+
+            if self._stop.wait(self.interval):
+                break
+
+    def start(self):
+        """
+        Starts polling or following on a background thread.
+        """
+        if self._thread:
+            return
+
+        if not self._is_leader:
+            self.openvidu.follow_snapshot(self.path)
+
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name='SharedSessionCache', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the background thread and gives up the leadership.
+        """
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+            self._is_leader = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
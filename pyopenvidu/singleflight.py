@@ -0,0 +1,79 @@
+"""SingleFlight class."""
+from threading import Lock, Event
+from typing import Callable, Hashable, Any, Tuple, Optional, TYPE_CHECKING
+from requests import Response
+
+from .deadline import remaining
+from .exceptions import OpenViduDeadlineExceededError
+
+if TYPE_CHECKING:
+    from .transport import Transport  # The transport module uses this one
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Deduplicates concurrent calls: while a call for a key is in flight, every other caller with the same key
+    waits for it and receives the same result (or exception) instead of doing the work again.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls = {}  # key:_Call
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Call `fn`, unless a call with the same key is already in flight, in that case wait for its result,
+        but not longer than the deadline of the caller.
+
+        :param key: Calls with equal keys are deduplicated.
+        :param fn: The function to call.
+        :return: The return value of `fn`.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if is_leader:
+            try:
+                call.result = fn()
+            except BaseException as e:  # OpenViduError is derived from BaseException
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(remaining()):  # The deadline of the follower applies to the wait
+            raise OpenViduDeadlineExceededError()
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result
+
+
+def coalesced_get(session: 'Transport', url: str, params: Optional[dict] = None) -> Tuple[Response, Any]:
+    """
+    Sends a GET request through the `single_flight` of the transport,
+    so identical requests in flight at the same time share one HTTP request and one parsed result.
+
+    :param session: The transport to send the request with.
+    :param url: The url to request.
+    :param params: Query parameters of the request.
+    :return: The response and its parsed JSON body. The body is None if the response is not successful.
+    """
+
+    def get():
+        r = session.get(url, params=params)
+        return r, r.json() if r.ok else None
+
+    return session.single_flight.do(('GET', url, tuple(sorted((params or {}).items()))), get)
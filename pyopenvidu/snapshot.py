@@ -0,0 +1,119 @@
+"""Compact binary snapshots of the session data of an OpenVidu server."""
+import os
+import json
+import mmap
+import zlib
+import struct
+import tempfile
+from typing import Iterable, List, Union
+
+MAGIC = b'PYOVSNAP'
+VERSION = 1
+
+# magic, version, number of sessions
+_HEADER = struct.Struct('<8sHI')
+# length of the session id, offset and length of the compressed session data
+_INDEX_ENTRY = struct.Struct('<HQI')
+
+
+def write_snapshot(path: Union[str, os.PathLike], sessions_data: Iterable[dict]):
+    """
+    Writes the data of sessions, in the format returned by the REST API, to a snapshot file.
+
+    The file is replaced atomically, so readers never see a partially written snapshot.
+    Every session is compressed separately, so they can be read without decompressing the whole file.
+
+    :param path: The path of the snapshot file.
+    :param sessions_data: The data of the sessions.
+    """
+    ids = []
+    blobs = []
+    for session_data in sessions_data:
+        ids.append(session_data['id'].encode())
+        blobs.append(zlib.compress(json.dumps(session_data, separators=(',', ':')).encode()))
+
+    offset = _HEADER.size + sum(_INDEX_ENTRY.size + len(session_id) for session_id in ids)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(ids)))
+
+            for session_id, blob in zip(ids, blobs):
+                f.write(_INDEX_ENTRY.pack(len(session_id), offset, len(blob)))
+                f.write(session_id)
+                offset += len(blob)
+
+            for blob in blobs:
+                f.write(blob)
+
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class SessionSnapshot(object):
+    """
+    Read access to a snapshot file written by `write_snapshot`.
+
+    The file is memory-mapped and only its index is parsed when opened. The data of a session is decompressed
+    and parsed only when it's read.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        """
+        :param path: The path of the snapshot file.
+        """
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, count = _HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a supported snapshot file")
+
+            self._index = {}  # session id:(offset, length), in the order of writing
+            position = _HEADER.size
+            for _ in range(count):
+                id_length, offset, length = _INDEX_ENTRY.unpack_from(self._mmap, position)
+                position += _INDEX_ENTRY.size
+                session_id = self._mmap[position:position + id_length].decode()
+                position += id_length
+                self._index[session_id] = (offset, length)
+        except (struct.error, UnicodeDecodeError) as e:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid snapshot file") from e
+        except BaseException:
+            self._mmap.close()
+            raise
+
+    @property
+    def session_ids(self) -> List[str]:
+        """
+        :return: The ids of the sessions in the snapshot.
+        """
+        return list(self._index)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def read(self, session_id: str) -> dict:
+        """
+        Read the data of a session.
+
+        :param session_id: The ID of the session.
+        :return: The data of the session, in the format returned by the REST API.
+        """
+        offset, length = self._index[session_id]
+        return json.loads(zlib.decompress(self._mmap[offset:offset + length]))
+
+    def close(self):
+        """
+        Releases the memory map of the file.
+        """
+        self._mmap.close()
@@ -0,0 +1,641 @@
+"""Transports sending the HTTP requests of the OpenVidu objects."""
+import os
+import ssl
+import socket
+import weakref
+import importlib.util
+import json as json_lib
+from time import monotonic
+from threading import Barrier, BrokenBarrierError, Lock, Thread
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urljoin, urlencode, urlsplit, urlunsplit
+from typing import Callable, Iterator, Optional, Tuple, Union
+
+import certifi
+import urllib3
+import requests
+import requests.exceptions
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .cache import NegativeCache
+from .deadline import deadline_timeout
+from .singleflight import SingleFlight
+
+httpx = None  # Optional dependency of AsyncTransport, imported when it's first needed as it's slow to import
+_DEFAULT = object()  # Use the default timeout of the transport
+UNIX_SCHEMES = ('unix', 'http+unix')  # The socket path is the percent-encoded host: unix://%2Frun%2Fopenvidu.sock/...
+
+
+def _split_unix_url(url: str) -> Tuple[str, Optional[str]]:
+    parts = urlsplit(url)
+    if parts.scheme not in UNIX_SCHEMES:
+        return url, None
+
+    return urlunsplit(('http', 'localhost', parts.path, parts.query, parts.fragment)), unquote(parts.netloc)
+
+
+def _import_httpx():
+    global httpx
+    if httpx is None:
+        try:
+            import httpx
+        except ImportError:
+            raise RuntimeError("httpx is required for AsyncTransport") from None
+
+
+class _SessionReusingSSLSocket(ssl.SSLSocket):
+    def close(self):
+        # Keep the session of the connection, it's no longer available once the connection is closed
+        if isinstance(self.context, _SessionReusingSSLContext):
+            self.context._harvest(self.server_hostname, self)
+        super().close()
+
+
+class _SessionReusingSSLContext(ssl.SSLContext):
+    """
+    An SSLContext resuming the last TLS session of the host on every new connection,
+    so only the first connection to a server does a full handshake.
+    """
+
+    sslsocket_class = _SessionReusingSSLSocket
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._sessions = {}  # server hostname:last usable session
+        self._connections = {}  # server hostname:weak set of the open connections
+        self._sessions_lock = Lock()
+
+    def _harvest(self, server_hostname: Optional[str], connection):
+        try:
+            session = connection.session
+        except (ValueError, AttributeError):  # The handshake is in progress or the connection is closed
+            return
+
+        if session is not None:
+            with self._sessions_lock:
+                self._sessions[server_hostname] = session
+
+    def _session_for(self, server_hostname: Optional[str]) -> Optional[ssl.SSLSession]:
+        with self._sessions_lock:
+            connections = list(self._connections.get(server_hostname, ()))
+
+        # TLS 1.3 tickets arrive after the handshake, so the sessions are taken from the connections only now
+        for connection in connections:
+            self._harvest(server_hostname, connection)
+
+        with self._sessions_lock:
+            return self._sessions.get(server_hostname)
+
+    def _remember(self, server_hostname: Optional[str], connection):
+        with self._sessions_lock:
+            self._connections.setdefault(server_hostname, weakref.WeakSet()).add(connection)
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True, suppress_ragged_eofs=True,
+                    server_hostname=None, session=None):
+        connection = super().wrap_socket(sock, server_side, do_handshake_on_connect, suppress_ragged_eofs,
+                                         server_hostname, session or self._session_for(server_hostname))
+        self._remember(server_hostname, connection)
+        return connection
+
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        connection = super().wrap_bio(incoming, outgoing, server_side, server_hostname,
+                                      session or self._session_for(server_hostname))
+        self._remember(server_hostname, connection)
+        return connection
+
+
+def _ssl_context(verify: Optional[Union[str, bool]], cert: Optional[Union[tuple, str]],
+                 session_reuse: bool = False) -> ssl.SSLContext:
+    context_class = _SessionReusingSSLContext if session_reuse else ssl.SSLContext
+    context = context_class(ssl.PROTOCOL_TLS_CLIENT)  # Verifies the certificate and the hostname by default
+
+    if verify is False:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str):
+        context.load_verify_locations(**{'capath' if os.path.isdir(verify) else 'cafile': verify})
+    else:
+        context.load_verify_locations(cafile=certifi.where())
+
+    if isinstance(cert, tuple):
+        context.load_cert_chain(*cert)
+    elif cert:
+        context.load_cert_chain(cert)
+
+    return context
+
+
+def _unix_connection(connection_class: type, unix_socket: str) -> type:
+    # HTTP(S) over a Unix domain socket, TLS (if any) is set up by urllib3 on the returned socket
+    class UnixConnection(connection_class):
+        def _new_conn(self) -> socket.socket:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout if isinstance(self.timeout, (int, float)) else socket.getdefaulttimeout())
+            try:
+                sock.connect(unix_socket)
+            except socket.timeout as e:
+                sock.close()
+                raise urllib3.exceptions.ConnectTimeoutError(self, f"Connection to {unix_socket} timed out") from e
+            except OSError as e:
+                sock.close()
+                raise urllib3.exceptions.NewConnectionError(self, f"Failed to connect to {unix_socket}: {e}") from e
+
+            return sock
+
+    return UnixConnection
+
+
+def _keep_alive_pool(pool_class: type, keep_alive: Optional[float], unix_socket: Optional[str] = None) -> type:
+    # Connections idle for longer than keep_alive are closed when taken from the pool, urllib3 reconnects them
+    class KeepAlivePool(pool_class):
+        if unix_socket is not None:
+            ConnectionCls = _unix_connection(pool_class.ConnectionCls, unix_socket)
+
+        def _put_conn(self, conn):
+            if conn is not None:
+                conn.idle_since = monotonic()
+            super()._put_conn(conn)
+
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout)
+            idle_since = getattr(conn, 'idle_since', None)
+            if keep_alive is not None and idle_since is not None and monotonic() - idle_since > keep_alive:
+                conn.close()
+            return conn
+
+    return KeepAlivePool
+
+
+def _pool_classes(keep_alive: Optional[float], unix_socket: Optional[str] = None) -> dict:
+    return {
+        'http': _keep_alive_pool(urllib3.HTTPConnectionPool, keep_alive, unix_socket),
+        'https': _keep_alive_pool(urllib3.HTTPSConnectionPool, keep_alive, unix_socket),
+    }
+
+
+class _PoolAdapter(HTTPAdapter):
+    """
+    HTTPAdapter with idle keep-alive expiry, an optional SSLContext and Unix domain socket of the transport.
+    """
+
+    def __init__(self, keep_alive: Optional[float], ssl_context: Optional[ssl.SSLContext],
+                 unix_socket: Optional[str] = None, **kwargs):
+        self._keep_alive = keep_alive
+        self._ssl_context = ssl_context
+        self._unix_socket = unix_socket
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self._ssl_context is not None:
+            kwargs['ssl_context'] = self._ssl_context
+
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _pool_classes(self._keep_alive, self._unix_socket)
+
+
+class TransportResponse(object):
+    """
+    The response returned by transports not based on requests.
+    It implements the part of the `requests.Response` interface used by PyOpenVidu.
+    """
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: Optional[bytes] = None,
+                 stream: Optional[Callable[[int], Iterator[bytes]]] = None, release: Optional[Callable] = None):
+        """
+        Direct instantiation of this class is not supported!
+
+        :param url: The url of the request.
+        :param status_code: The status code of the response.
+        :param headers: The headers of the response.
+        :param content: The body of the response, if it's already read.
+        :param stream: A function returning an iterator over the chunks of the body of the given size, if not read.
+        :param release: A function releasing the connection after the body is read.
+        """
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self._content = content
+        self._stream = stream
+        self._release = release
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def encoding(self) -> Optional[str]:
+        content_type = self.headers.get('Content-Type', '')
+        for parameter in content_type.split(';')[1:]:
+            name, _, value = parameter.strip().partition('=')
+            if name.lower() == 'charset':
+                return value.strip('"')
+
+        return None
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = b''.join(self.iter_content(64 * 1024))
+
+        return self._content
+
+    def iter_content(self, chunk_size: int = 1) -> Iterator[bytes]:
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start:start + chunk_size]
+            return
+
+        if self._stream is None:
+            raise RuntimeError("The content of the response was already consumed")
+
+        stream, self._stream = self._stream, None
+        try:
+            yield from stream(chunk_size)
+        finally:
+            self.close()
+
+    def json(self):
+        return json_lib.loads(self.content)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.exceptions.HTTPError(f"{self.status_code} {kind} Error for url: {self.url}", response=self)
+
+    def close(self):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Transport(object):
+    """
+    Base class of the transports. The OpenVidu object and every object created by it send their requests through
+    the same transport, which also holds their shared state.
+
+    Every transport raises the exceptions of requests (`requests.exceptions.Timeout`, `ConnectionError` and
+    `HTTPError`), and returns responses implementing the part of the `requests.Response` interface used by
+    PyOpenVidu. Subclasses implement `_send()`.
+    """
+
+    def __init__(self, base_url: str, auth: Tuple[str, str], headers: Optional[dict] = None,
+                 timeout: Union[float, tuple, None] = None, verify: Optional[Union[str, bool]] = None,
+                 cert: Optional[Union[tuple, str]] = None, pool_size: int = 10, pool_block: bool = False,
+                 keep_alive: Optional[float] = None, tls_session_reuse: bool = True, unix_socket: Optional[str] = None):
+        """
+        :param base_url: Relative urls are resolved against this url.
+            A `unix://` url with the percent-encoded socket path as host connects through that Unix domain socket.
+        :param auth: Username and password for basic authentication.
+        :param headers: Headers sent with every request.
+        :param timeout: Default timeout of the requests, in seconds or as a (connect, read) tuple.
+        :param verify: Path of a CA bundle, or False to disable certificate verification. Default: None = certifi.
+        :param cert: Path of a client certificate, or a (certificate, key) tuple of paths.
+        :param pool_size: Maximum number of connections kept open to the server.
+        :param pool_block: Wait for a free connection when every pooled connection is in use,
+            instead of opening one that's discarded after the request.
+        :param keep_alive: Seconds an idle connection is reused for. Default: None = Until the server closes it.
+        :param tls_session_reuse: Resume the TLS session of an earlier connection when opening a new one.
+        :param unix_socket: Path of a Unix domain socket to connect through, instead of the host of the url.
+        """
+        base_url, url_unix_socket = _split_unix_url(base_url)
+
+        self.base_url = base_url
+        self.auth = auth
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+        self.verify = verify
+        self.cert = cert
+        self.pool_size = pool_size
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.tls_session_reuse = tls_session_reuse
+        self.unix_socket = unix_socket or url_unix_socket
+
+        # State shared by every object using this transport
+        self.single_flight = SingleFlight()
+        self.negative_cache = NegativeCache(0.0, 0)  # Disabled, replaced by the OpenVidu object
+        self.fetch_params = None  # Query parameters of every request fetching sessions or connections
+
+    def create_url(self, url: str) -> str:
+        """
+        :param url: An url, relative to the base url.
+        :return: The absolute url.
+        """
+        return urljoin(self.base_url, url)
+
+    def request(self, method: str, url: str, params: Optional[dict] = None, json=None, headers: Optional[dict] = None,
+                stream: bool = False, timeout: Union[float, tuple, None] = _DEFAULT):
+        """
+        Send a request. The timeout is shrunk to the remaining time of the current deadline.
+
+        :param method: The HTTP method.
+        :param url: The url, relative to the base url.
+        :param params: Query parameters.
+        :param json: Data sent as a JSON body.
+        :param headers: Additional headers.
+        :param stream: Don't read the body before returning. The response must be closed, or used as a context manager.
+        :param timeout: The timeout of this request. Default: The timeout of the transport.
+        :return: The response.
+        """
+        timeout = deadline_timeout(self.timeout if timeout is _DEFAULT else timeout)
+        return self._send(method, self.create_url(url), params, json, headers or {}, stream, timeout)
+
+    def _send(self, method: str, url: str, params: Optional[dict], json, headers: dict, stream: bool,
+              timeout: Union[float, tuple, None]):
+        raise NotImplementedError()
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def warm_up(self, connections: int):
+        """
+        Opens keep-alive connections to the server, by sending concurrent requests.
+
+        :param connections: The number of connections to open. Capped by the pool size.
+        """
+        connections = min(connections, self.pool_size)
+
+        opened = Barrier(connections)
+
+        def touch(_):
+            try:
+                with self.get('config', stream=True) as response:
+                    response.raise_for_status()
+                    opened.wait()  # Hold the connection until every other one is open, so none of them is reused
+                    response.content  # Only a consumed response returns its connection to the pool
+            except BrokenBarrierError:  # Another request failed, its error is raised
+                pass
+            except BaseException:
+                opened.abort()
+                raise
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(touch, range(connections)))
+
+    def close(self):
+        """
+        Releases the connections of the transport.
+        """
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class RequestsTransport(Transport):
+    """
+    Sends the requests through a `requests.Session`. This is the default transport.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update(self.headers)
+        self.session.verify = True if self.verify is None else self.verify  # requests doesn't verify with None
+        self.session.cert = self.cert
+        if self.unix_socket is not None:
+            self.session.trust_env = False  # Proxies of the environment can't be used to reach the socket
+
+        ssl_context = None
+        if self.tls_session_reuse:
+            # requests loads the CA bundle and the client certificate into the context for every connection
+            ssl_context = _SessionReusingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            if self.verify is False:  # Set together, urllib3 refuses CERT_NONE with check_hostname enabled
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+
+        adapter = _PoolAdapter(self.keep_alive, ssl_context, self.unix_socket, pool_maxsize=self.pool_size,
+                               pool_block=self.pool_block)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _send(self, method, url, params, json, headers, stream, timeout):
+        return self.session.request(method, url, params=params, json=json, headers=headers, stream=stream,
+                                    timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Sends the requests through a `urllib3.PoolManager`, skipping the per request overhead of requests.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        ssl_context = _ssl_context(self.verify, self.cert, session_reuse=self.tls_session_reuse)
+        self.pool = urllib3.PoolManager(maxsize=self.pool_size, block=self.pool_block, ssl_context=ssl_context)
+        self.pool.pool_classes_by_scheme = _pool_classes(self.keep_alive, self.unix_socket)
+        self._base_headers = {**self.headers, **urllib3.util.make_headers(basic_auth=':'.join(self.auth))}
+
+    @staticmethod
+    def _timeout(timeout: Union[float, tuple, None]) -> urllib3.Timeout:
+        if isinstance(timeout, tuple):
+            return urllib3.Timeout(connect=timeout[0], read=timeout[1])
+
+        return urllib3.Timeout(connect=timeout, read=timeout)
+
+    @staticmethod
+    def _translate(error: Exception) -> Exception:
+        # NewConnectionError is a subclass of ConnectTimeoutError
+        if isinstance(error, urllib3.exceptions.NewConnectionError):
+            return requests.exceptions.ConnectionError(error)
+        if isinstance(error, urllib3.exceptions.ConnectTimeoutError):
+            return requests.exceptions.ConnectTimeout(error)
+        if isinstance(error, urllib3.exceptions.ReadTimeoutError):
+            return requests.exceptions.ReadTimeout(error)
+
+        return requests.exceptions.ConnectionError(error)
+
+    def _send(self, method, url, params, json, headers, stream, timeout):
+        if params:
+            url = f"{url}?{urlencode(params)}"
+
+        headers = {**self._base_headers, **headers}
+        body = None
+        if json is not None:
+            body = json_lib.dumps(json).encode()
+            headers['Content-Type'] = 'application/json'
+
+        try:
+            r = self.pool.request(method, url, body=body, headers=headers, timeout=self._timeout(timeout),
+                                  preload_content=not stream, retries=False, redirect=False)
+        except urllib3.exceptions.HTTPError as e:
+            raise self._translate(e) from e
+
+        if not stream:
+            return TransportResponse(url, r.status, r.headers, content=r.data)
+
+        def iter_chunks(chunk_size: int) -> Iterator[bytes]:
+            try:
+                yield from r.stream(chunk_size)
+            except urllib3.exceptions.HTTPError as e:
+                raise self._translate(e) from e
+
+        return TransportResponse(url, r.status, r.headers, stream=iter_chunks, release=r.release_conn)
+
+    def close(self):
+        self.pool.clear()
+
+
+class AsyncTransport(Transport):
+    """
+    Sends the requests through an `httpx.AsyncClient`, running on an event loop in a background thread.
+    Requests of every thread are multiplexed on the same event loop and connection pool.
+    Asyncio applications can `await arequest()` without blocking their own event loop.
+
+    Requires httpx (`pip install pyopenvidu[async]`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        import asyncio  # Slow to import, only loaded when needed
+        _import_httpx()
+
+        super().__init__(*args, **kwargs)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = Thread(target=self._loop.run_forever, name='OpenViduAsyncTransport', daemon=True)
+        self._thread.start()
+
+        self.client = self._run(self._create_client())
+
+    def _client_kwargs(self) -> dict:
+        # There is no blocking option, httpx always waits for a free connection
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                              keepalive_expiry=self.keep_alive)
+        return dict(auth=self.auth, headers=self.headers, limits=limits,
+                    verify=_ssl_context(self.verify, self.cert, session_reuse=self.tls_session_reuse))
+
+    async def _create_client(self):
+        kwargs = self._client_kwargs()
+        if self.unix_socket is not None:
+            # The connection options belong to the transport, when it's not created by the client
+            options = {key: kwargs.pop(key) for key in ('limits', 'verify', 'http2') if key in kwargs}
+            kwargs.update(transport=httpx.AsyncHTTPTransport(uds=self.unix_socket, **options), trust_env=False)
+
+        return httpx.AsyncClient(**kwargs)
+
+    def _run(self, coroutine):
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    @staticmethod
+    def _timeout(timeout: Union[float, tuple, None]) -> 'httpx.Timeout':
+        if isinstance(timeout, tuple):
+            return httpx.Timeout(timeout[1], connect=timeout[0])
+
+        return httpx.Timeout(timeout)
+
+    @staticmethod
+    def _translate(error: Exception) -> Exception:
+        if isinstance(error, httpx.ConnectTimeout):
+            return requests.exceptions.ConnectTimeout(error)
+        if isinstance(error, httpx.TimeoutException):
+            return requests.exceptions.ReadTimeout(error)
+
+        return requests.exceptions.ConnectionError(error)
+
+    async def _send_async(self, method, url, params, json, headers, timeout, stream: bool):
+        request = self.client.build_request(method, url, params=params, json=json, headers=headers,
+                                            timeout=self._timeout(timeout))
+        try:
+            response = await self.client.send(request, stream=True)
+            if not stream:
+                try:
+                    await response.aread()
+                finally:
+                    await response.aclose()
+        except httpx.TransportError as e:
+            raise self._translate(e) from e
+
+        return response
+
+    def _send(self, method, url, params, json, headers, stream, timeout):
+        response = self._run(self._send_async(method, url, params, json, headers, timeout, stream))
+
+        if not stream:
+            return TransportResponse(url, response.status_code, response.headers, content=response.content)
+
+        def iter_chunks(chunk_size: int) -> Iterator[bytes]:
+            chunks = response.aiter_bytes(chunk_size)
+            while True:
+                try:
+                    yield self._run(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+                except httpx.TransportError as e:
+                    raise self._translate(e) from e
+
+        return TransportResponse(url, response.status_code, response.headers, stream=iter_chunks,
+                                 release=lambda: self._run(response.aclose()))
+
+    async def arequest(self, method: str, url: str, params: Optional[dict] = None, json=None,
+                       headers: Optional[dict] = None,
+                       timeout: Union[float, tuple, None] = _DEFAULT) -> TransportResponse:
+        """
+        Send a request from a coroutine. The body of the response is always read.
+        See `request()` for the parameters.
+
+        :return: The response.
+        """
+        import asyncio
+        timeout = deadline_timeout(self.timeout if timeout is _DEFAULT else timeout)
+        future = asyncio.run_coroutine_threadsafe(
+            self._send_async(method, self.create_url(url), params, json, headers or {}, timeout, False), self._loop
+        )
+        response = await asyncio.wrap_future(future)
+        return TransportResponse(str(response.url), response.status_code, response.headers, content=response.content)
+
+    def close(self):
+        if self._loop.is_running():
+            self._run(self.client.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+
+class Http2Transport(AsyncTransport):
+    """
+    The AsyncTransport using HTTP/2, so concurrent requests of every thread are multiplexed over a single
+    TLS connection to OpenVidu Server (or the proxy in front of it), instead of opening a connection for each.
+
+    HTTP/2 is negotiated during the TLS handshake, servers not supporting it (and plain http urls) are
+    reached through HTTP/1.1. Requires httpx with HTTP/2 support (`pip install pyopenvidu[http2]`).
+    """
+
+    def __init__(self, *args, **kwargs):
+        if importlib.util.find_spec('h2') is None:
+            raise RuntimeError("The h2 package is required for Http2Transport")
+
+        super().__init__(*args, **kwargs)
+
+    def _client_kwargs(self) -> dict:
+        return dict(super()._client_kwargs(), http2=True)
+
+
+TRANSPORTS = {
+    'requests': RequestsTransport,
+    'urllib3': Urllib3Transport,
+    'async': AsyncTransport,
+    'http2': Http2Transport,
+}
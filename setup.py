@@ -10,12 +10,17 @@ with open('README.rst') as readme_file:
 with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
-requirements = ['requests', 'requests-toolbelt']
+requirements = ['requests', 'urllib3', 'certifi']  # urllib3 and certifi are used directly by the transports
 
 setup_requirements = ['pytest-runner', ]
 
 test_requirements = ['pytest>=3', ]
 
+extras_requirements = {
+    'async': ['httpx'],
+    'http2': ['httpx[http2]'],
+}
+
 setup(
     author="Marcell Pünkösd",
     author_email='punkosdmarcell@rocketmail.com',
@@ -38,6 +43,7 @@ setup(
     ],
     description="Python interface to the OpenVidu WebRTC videoconference library.",
     install_requires=requirements,
+    extras_require=extras_requirements,
     license="MIT license",
     long_description=readme + '\n\n' + history,
     include_package_data=True,
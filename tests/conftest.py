@@ -1,2 +1,3 @@
 import pytest
-from .fixtures import session_instance, openvidu_instance, webrtc_connection_instance, ipcam_connection_instance
+from .fixtures import session_instance, openvidu_instance, webrtc_connection_instance, ipcam_connection_instance, \
+    recording_instance, fake_server, openvidu
@@ -1,6 +1,8 @@
+import time
 import pytest
 from urllib.parse import urljoin
 from pyopenvidu import OpenVidu
+from pyopenvidu.fakeserver import FakeOpenViduServer
 
 URL_BASE = 'http://test.openvidu.io:4443/openvidu/api/'
 SECRET = 'MY_SECRET'
@@ -229,3 +231,68 @@ def webrtc_connection_instance(session_instance):
 def ipcam_connection_instance(openvidu_instance):
     session_instance = openvidu_instance.get_session('TestSession2')
     yield session_instance.get_connection('ipc_IPCAM_rtsp_A8MJ_91_191_213_49_554_live_mpeg4_sdp')
+
+
+RECORDINGS = {
+    "count": 2,
+    "items": [
+        {
+            "id": "TestSession",
+            "object": "recording",
+            "name": "MyRecording",
+            "outputMode": "COMPOSED",
+            "hasAudio": True,
+            "hasVideo": True,
+            "resolution": "1920x1080",
+            "recordingLayout": "BEST_FIT",
+            "sessionId": "TestSession",
+            "createdAt": 1600564785109,
+            "size": 16,
+            "duration": 5.7,
+            "url": "http://test.openvidu.io:4443/openvidu/recordings/TestSession/MyRecording.mp4",
+            "status": "ready"
+        },
+        {
+            "id": "TestSession2",
+            "object": "recording",
+            "name": "TestSession2",
+            "outputMode": "INDIVIDUAL",
+            "hasAudio": True,
+            "hasVideo": True,
+            "sessionId": "TestSession2",
+            "createdAt": 1600564785110,
+            "size": 0,
+            "duration": 0,
+            "url": None,
+            "status": "started"
+        }
+    ]
+}
+
+RECORDING_CONTENT = b'0123456789abcdef'  # As large as the "size" of the first recording
+
+
+@pytest.fixture
+def recording_instance(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings/TestSession'), json=RECORDINGS['items'][0])
+    yield openvidu_instance.get_recording('TestSession')
+
+
+@pytest.fixture
+def fake_server():
+    with FakeOpenViduServer(SECRET) as server:
+        yield server
+
+
+@pytest.fixture
+def openvidu(fake_server):
+    openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+    yield openvidu
+    openvidu.close()
+
+
+def wait_for(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
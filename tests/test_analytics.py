@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+
+"""Tests for ConnectionTable object"""
+
+import math
+import pytest
+from copy import deepcopy
+from urllib.parse import urljoin
+from pyopenvidu import OpenVidu
+from pyopenvidu.analytics import ConnectionTable, StreamStatsTable
+from .fixtures import URL_BASE, SECRET, SESSIONS
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'array'])
+def connection_table(request, openvidu_instance, mocker):
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        mocker.patch('pyopenvidu.analytics.numpy', None)
+
+    return ConnectionTable.from_openvidu(openvidu_instance)
+
+
+def test_columns(connection_table):
+    assert len(connection_table) == 4
+    assert connection_table.session_ids == ['TestSession', 'TestSession2']
+    assert list(connection_table.column('publishers')) == [1, 1, 0, 1]
+    assert connection_table.categories('type') == ['WEBRTC', 'IPCAM']
+    assert list(connection_table.column('type')) == [0, 0, 0, 1]
+
+
+def test_aggregations(connection_table):
+    assert connection_table.platform_breakdown() == {
+        'Chrome 85.0.4183.102 on Linux 64-bit': 1,
+        'Chrome 69.0.4183.102 on Linux 64-bit': 2,
+        'IPCAM': 1
+    }
+    assert connection_table.type_breakdown() == {'WEBRTC': 3, 'IPCAM': 1}
+    assert connection_table.role_distribution() == {'PUBLISHER': 3, None: 1}
+    assert connection_table.connections_per_session() == {'TestSession': 3, 'TestSession2': 1}
+    assert connection_table.max_send_bandwidth_per_session() == {'TestSession': 3000.0, 'TestSession2': 0.0}
+    assert connection_table.max_recv_bandwidth_per_session() == {'TestSession': 3000.0, 'TestSession2': 0.0}
+
+
+def test_empty_table():
+    table = ConnectionTable([])
+
+    assert len(table) == 0
+    assert table.platform_breakdown() == {}
+    assert table.max_send_bandwidth_per_session() == {}
+
+
+def test_structured_array(openvidu_instance):
+    pytest.importorskip('numpy')
+    records = ConnectionTable.from_openvidu(openvidu_instance).to_structured_array()
+
+    assert list(records['session_id']) == ['TestSession', 'TestSession', 'TestSession', 'TestSession2']
+    assert list(records['role']) == ['PUBLISHER', 'PUBLISHER', 'PUBLISHER', '']
+    assert records['max_send_kbps'].sum() == 3000.0
+
+
+@pytest.fixture(params=[True, False], ids=['numpy', 'array'])
+def stats_openvidu(request, requests_mock, mocker):
+    if request.param:
+        pytest.importorskip('numpy')
+    else:
+        mocker.patch('pyopenvidu.analytics.numpy', None)
+
+    sessions = deepcopy(SESSIONS)
+    connections = sessions['content'][0]['connections']['content']
+    connections[0]['publishers'][0].update(localCandidate='a', remoteCandidate='b', fractionLost=0.2, jitter=0.01)
+    connections[0]['subscribers'][0].update(localCandidate='a', remoteCandidate='b', roundTripTime=0.05,
+                                            bitrate=100)
+    connections[1]['publishers'][0].update(localCandidate='a', remoteCandidate='', gatheredCandidates=[])
+
+    a = requests_mock.get(urljoin(URL_BASE, 'sessions'), json=sessions)
+    yield OpenVidu(URL_BASE, SECRET, webrtc_stats=True)
+
+    assert a.last_request.qs == {'webrtcstats': ['true']}
+
+
+def test_webrtc_stats_parsed(stats_openvidu):
+    publisher = stats_openvidu.get_session('TestSession').get_connection('vhdxz7abbfirh2lh').publishers[0]
+
+    assert publisher.webrtc_stats == {'localCandidate': 'a', 'remoteCandidate': 'b', 'fractionLost': 0.2, 'jitter': 0.01}
+    assert stats_openvidu.get_session('TestSession2').connections[0].publishers[0].webrtc_stats is None
+
+
+def test_stream_stats(stats_openvidu):
+    table = StreamStatsTable.from_openvidu(stats_openvidu)
+
+    assert len(table) == 5
+    assert table.categories('kind') == ['publisher', 'subscriber']
+    assert list(table.column('connected')) == [1, 1, 0, -1, -1]
+    assert table.column('fraction_lost')[0] == 0.2
+    assert math.isnan(table.column('fraction_lost')[1])
+
+    assert list(table.degraded_mask()) == [True, False, True, False, False]
+    assert list(table.degraded_mask(disconnected=False, min_bitrate_kbps=500)) == [True, True, False, False, False]
+    assert [stream[2] for stream in table.degraded_streams(max_fraction_lost=0.5)] == \
+           [table.categories('stream_id')[table.column('stream_id')[2]]]
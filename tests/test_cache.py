@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+"""Tests for the caching utilities"""
+
+import time
+import pytest
+from threading import Thread, Event
+from urllib.parse import urljoin
+from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError, OpenViduConnectionDoesNotExistsError
+from pyopenvidu.cache import CachedValue, NegativeCache
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from pyopenvidu.singleflight import SingleFlight
+from .fixtures import URL_BASE, SESSIONS
+
+
+class SlowLoader(object):
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.calls
+
+
+#
+# SingleFlight
+#
+
+def test_single_flight_deduplicates():
+    flight = SingleFlight()
+    loader = SlowLoader(0.1)
+    results = []
+
+    threads = [Thread(target=lambda: results.append(flight.do('key', loader))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loader.calls == 1
+    assert results == [1] * 10
+
+    # Not in flight anymore
+    assert flight.do('key', loader) == 2
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    started = Event()
+    errors = []
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError()
+
+    def call():
+        try:
+            flight.do('key', failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = Thread(target=call)
+    leader.start()
+    started.wait()
+    call()
+    leader.join()
+
+    assert len(errors) == 2
+
+
+#
+# CachedValue
+#
+
+def test_cached_value_ttl():
+    loader = SlowLoader()
+    cached = CachedValue(loader, ttl=0.1)
+
+    assert cached.get() == 1
+    assert cached.get() == 1
+
+    time.sleep(0.15)
+    assert cached.get() == 2
+
+
+def test_cached_value_invalidate():
+    loader = SlowLoader()
+    cached = CachedValue(loader, ttl=60)
+
+    assert cached.get() == 1
+    cached.invalidate()
+    assert cached.get() == 2
+
+
+def test_cached_value_stale_while_revalidate():
+    loader = SlowLoader(0.1)
+    cached = CachedValue(loader, ttl=0.15, stale_ttl=10)
+
+    assert cached.get() == 1
+    time.sleep(0.2)
+
+    start = time.monotonic()
+    assert cached.get() == 1  # Stale, but returned instantly
+    assert time.monotonic() - start < 0.05
+
+    time.sleep(0.12)
+    assert cached.get() == 2
+    assert loader.calls == 2
+
+
+#
+# OpenVidu integration
+#
+
+def test_get_cached_config(openvidu_instance, requests_mock):
+    a = requests_mock.get(urljoin(URL_BASE, 'config'), json={"VERSION": "2.16.0"})
+
+    assert openvidu_instance.get_cached_config() == {"VERSION": "2.16.0"}
+    assert openvidu_instance.get_cached_config() == {"VERSION": "2.16.0"}
+    assert a.call_count == 1
+
+    openvidu_instance.config_cache.invalidate()
+    openvidu_instance.get_cached_config()
+    assert a.call_count == 2
+
+    # The uncached call is still uncached
+    openvidu_instance.get_config()
+    assert a.call_count == 3
+
+
+def test_get_cached_config_error(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'config'), status_code=500)
+
+    with pytest.raises(Exception):
+        openvidu_instance.get_cached_config()
+
+
+#
+# Coalescing of fetches
+#
+
+@pytest.fixture
+def slow_fake_server():
+    with FakeOpenViduServer('MY_SECRET', latency=0.1) as server:
+        yield server
+
+
+def run_concurrently(fn, count: int = 10) -> list:
+    results = []
+    threads = [Thread(target=lambda: results.append(fn())) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def test_coalesced_fetch(slow_fake_server):
+    openvidu = OpenVidu(slow_fake_server.url, 'MY_SECRET', initial_fetch=False)
+    openvidu.create_session('TestSession')
+
+    requests_before = slow_fake_server.request_count
+    results = run_concurrently(openvidu.fetch)
+
+    assert slow_fake_server.request_count == requests_before + 1
+    assert sorted(results) == [False] * 9 + [True]  # Only the first caller sees the change
+
+
+def test_coalesced_session_fetch(slow_fake_server):
+    openvidu = OpenVidu(slow_fake_server.url, 'MY_SECRET', initial_fetch=False)
+    session = openvidu.create_session('TestSession')
+    session.create_webrtc_connection()
+
+    requests_before = slow_fake_server.request_count
+    run_concurrently(session.fetch)
+
+    assert slow_fake_server.request_count == requests_before + 1
+    assert session.connection_count == 1
+
+
+#
+# NegativeCache
+#
+
+def test_negative_cache():
+    cache = NegativeCache(ttl=0.1, maxsize=2)
+
+    assert 'a' not in cache
+    cache.add('a')
+    assert 'a' in cache
+    assert cache.stats == {"hits": 0, "misses": 0, "size": 1}  # Membership tests are not counted
+
+    assert cache.lookup('b', 'a') == 'a'
+    assert cache.lookup('b', 'c') is None
+    assert cache.stats == {"hits": 1, "misses": 1, "size": 1}  # Once per lookup, regardless of the keys
+
+    time.sleep(0.15)
+    assert 'a' not in cache
+    assert cache.lookup('a') is None
+    assert len(cache) == 0
+
+
+def test_negative_cache_bounded():
+    cache = NegativeCache(ttl=60, maxsize=2)
+
+    cache.add('a')
+    cache.add('b')
+    cache.add('c')
+
+    assert 'a' not in cache
+    assert 'b' in cache
+    assert 'c' in cache
+
+    cache.discard('b')
+    assert 'b' not in cache
+
+    cache.clear()
+    assert cache.stats == {"hits": 0, "misses": 0, "size": 0}
+
+
+def test_negative_cache_disabled():
+    cache = NegativeCache(ttl=0, maxsize=2)
+    cache.add('a')
+
+    assert 'a' not in cache
+
+
+def test_negative_cache_session_fetch(openvidu_instance, requests_mock):
+    session = openvidu_instance.get_session('TestSession')
+    a = requests_mock.get(urljoin(URL_BASE, 'sessions/TestSession'), status_code=404)
+
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        session.fetch()
+
+    # Asking again will not reach the server
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        session.fetch()
+
+    assert a.called_once
+    assert openvidu_instance.negative_cache.stats == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_negative_cache_connection_fetch(openvidu_instance, requests_mock):
+    connection = openvidu_instance.get_session('TestSession').get_connection('vhdxz7abbfirh2lh')
+    a = requests_mock.delete(urljoin(URL_BASE, 'sessions/TestSession/connection/vhdxz7abbfirh2lh'), status_code=204)
+    b = requests_mock.get(urljoin(URL_BASE, 'sessions/TestSession/connection/vhdxz7abbfirh2lh'), status_code=404)
+
+    connection.force_disconnect()
+    assert a.called_once
+
+    connection.is_valid = True  # Pretend it's another object of the same connection
+    with pytest.raises(OpenViduConnectionDoesNotExistsError):
+        connection.fetch()
+
+    assert not b.called
+    assert openvidu_instance.negative_cache.stats == {"hits": 1, "misses": 0, "size": 1}
+
+    other = openvidu_instance.get_session('TestSession').connections[1]
+    requests_mock.get(urljoin(URL_BASE, f'sessions/TestSession/connection/{other.id}'), status_code=404)
+    with pytest.raises(OpenViduConnectionDoesNotExistsError):
+        other.fetch()
+
+    # The session and the connection are checked in a single lookup
+    assert openvidu_instance.negative_cache.stats == {"hits": 1, "misses": 1, "size": 2}
+
+
+def test_negative_cache_recreated_session(openvidu_instance, requests_mock):
+    session = openvidu_instance.get_session('TestSession')
+    requests_mock.delete(urljoin(URL_BASE, 'sessions/TestSession'), status_code=204)
+    requests_mock.post(urljoin(URL_BASE, 'sessions'), json=SESSIONS['content'][0])
+
+    session.close()
+    new_session = openvidu_instance.create_session('TestSession')
+
+    assert not new_session.fetch()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+
+"""Tests for OpenViduCluster object"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import monotonic
+
+import pytest
+from pyopenvidu import OpenVidu, OpenViduCluster, OpenViduSessionDoesNotExistsError, OpenViduSessionExistsError
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from pyopenvidu.placement import ConsistentHashPlacement, LeastConnectionsPlacement, LoadAwarePlacement
+
+SECRET = 'MY_SECRET'
+
+
+@pytest.fixture
+def fake_servers():
+    with FakeOpenViduServer(SECRET) as first, FakeOpenViduServer(SECRET) as second:
+        yield {'first': first, 'second': second}
+
+
+@pytest.fixture
+def cluster(fake_servers):
+    yield OpenViduCluster({name: OpenVidu(server.url, SECRET) for name, server in fake_servers.items()})
+
+
+def test_cluster_routing(cluster, fake_servers):
+    # Sessions created outside of the cluster object are found after fetching
+    OpenVidu(fake_servers['second'].url, SECRET).create_session('ExternalSession')
+
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        cluster.get_session('ExternalSession')
+
+    assert cluster.fetch()
+    assert not cluster.fetch()
+
+    assert cluster.get_session('ExternalSession').id == 'ExternalSession'
+    assert cluster.get_server('ExternalSession') is cluster.servers['second']
+    assert cluster.session_count == 1
+
+
+def test_cluster_create_session(cluster):
+    session = cluster.create_session('TestSession')
+
+    assert cluster.get_session('TestSession') is session
+    assert cluster.session_count == 1
+
+    with pytest.raises(OpenViduSessionExistsError):
+        cluster.create_session('TestSession')
+
+    session.close()
+    cluster.create_session('TestSession')
+
+
+def test_cluster_list_of_servers(fake_servers):
+    cluster = OpenViduCluster([OpenVidu(server.url, SECRET) for server in fake_servers.values()])
+
+    assert sorted(cluster.servers) == ['0', '1']
+
+
+def test_cluster_no_servers():
+    with pytest.raises(ValueError):
+        OpenViduCluster([])
+
+
+def test_consistent_hash_placement(cluster):
+    placement = ConsistentHashPlacement()
+    servers = cluster.servers
+
+    chosen = {session_id: placement.select(servers, session_id) for session_id in map(str, range(100))}
+
+    assert set(chosen.values()) == {'first', 'second'}  # Both used
+    assert all(placement.select(servers, session_id) == name for session_id, name in chosen.items())
+
+    # Removing a server only moves the sessions of that server
+    remaining = {'first': servers['first']}
+    assert all(placement.select(remaining, session_id) == 'first' for session_id in chosen)
+
+
+def test_least_connections_placement(cluster):
+    cluster.placement = LeastConnectionsPlacement()
+
+    first = cluster.create_session()
+    first.create_webrtc_connection()
+    second = cluster.create_session()
+
+    assert cluster.get_server(first.id) is not cluster.get_server(second.id)
+    # The second server has no connections, but one session
+    assert cluster.get_server(cluster.create_session().id) is cluster.get_server(second.id)
+
+
+def test_load_aware_placement(cluster, fake_servers):
+    placement = LoadAwarePlacement(capacity_kbps=10000)
+    cluster.placement = placement
+
+    # Every participant is counted with 1000 kbps send and receive by the default config of the fake server
+    first = cluster.create_session()
+    first_name = cluster._session_index[first.id]
+    assert placement.load(first_name, cluster.servers[first_name]).pending_kbps == 2000
+
+    # The next session goes to the other server, as the first one has a pending session
+    second = cluster.create_session()
+    second_name = cluster._session_index[second.id]
+    assert second_name != first_name
+
+    connection = first.create_webrtc_connection(video_max_send_bandwidth=3000)
+    fake_servers[first_name].add_publisher(first.id, connection.id)
+    cluster.fetch()
+
+    load = placement.load(first_name, cluster.servers[first_name])
+    assert load.publishers == 1
+    assert load.subscribers == 0
+    assert load.bandwidth_kbps == 3000
+    assert load.pending_kbps == 0
+    assert placement.score(first_name, cluster.servers[first_name]) == pytest.approx(0.7)
+
+    # Unchanged sessions are not counted again
+    second_session = cluster.get_session(second.id)
+    cluster.get_session(first.id).close()
+    cluster.fetch()
+    assert cluster.get_session(second.id) is second_session
+    assert placement.load(first_name, cluster.servers[first_name]).bandwidth_kbps == 0
+
+    # Placement decisions do not fetch the config again
+    requests_before = sum(server.request_count for server in fake_servers.values())
+    for _ in range(10):
+        placement.select(cluster.servers)
+    assert sum(server.request_count for server in fake_servers.values()) == requests_before
+
+
+def test_load_aware_placement_fetched_in_place(cluster, fake_servers):
+    placement = LoadAwarePlacement(capacity_kbps=10000)
+    server = cluster.servers['first']
+    session = server.create_session()
+    server.fetch()
+    assert placement.load('first', server).publishers == 0
+
+    connection = session.create_webrtc_connection()
+    fake_servers['first'].add_publisher(session.id, connection.id)
+    session.fetch()  # Updated in place, then kept as the same object by the fetch of the server
+    server.fetch()
+    assert server.get_session(session.id) is session
+
+    load = placement.load('first', server)
+    assert load.publishers == 1
+    assert load.bandwidth_kbps == 1000
+
+
+def test_load_aware_placement_slow_config(cluster, monkeypatch):
+    placement = LoadAwarePlacement(capacity_kbps=10000)
+    first, second = cluster.servers['first'], cluster.servers['second']
+    placement.load('second', second)
+
+    requested, release = Event(), Event()
+    original = first.get_cached_config
+
+    def slow_config(*args, **kwargs):
+        requested.set()
+        release.wait(5)  # The cached config expired, and the server is slow to answer
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(first, 'get_cached_config', slow_config)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        selected = executor.submit(placement.select, cluster.servers)
+        assert requested.wait(5)
+
+        start = monotonic()
+        assert placement.load('second', second).pending_kbps == 0  # Not blocked by the request of the other server
+        assert monotonic() - start < 1
+
+        release.set()
+        assert selected.result() in cluster.servers
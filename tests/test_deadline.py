@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""Tests for deadlines"""
+
+import time
+import pytest
+import requests
+from urllib.parse import urljoin
+from pyopenvidu import OpenVidu, OpenViduCluster, OpenViduDeadlineExceededError
+from pyopenvidu.deadline import deadline, deadline_timeout, remaining
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from .fixtures import URL_BASE, SECRET
+
+
+def test_deadline_timeout():
+    assert remaining() is None
+    assert deadline_timeout(5) == 5
+    assert deadline_timeout((1, 5)) == (1, 5)
+
+    with deadline(2):
+        assert deadline_timeout(5) <= 2
+        assert deadline_timeout(1) == 1
+        assert deadline_timeout(None) <= 2
+
+        connect, read = deadline_timeout((1, None))
+        assert connect == 1 and read <= 2
+
+        with deadline(10):  # Can not extend the outer deadline
+            assert remaining() <= 2
+
+        with deadline(0.5):
+            assert remaining() <= 0.5
+
+    assert remaining() is None
+
+
+def test_requests_use_remaining_time(openvidu_instance, requests_mock):
+    a = requests_mock.get(urljoin(URL_BASE, 'sessions'), json={"numberOfElements": 0, "content": []})
+
+    with deadline(3):
+        openvidu_instance.fetch()
+
+    assert 0 < a.last_request.timeout <= 3
+
+    openvidu_instance.fetch()
+    assert a.last_request.timeout is None
+
+
+def test_expired_deadline(openvidu_instance, requests_mock):
+    a = requests_mock.get(urljoin(URL_BASE, 'sessions'), json={"numberOfElements": 0, "content": []})
+
+    with deadline(0):
+        with pytest.raises(OpenViduDeadlineExceededError):
+            openvidu_instance.fetch()
+
+    assert not a.called
+
+
+def test_deadline_spans_requests():
+    with FakeOpenViduServer(SECRET, latency=0.15) as server:
+        openvidu = OpenVidu(server.url, SECRET, timeout=5)
+        start = time.monotonic()
+
+        with pytest.raises((requests.exceptions.Timeout, OpenViduDeadlineExceededError)):
+            with deadline(0.4):
+                for _ in range(5):
+                    openvidu.fetch()
+
+        assert time.monotonic() - start < 0.6
+
+
+def test_deadline_in_worker_threads(requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'sessions'), json={"numberOfElements": 0, "content": []})
+    cluster = OpenViduCluster([OpenVidu(URL_BASE, SECRET, initial_fetch=False)], initial_fetch=False)
+
+    with deadline(0):
+        with pytest.raises(OpenViduDeadlineExceededError):
+            cluster.fetch()
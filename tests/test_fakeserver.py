@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""Tests for FakeOpenViduServer object"""
+
+import time
+import pytest
+import requests.exceptions
+from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError, OpenViduSessionExistsError, \
+    OpenViduConnectionDoesNotExistsError, OpenViduStreamError
+
+SECRET = 'MY_SECRET'
+
+
+@pytest.fixture
+def fake_openvidu(fake_server):
+    yield OpenVidu(fake_server.url, SECRET)
+
+
+def test_fake_empty(fake_openvidu):
+    assert fake_openvidu.session_count == 0
+    assert not fake_openvidu.fetch()
+
+
+def test_fake_session_lifecycle(fake_openvidu):
+    session = fake_openvidu.create_session('TestSession', 'RELAYED')
+
+    assert session.id == 'TestSession'
+    assert session.media_mode == 'RELAYED'
+
+    with pytest.raises(OpenViduSessionExistsError):
+        fake_openvidu.create_session('TestSession')
+
+    assert fake_openvidu.fetch()
+    assert fake_openvidu.get_session('TestSession').connection_count == 0
+
+    session.close()
+
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        session.fetch()
+
+    assert fake_openvidu.fetch()
+    assert fake_openvidu.session_count == 0
+
+
+def test_fake_connections(fake_server, fake_openvidu):
+    session = fake_openvidu.create_session()
+
+    webrtc = session.create_webrtc_connection('MODERATOR', video_max_send_bandwidth=500)
+    ipcam = session.create_ipcam_connection('rtsp://example.com/stream')
+
+    assert webrtc.role == 'MODERATOR'
+    assert webrtc.kurento_options['videoMaxSendBandwidth'] == 500
+    assert ipcam.rtsp_uri == 'rtsp://example.com/stream'
+    assert ipcam.publisher_count == 1
+
+    assert session.fetch()
+    assert session.connection_count == 2
+
+    fake_server.add_publisher(session.id, webrtc.id)
+    assert webrtc.fetch()
+    assert webrtc.publisher_count == 1
+
+    session.signal('MY_TYPE', 'Hello world!', [webrtc])
+
+    with pytest.raises(OpenViduStreamError):
+        ipcam.force_unpublish_all_streams()
+
+    webrtc.force_unpublish_all_streams()
+    webrtc.force_disconnect()
+
+    with pytest.raises(OpenViduConnectionDoesNotExistsError):
+        session.get_connection(webrtc.id).fetch()
+
+    assert session.fetch()
+    assert session.connection_count == 1
+
+
+def test_fake_config(fake_openvidu):
+    assert fake_openvidu.get_config()['OPENVIDU_STREAMS_VIDEO_MAX_SEND_BANDWIDTH'] == 1000
+
+
+def test_fake_bad_secret(fake_server):
+    with pytest.raises(requests.exceptions.HTTPError):
+        OpenVidu(fake_server.url, 'BAD_SECRET')
+
+
+def test_fake_error_injection(fake_server, fake_openvidu):
+    fake_server.error_rate = 1.0
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        fake_openvidu.fetch()
+
+    fake_server.error_rate = 0.0
+    fake_openvidu.fetch()
+
+
+def test_fake_latency(fake_server, fake_openvidu):
+    fake_server.latency = 0.05
+
+    start = time.monotonic()
+    fake_openvidu.fetch()
+
+    assert time.monotonic() - start >= 0.05
+    assert fake_server.request_count == 2
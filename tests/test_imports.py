@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""Tests for the lazy imports of the package"""
+
+import subprocess
+import sys
+
+import pytest
+import pyopenvidu
+from pyopenvidu import exceptions
+
+
+def loaded_modules(statement: str, modules: list) -> list:
+    code = f"import sys\n{statement}\nprint(' '.join(m for m in {modules!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.split()
+
+
+def test_import_does_not_load_dependencies():
+    modules = ['requests', 'requests_toolbelt', 'urllib3', 'httpx', 'pyopenvidu.openvidu', 'pyopenvidu.transport']
+
+    assert loaded_modules('import pyopenvidu', modules) == []
+
+
+def test_exceptions_do_not_load_dependencies():
+    modules = ['requests', 'urllib3', 'pyopenvidu.transport']
+
+    assert loaded_modules('from pyopenvidu import OpenViduError, OpenViduDeadlineExceededError', modules) == []
+    assert loaded_modules('import pyopenvidu.exceptions', modules) == []
+
+
+def test_openvidu_does_not_load_optional_modules():
+    modules = ['requests_toolbelt', 'httpx', 'asyncio', 'pyopenvidu.snapshot']
+
+    assert loaded_modules('from pyopenvidu import OpenVidu', modules) == []
+
+
+def test_lazy_attributes():
+    assert pyopenvidu.OpenViduError is exceptions.OpenViduError
+    assert pyopenvidu.OpenViduDeadlineExceededError is exceptions.OpenViduDeadlineExceededError
+    assert 'OpenVidu' in dir(pyopenvidu)
+    assert set(pyopenvidu.__all__) <= set(dir(pyopenvidu))
+
+    with pytest.raises(AttributeError):
+        pyopenvidu.DoesNotExist
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""Tests for creating IPCAM connections in bulk"""
+
+import asyncio
+import time
+from threading import Lock
+
+import pytest
+import requests
+from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError, OpenViduDeadlineExceededError
+from pyopenvidu.fakeserver import FakeOpenViduServer
+
+SECRET = 'MY_SECRET'
+PROBE_TIMES = {'rtsp://slow': 0.5, 'rtsp://dead': 5.0}
+
+
+@pytest.fixture
+def probes():
+    return {'in_flight': 0, 'max_in_flight': 0, 'lock': Lock()}
+
+
+@pytest.fixture
+def fake_server(probes):
+    def probe_time(rtsp_uri):
+        with probes['lock']:
+            probes['in_flight'] += 1
+            probes['max_in_flight'] = max(probes['max_in_flight'], probes['in_flight'])
+
+        time.sleep(PROBE_TIMES.get(rtsp_uri, 0.05))
+
+        with probes['lock']:
+            probes['in_flight'] -= 1
+
+        return 0.0
+
+    with FakeOpenViduServer(SECRET, ipcam_probe_time=probe_time) as server:
+        yield server
+
+
+@pytest.fixture
+def session(fake_server):
+    openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+    yield openvidu.create_session('cameras')
+    openvidu.close()
+
+
+def test_results_in_completion_order(session):
+    cameras = ['rtsp://slow'] + [f"rtsp://camera-{i}" for i in range(4)]
+
+    results = list(session.create_ipcam_connections(cameras))
+
+    assert all(result.ok for result in results)
+    assert [result.camera for result in results][-1] == 'rtsp://slow'
+    assert sorted(result.connection.rtsp_uri for result in results) == sorted(cameras)
+
+
+def test_connections_are_added(session):
+    results = list(session.create_ipcam_connections(['rtsp://camera-1', 'rtsp://camera-2']))
+
+    assert session.connection_count == 2
+    for result in results:
+        assert session.get_connection(result.connection.id) is result.connection
+
+    session.fetch()
+    assert {c.rtsp_uri for c in session.connections} == {'rtsp://camera-1', 'rtsp://camera-2'}
+
+
+def test_camera_options(session):
+    cameras = [{'rtsp_uri': 'rtsp://camera-1', 'data': 'lobby', 'network_cache': 500}]
+
+    result, = session.create_ipcam_connections(cameras)
+
+    assert result.ok
+    assert result.camera is cameras[0]
+    assert result.connection.server_data == 'lobby'
+    assert result.connection.network_cache == 500
+
+
+def test_timeout_per_camera(session):
+    start = time.monotonic()
+    results = {result.camera: result for result in session.create_ipcam_connections(
+        ['rtsp://dead', 'rtsp://camera-1', 'rtsp://slow'], timeout=1.0
+    )}
+
+    assert time.monotonic() - start < 3.0
+    assert isinstance(results['rtsp://dead'].error, (requests.exceptions.Timeout, OpenViduDeadlineExceededError))
+    assert results['rtsp://dead'].connection is None
+    assert results['rtsp://camera-1'].ok
+    assert results['rtsp://slow'].ok
+    assert session.connection_count == 2
+
+
+def test_max_workers(session, probes):
+    results = list(session.create_ipcam_connections([f"rtsp://camera-{i}" for i in range(12)], max_workers=3))
+
+    assert len(results) == 12
+    assert probes['max_in_flight'] == 3
+
+
+def test_invalid_session_fail_early(session):
+    session.close()
+
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        next(session.create_ipcam_connections(['rtsp://camera-1']))
+
+
+def test_async(session):
+    async def create():
+        return [result async for result in session.acreate_ipcam_connections(
+            ['rtsp://slow', 'rtsp://camera-1', 'rtsp://dead'], timeout=1.0
+        )]
+
+    results = asyncio.run(create())
+
+    assert [result.camera for result in results] == ['rtsp://camera-1', 'rtsp://slow', 'rtsp://dead']
+    assert isinstance(results[-1].error, (requests.exceptions.Timeout, OpenViduDeadlineExceededError))
+    assert session.connection_count == 2
+
+
+def test_interrupts_are_raised(session, monkeypatch):
+    def interrupted(*args):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(session._session, '_send', interrupted)
+
+    with pytest.raises(KeyboardInterrupt):
+        list(session.create_ipcam_connections(['rtsp://camera-1']))
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""Tests for SessionProvisioner"""
+
+import time
+from datetime import datetime, timedelta
+from threading import Lock
+
+import pytest
+import requests
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from pyopenvidu.provisioning import SessionProvisioner, ScheduledSession, plan_creations
+
+SECRET = 'MY_SECRET'
+
+
+@pytest.fixture
+def fake_server():  # Overrides the shared fixture, for the openvidu fixture as well
+    with FakeOpenViduServer(SECRET, latency=0.02) as server:
+        yield server
+
+
+def test_plan_creations_spreads_spikes():
+    start = 1_000_000.0
+    schedule = [ScheduledSession(f"room-{i}", start) for i in range(5)] + [ScheduledSession('late', start + 100)]
+
+    plan = plan_creations(schedule, rate=2.0, min_lead=10.0)
+    times = [planned_at for planned_at, _ in plan]
+
+    assert times == sorted(times)
+    assert plan[-1] == (start + 90, schedule[-1])
+    assert times[:5] == [start - 12.0, start - 11.5, start - 11.0, start - 10.5, start - 10.0]
+
+
+def test_scheduled_session_start_time():
+    naive = ScheduledSession('room', datetime(2020, 1, 1, 12, 0))
+
+    assert naive.start_timestamp == 1577880000.0
+    assert ScheduledSession('room', 1577880000).start_timestamp == 1577880000.0
+
+
+def test_provisions_before_start(fake_server, openvidu):
+    start = datetime.utcnow() + timedelta(seconds=0.5)
+    schedule = [(f"room-{i}", start, 'ROUTED') for i in range(10)]
+
+    in_flight, max_in_flight, lock = 0, 0, Lock()
+    original = openvidu.get_or_create_session
+
+    def counting(*args):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        try:
+            return original(*args)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    openvidu.get_or_create_session = counting
+
+    with SessionProvisioner(openvidu, schedule, rate=100, max_concurrency=2, min_lead=0.1) as provisioner:
+        assert provisioner.join(timeout=5)
+
+        assert provisioner.pending == 0
+        assert not provisioner.errors
+        assert max_in_flight <= 2
+        assert fake_server.request_count == 10
+
+        session = provisioner.get('room-3')
+        assert session.id == 'room-3'
+        assert fake_server.request_count == 10
+
+
+def test_pacing(openvidu):
+    schedule = [(f"room-{i}", time.time()) for i in range(6)]  # Every session is due already
+
+    start = time.monotonic()
+    with SessionProvisioner(openvidu, schedule, rate=20, max_concurrency=6) as provisioner:
+        assert provisioner.join(timeout=5)
+
+    assert time.monotonic() - start >= 5 / 20
+
+
+def test_get_before_planned_time(fake_server, openvidu):
+    schedule = [('room', time.time() + 3600)]
+
+    with SessionProvisioner(openvidu, schedule, min_lead=60) as provisioner:
+        session = provisioner.get('room')
+        assert session.id == 'room'
+
+    assert fake_server.request_count == 1
+
+    with pytest.raises(KeyError):
+        provisioner.get('unknown')
+
+
+def test_failed_creations_are_retried(fake_server, openvidu):
+    fake_server.error_rate = 1.0
+
+    with SessionProvisioner(openvidu, [('room', time.time())]) as provisioner:
+        assert provisioner.join(timeout=5)
+        assert isinstance(provisioner.errors['room'], requests.exceptions.HTTPError)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            provisioner.get('room')
+
+        fake_server.error_rate = 0.0
+        assert provisioner.get('room').id == 'room'
+        assert not provisioner.errors
+
+
+def test_interrupts_are_not_stored_as_errors(openvidu, monkeypatch):
+    def interrupted(*args):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(openvidu, 'get_or_create_session', interrupted)
+    provisioner = SessionProvisioner(openvidu, [('room', time.time() + 3600)])
+
+    with pytest.raises(KeyboardInterrupt):
+        provisioner.get('room')
+
+    assert not provisioner.errors
@@ -7,6 +7,8 @@ import requests.exceptions
 from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError, OpenViduSessionExistsError
 from urllib.parse import urljoin
 from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor
+from pyopenvidu.fakeserver import FakeOpenViduServer
 from .fixtures import URL_BASE, SESSIONS, SECRET
 
 
@@ -155,6 +157,68 @@ def test_create_session_conflict(openvidu_instance, requests_mock):
     assert a.called_once
 
 
+def test_get_or_create_session_cached(openvidu_instance, requests_mock):
+    a = requests_mock.post(urljoin(URL_BASE, 'sessions'), json={}, status_code=409)
+
+    session = openvidu_instance.get_or_create_session('TestSession')
+
+    assert session is openvidu_instance.get_session('TestSession')
+    assert not a.called
+
+
+def test_get_or_create_session_creates(openvidu_instance, requests_mock):
+    new_session = deepcopy(SESSIONS['content'][0])
+    new_session['id'] = 'TestSession3'
+    a = requests_mock.post(urljoin(URL_BASE, 'sessions'), json=new_session)
+
+    session = openvidu_instance.get_or_create_session('TestSession3', media_mode='RELAYED')
+
+    assert session.id == 'TestSession3'
+    assert a.last_request.json() == {'customSessionId': 'TestSession3', 'mediaMode': 'RELAYED'}
+    assert openvidu_instance.get_session('TestSession3') is session
+
+
+def test_get_or_create_session_exists(openvidu_instance, requests_mock):
+    existing_session = deepcopy(SESSIONS['content'][0])
+    existing_session['id'] = 'TestSession3'
+    a = requests_mock.post(urljoin(URL_BASE, 'sessions'), json={}, status_code=409)
+    b = requests_mock.get(urljoin(URL_BASE, 'sessions/TestSession3'), json=existing_session)
+    c = requests_mock.get(urljoin(URL_BASE, 'sessions'), json=SESSIONS)
+
+    session = openvidu_instance.get_or_create_session('TestSession3')
+
+    assert session.id == 'TestSession3'
+    assert a.call_count == 1
+    assert b.call_count == 1
+    assert not c.called
+    assert openvidu_instance.get_session('TestSession3') is session
+
+
+def test_get_or_create_session_closed_meanwhile(openvidu_instance, requests_mock):
+    new_session = deepcopy(SESSIONS['content'][0])
+    new_session['id'] = 'TestSession3'
+    a = requests_mock.post(urljoin(URL_BASE, 'sessions'), [{'json': {}, 'status_code': 409}, {'json': new_session}])
+    b = requests_mock.get(urljoin(URL_BASE, 'sessions/TestSession3'), json={}, status_code=404)
+
+    session = openvidu_instance.get_or_create_session('TestSession3')
+
+    assert session.id == 'TestSession3'
+    assert a.call_count == 2
+    assert b.call_count == 1
+
+
+def test_get_or_create_session_concurrent():
+    with FakeOpenViduServer(SECRET, latency=0.05) as server:
+        openvidu = OpenVidu(server.url, SECRET, initial_fetch=False)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sessions = list(executor.map(lambda _: openvidu.get_or_create_session('Room'), range(8)))
+
+        assert server.request_count == 1
+        assert all(session is sessions[0] for session in sessions)
+        openvidu.close()
+
+
 def test_create_session_bad_parameters(openvidu_instance, requests_mock):
     a = requests_mock.post(urljoin(URL_BASE, 'sessions'), json={}, status_code=400)
 
@@ -556,3 +620,18 @@ def test_set_cert(mocker):
     # default should be None
     openvidu_instance_none = OpenVidu(URL_BASE, SECRET, initial_fetch=False)
     assert openvidu_instance_none._session.cert is None
+
+
+def test_fetching_keeps_unchanged_sessions(openvidu_instance, requests_mock):
+    unchanged = openvidu_instance.get_session('TestSession')
+    changed = openvidu_instance.get_session('TestSession2')
+
+    NEW_SESSIONS = deepcopy(SESSIONS)
+    NEW_SESSIONS['content'][1]['recording'] = False
+    requests_mock.get(urljoin(URL_BASE, 'sessions'), json=NEW_SESSIONS)
+
+    assert openvidu_instance.fetch()
+
+    assert openvidu_instance.get_session('TestSession') is unchanged
+    assert openvidu_instance.get_session('TestSession2') is not changed
+    assert not openvidu_instance.get_session('TestSession2').is_being_recorded
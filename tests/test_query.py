@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""Tests for the connection queries"""
+
+import pytest
+from copy import deepcopy
+from datetime import datetime
+from urllib.parse import urljoin
+from pyopenvidu.query import ConnectionIndex
+from .fixtures import URL_BASE, SESSIONS
+
+
+def test_query_by_attributes(openvidu_instance):
+    assert [c.id for c in openvidu_instance.query_connections(role='PUBLISHER', has_publishers=True)] == \
+           ['vhdxz7abbfirh2lh', 'maxawc4zsuj1rxva']
+    assert [c.session_id for c in openvidu_instance.query_connections(type_='IPCAM')] == ['TestSession2']
+    assert openvidu_instance.query_connections(role='MODERATOR') == []
+    assert len(openvidu_instance.query_connections()) == 4
+
+
+def test_query_by_platform_and_predicate(session_instance):
+    connections = session_instance.query_connections(platform='Chrome 69.0.4183.102 on Linux 64-bit')
+    assert [c.id for c in connections] == ['maxawc4zsuj1rxva', 'unconnectedconnection']
+    assert [c.id for c in session_instance.query_connections(server_data='My Server Data')] == ['vhdxz7abbfirh2lh']
+
+    connections = session_instance.query_connections(predicate=lambda c: c.kurento_options['videoMaxSendBandwidth'] > 1)
+    assert len(connections) == 3
+
+    with pytest.raises(ValueError):
+        session_instance._connection_index.query(tenant='a')
+
+
+def test_query_by_created_at(openvidu_instance):
+    ipcam_created = openvidu_instance.get_session('TestSession2').connections[0].created_at
+    webrtc_created = openvidu_instance.get_session('TestSession').connections[0].created_at
+
+    assert len(openvidu_instance.query_connections(created_after=webrtc_created)) == 3
+    assert [c.type for c in openvidu_instance.query_connections(created_before=ipcam_created)] == ['IPCAM']
+    assert len(openvidu_instance.query_connections(created_after=ipcam_created, created_before=webrtc_created)) == 4
+    assert len(openvidu_instance.query_connections(role='PUBLISHER', created_after=webrtc_created)) == 3
+    assert openvidu_instance.query_connections(created_after=datetime(2100, 1, 1)) == []
+
+
+def test_query_skips_invalid_connections(session_instance, requests_mock):
+    connection = session_instance.get_connection('vhdxz7abbfirh2lh')
+    requests_mock.delete(urljoin(URL_BASE, f'sessions/TestSession/connection/{connection.id}'), status_code=204)
+
+    connection.force_disconnect()
+
+    assert connection not in session_instance.query_connections(role='PUBLISHER')
+
+
+def test_index_follows_connection_fetch(session_instance, requests_mock):
+    connection = session_instance.get_connection('unconnectedconnection')
+    assert session_instance.query_connections(has_publishers=True, server_data='tenant-a') == []
+
+    data = deepcopy(SESSIONS['content'][0]['connections']['content'][2])
+    data['serverData'] = 'tenant-a'
+    data['publishers'] = deepcopy(SESSIONS['content'][0]['connections']['content'][0]['publishers'])
+    requests_mock.get(urljoin(URL_BASE, f'sessions/TestSession/connection/{connection.id}'), json=data)
+
+    assert connection.fetch()
+    assert session_instance.query_connections(has_publishers=True, server_data='tenant-a') == [connection]
+
+
+def test_query_only_looks_at_matching_sessions(openvidu_instance, monkeypatch):
+    queried = []
+    original = ConnectionIndex.query
+
+    def query(self, *args, **filters):
+        queried.append(self._session_id)
+        return original(self, *args, **filters)
+
+    monkeypatch.setattr(ConnectionIndex, 'query', query)
+
+    assert len(openvidu_instance.query_connections(type_='IPCAM')) == 1
+    assert queried == ['TestSession2']
+
+    queried.clear()
+    assert openvidu_instance.query_connections(type_='IPCAM', role='PUBLISHER') == []
+    assert openvidu_instance.query_connections(platform='Nokia 3310') == []
+    assert queried == []
+
+
+def test_session_index_follows_fetch(openvidu_instance, requests_mock):
+    session = openvidu_instance.get_session('TestSession')
+
+    data = deepcopy(SESSIONS['content'][0])
+    data['connections']['content'][2]['platform'] = 'Nokia 3310'
+    requests_mock.get(urljoin(URL_BASE, 'sessions/TestSession'), json=data)
+
+    assert session.fetch()  # Updated in place
+    assert [c.id for c in openvidu_instance.query_connections(platform='Nokia 3310')] == ['unconnectedconnection']
+
+    sessions = deepcopy(SESSIONS)
+    del sessions['content'][0]
+    requests_mock.get(urljoin(URL_BASE, 'sessions'), json=sessions)
+
+    assert openvidu_instance.fetch()
+    assert openvidu_instance.query_connections(platform='Nokia 3310') == []
+    assert len(openvidu_instance._session_index) == 1
+
+    session.fetch()  # The dropped object is no longer indexed
+    assert openvidu_instance.query_connections(platform='Nokia 3310') == []
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""Tests for Reconciler"""
+
+import threading
+
+import pytest
+import requests
+from pyopenvidu import OpenVidu, OpenViduSessionExistsError
+from pyopenvidu.openvidusession import OpenViduSession
+from pyopenvidu.query import ConnectionIndex
+from pyopenvidu.reconciler import Reconciler, DesiredSession, DesiredCamera, CREATE_SESSION, CLOSE_SESSION, \
+    CREATE_IPCAM_CONNECTION, FORCE_DISCONNECT
+
+SECRET = 'MY_SECRET'
+
+
+def counting_requests(openvidu):
+    calls = []
+    original = openvidu._session._send
+
+    def send(method, url, *args):
+        calls.append((method, url))
+        return original(method, url, *args)
+
+    openvidu._session._send = send
+    return calls
+
+
+def cameras_of(openvidu, session_id):
+    return sorted(c.rtsp_uri for c in openvidu.get_session(session_id).connections if c.type == 'IPCAM')
+
+
+def test_desired_session_normalizes_cameras():
+    session = DesiredSession('lobby', cameras=['rtsp://a', {'rtsp_uri': 'rtsp://b', 'data': 'door'}])
+
+    assert session.cameras == (DesiredCamera('rtsp://a'), DesiredCamera('rtsp://b', data='door'))
+
+    with pytest.raises(ValueError):
+        DesiredSession('lobby', cameras=['rtsp://a', 'rtsp://a'])
+
+    with pytest.raises(ValueError):
+        Reconciler(None, [DesiredSession('lobby'), DesiredSession('lobby')])
+
+
+def test_converges_from_empty(openvidu):
+    spec = {
+        'lobby': {'media_mode': 'ROUTED', 'cameras': ['rtsp://a', {'rtsp_uri': 'rtsp://b', 'data': 'door'}]},
+        'empty': None,
+    }
+    reconciler = Reconciler(openvidu, spec)
+
+    report = reconciler.reconcile()
+
+    assert report.ok
+    assert sorted(op.action for op in report.applied) == [CREATE_IPCAM_CONNECTION] * 2 + [CREATE_SESSION] * 2
+    assert {(d.session_id, d.kind) for d in report.plan.drift} == {
+        ('lobby', 'missing_session'), ('lobby', 'missing_camera'), ('empty', 'missing_session')
+    }
+
+    openvidu.fetch()
+    assert cameras_of(openvidu, 'lobby') == ['rtsp://a', 'rtsp://b']
+    assert openvidu.get_session('empty').connection_count == 0
+    assert reconciler.plan().converged
+
+
+def test_only_differences_are_requested(openvidu):
+    for i in range(20):
+        openvidu.create_session(f"room-{i}").create_ipcam_connection('rtsp://camera')
+    openvidu.fetch()
+
+    spec = [DesiredSession(f"room-{i}", cameras=['rtsp://camera']) for i in range(20)]
+    spec[3] = DesiredSession('room-3', cameras=['rtsp://other'])
+    spec.append(DesiredSession('room-new'))
+    calls = counting_requests(openvidu)
+
+    report = Reconciler(openvidu, spec).apply()
+
+    assert report.ok
+    assert [(d.session_id, d.kind) for d in report.plan.drift] == [
+        ('room-3', 'unexpected_camera'), ('room-3', 'missing_camera'), ('room-new', 'missing_session')
+    ]
+    assert len(calls) == 3  # No fetch, one call per difference
+    assert cameras_of(openvidu, 'room-3') == ['rtsp://camera', 'rtsp://other']  # Until fetched
+
+    openvidu.fetch()
+    assert cameras_of(openvidu, 'room-3') == ['rtsp://other']
+
+
+def test_cameras_of_a_session_are_added_on_the_caller_thread(openvidu, monkeypatch):
+    openvidu.create_session('lobby')
+    openvidu.fetch()
+    cameras = [f"rtsp://camera-{i}" for i in range(12)]
+
+    threads = []
+    original = ConnectionIndex.add
+
+    def add(self, connection):
+        threads.append(threading.get_ident())
+        return original(self, connection)
+
+    monkeypatch.setattr(ConnectionIndex, 'add', add)
+
+    report = Reconciler(openvidu, {'lobby': {'cameras': cameras}}, max_workers=4).apply()
+
+    assert report.ok
+    assert threads == [threading.get_ident()] * 12
+    session = openvidu.get_session('lobby')
+    assert sorted(c.rtsp_uri for c in session.query_connections(type_='IPCAM')) == sorted(cameras)
+    assert Reconciler(openvidu, {'lobby': {'cameras': cameras}}).plan().converged
+
+
+def test_camera_options_drift(openvidu):
+    openvidu.create_session('lobby').create_ipcam_connection('rtsp://a', data='old')
+    openvidu.fetch()
+
+    plan = Reconciler(openvidu, [DesiredSession('lobby', cameras=[DesiredCamera('rtsp://a', data='new')])]).plan()
+
+    assert [(d.kind, d.detail) for d in plan.drift] == [('camera_options', 'rtsp://a: data')]
+    assert [op.action for op in plan.operations] == [FORCE_DISCONNECT, CREATE_IPCAM_CONNECTION]
+
+    assert Reconciler(openvidu, {'lobby': {'cameras': ['rtsp://a']}}).plan().converged  # Unset options match
+
+
+def test_webrtc_connections_are_kept(openvidu):
+    session = openvidu.create_session('lobby')
+    session.create_webrtc_connection()
+    session.create_ipcam_connection('rtsp://a')
+    openvidu.fetch()
+
+    report = Reconciler(openvidu, {'lobby': {}}).reconcile()
+
+    assert [op.action for op in report.applied] == [FORCE_DISCONNECT]
+    openvidu.fetch()
+    assert [c.type for c in openvidu.get_session('lobby').connections] == ['WEBRTC']
+
+
+def test_prune(openvidu):
+    openvidu.create_session('keep')
+    openvidu.create_session('stale')
+
+    assert Reconciler(openvidu, {'keep': {}}).reconcile().plan.converged
+
+    report = Reconciler(openvidu, {'keep': {}}, prune=True).reconcile()
+
+    assert [(op.action, op.session_id) for op in report.applied] == [(CLOSE_SESSION, 'stale')]
+    openvidu.fetch()
+    assert [s.id for s in openvidu.sessions] == ['keep']
+
+
+def test_media_mode(openvidu):
+    openvidu.create_session('lobby', media_mode='RELAYED')
+    spec = {'lobby': {'media_mode': 'ROUTED', 'cameras': ['rtsp://a']}}
+
+    report = Reconciler(openvidu, spec).reconcile()
+
+    assert [d.kind for d in report.plan.drift] == ['media_mode', 'missing_camera']
+    assert [op.action for op in report.applied] == [CREATE_IPCAM_CONNECTION]
+
+    report = Reconciler(openvidu, spec, recreate=True).reconcile()
+
+    assert [op.action for op in report.applied] == [CLOSE_SESSION, CREATE_SESSION, CREATE_IPCAM_CONNECTION]
+    openvidu.fetch()
+    assert openvidu.get_session('lobby').media_mode == 'ROUTED'
+    assert cameras_of(openvidu, 'lobby') == ['rtsp://a']
+
+
+def test_recreate_close_failed(fake_server, openvidu, monkeypatch):
+    openvidu.create_session('lobby', media_mode='RELAYED').create_ipcam_connection('rtsp://cam1')
+    spec = {'lobby': {'media_mode': 'ROUTED', 'cameras': ['rtsp://cam1']}}
+
+    def close(self):
+        raise requests.exceptions.HTTPError()
+
+    monkeypatch.setattr(OpenViduSession, 'close', close)
+
+    report = Reconciler(openvidu, spec, recreate=True).reconcile()
+
+    assert report.applied == []
+    assert [op.action for op, _ in report.errors] == [CLOSE_SESSION]
+    assert [op.action for op in report.skipped] == [CREATE_SESSION, CREATE_IPCAM_CONNECTION]
+
+    openvidu.fetch()
+    assert openvidu.get_session('lobby').media_mode == 'RELAYED'
+    assert cameras_of(openvidu, 'lobby') == ['rtsp://cam1']
+
+
+def test_recreate_session_survived(openvidu, monkeypatch):
+    openvidu.create_session('lobby', media_mode='RELAYED')
+    spec = {'lobby': {'media_mode': 'ROUTED', 'cameras': ['rtsp://cam1']}}
+    plan = Reconciler(openvidu, spec, recreate=True).plan(fetch=True)
+
+    monkeypatch.setattr(OpenViduSession, 'close', lambda self: None)  # Reported closed, but it's still there
+
+    report = Reconciler(openvidu, spec, recreate=True).apply(plan)
+
+    assert [op.action for op in report.applied] == [CLOSE_SESSION]
+    assert [(op.action, type(e)) for op, e in report.errors] == [(CREATE_SESSION, OpenViduSessionExistsError)]
+    assert [op.action for op in report.skipped] == [CREATE_IPCAM_CONNECTION]
+
+
+def test_errors_are_reported(fake_server, openvidu, monkeypatch):
+    openvidu.create_session('lobby')
+    openvidu.fetch()
+    OpenVidu(fake_server.url, SECRET).get_session('lobby').close()  # By someone else, the cache is outdated
+
+    original = openvidu.get_or_create_session
+
+    def get_or_create_session(session_id, media_mode=None):
+        if session_id == 'broken':
+            raise ValueError()
+        return original(session_id, media_mode)
+
+    monkeypatch.setattr(openvidu, 'get_or_create_session', get_or_create_session)
+
+    report = Reconciler(openvidu, {'lobby': {'cameras': ['rtsp://a']}, 'broken': {'cameras': ['rtsp://b']}}).apply()
+
+    assert not report.ok
+    assert sorted((op.action, op.session_id) for op, _ in report.errors) == [
+        (CREATE_IPCAM_CONNECTION, 'lobby'), (CREATE_SESSION, 'broken')
+    ]
+    assert [(op.action, op.session_id) for op in report.skipped] == [(CREATE_IPCAM_CONNECTION, 'broken')]
+
+
+def test_already_gone_counts_as_applied(openvidu):
+    openvidu.create_session('lobby').create_ipcam_connection('rtsp://a')
+    openvidu.fetch()
+    plan = Reconciler(openvidu, {'lobby': {}}).plan()
+
+    openvidu.get_session('lobby').connections[0].force_disconnect()  # By someone else, the plan is outdated
+
+    report = Reconciler(openvidu, {'lobby': {}}).apply(plan)
+    assert report.ok
+    assert [op.action for op in report.applied] == [FORCE_DISCONNECT]
+
+
+def test_interrupts_are_raised(openvidu, monkeypatch):
+    def interrupted(*args):
+        raise KeyboardInterrupt()
+
+    monkeypatch.setattr(openvidu, 'get_or_create_session', interrupted)
+
+    with pytest.raises(KeyboardInterrupt):
+        Reconciler(openvidu, {'lobby': {}}).apply()
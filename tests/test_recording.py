@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+
+"""Tests for OpenViduRecording object"""
+
+import io
+import json
+import pytest
+import requests
+from copy import deepcopy
+from pyopenvidu import OpenViduSessionDoesNotExistsError, OpenViduRecordingError, \
+    OpenViduRecordingDoesNotExistsError, OpenViduRecordingStatusError
+from urllib.parse import urljoin
+from .fixtures import URL_BASE, RECORDINGS, RECORDING_CONTENT
+
+
+def ranged_content(request, context):
+    range_header = request.headers.get('Range')
+    if not range_header:
+        return RECORDING_CONTENT
+
+    start, end = range_header[len('bytes='):].split('-')
+    end = int(end) if end else len(RECORDING_CONTENT) - 1
+    context.status_code = 206
+    return RECORDING_CONTENT[int(start):end + 1]
+
+
+#
+# Managing recordings
+#
+
+def test_start_recording(openvidu_instance, requests_mock):
+    a = requests_mock.post(urljoin(URL_BASE, 'recordings/start'), json=RECORDINGS['items'][1])
+
+    recording = openvidu_instance.start_recording('TestSession2', output_mode='INDIVIDUAL')
+
+    assert recording.id == 'TestSession2'
+    assert recording.status == 'started'
+    assert a.last_request.json() == {"session": "TestSession2", "outputMode": "INDIVIDUAL"}
+
+
+def test_start_recording_from_session(session_instance, requests_mock):
+    a = requests_mock.post(urljoin(URL_BASE, 'recordings/start'), json=RECORDINGS['items'][0])
+
+    recording = session_instance.start_recording(name='MyRecording')
+
+    assert recording.session_id == 'TestSession'
+    assert a.last_request.json() == {"session": "TestSession", "name": "MyRecording"}
+
+
+def test_start_recording_errors(openvidu_instance, session_instance, requests_mock):
+    a = requests_mock.post(urljoin(URL_BASE, 'recordings/start'), status_code=409)
+    with pytest.raises(OpenViduRecordingStatusError):
+        openvidu_instance.start_recording('TestSession')
+
+    requests_mock.post(urljoin(URL_BASE, 'recordings/start'), status_code=501)
+    with pytest.raises(OpenViduRecordingError):
+        openvidu_instance.start_recording('TestSession')
+
+    requests_mock.post(urljoin(URL_BASE, 'recordings/start'), status_code=422)
+    with pytest.raises(ValueError):
+        openvidu_instance.start_recording('TestSession')
+
+    with pytest.raises(ValueError):
+        openvidu_instance.start_recording('TestSession', output_mode='asd')
+
+    requests_mock.post(urljoin(URL_BASE, 'recordings/start'), status_code=404)
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        session_instance.start_recording()
+
+    assert a.called_once
+    assert not session_instance.is_valid
+
+
+def test_list_recordings(openvidu_instance, session_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), json=RECORDINGS)
+
+    recordings = openvidu_instance.list_recordings()
+
+    assert [recording.id for recording in recordings] == ['TestSession', 'TestSession2']
+    assert [recording.id for recording in session_instance.list_recordings()] == ['TestSession']
+
+
+def test_stop_recording(openvidu_instance, requests_mock):
+    stopped = deepcopy(RECORDINGS['items'][1])
+    stopped['status'] = 'stopped'
+    a = requests_mock.post(urljoin(URL_BASE, 'recordings/stop/TestSession2'), json=stopped)
+
+    recording = openvidu_instance.stop_recording('TestSession2')
+
+    assert a.called_once
+    assert recording.status == 'stopped'
+
+
+def test_stop_recording_from_session(openvidu_instance, requests_mock):
+    stopped = deepcopy(RECORDINGS['items'][1])
+    stopped['status'] = 'stopped'
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), json=RECORDINGS)
+    a = requests_mock.post(urljoin(URL_BASE, 'recordings/stop/TestSession2'), json=stopped)
+
+    recordings = openvidu_instance.get_session('TestSession2').stop_recording()
+
+    assert a.called_once
+    assert [recording.status for recording in recordings] == ['stopped']
+
+
+def test_stop_recording_errors(recording_instance, requests_mock):
+    requests_mock.post(urljoin(URL_BASE, 'recordings/stop/TestSession'), status_code=406)
+    with pytest.raises(OpenViduRecordingStatusError):
+        recording_instance.stop()
+
+    assert recording_instance.is_valid
+
+    requests_mock.post(urljoin(URL_BASE, 'recordings/stop/TestSession'), status_code=404)
+    with pytest.raises(OpenViduRecordingDoesNotExistsError):
+        recording_instance.stop()
+
+    assert not recording_instance.is_valid
+
+
+def test_get_missing_recording(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings/Nonexistent'), status_code=404)
+
+    with pytest.raises(OpenViduRecordingDoesNotExistsError):
+        openvidu_instance.get_recording('Nonexistent')
+
+
+def test_recording_fetch(recording_instance, requests_mock):
+    assert not recording_instance.fetch()
+
+    changed = deepcopy(RECORDINGS['items'][0])
+    changed['size'] = 1024
+    requests_mock.get(urljoin(URL_BASE, 'recordings/TestSession'), json=changed)
+
+    assert recording_instance.fetch()
+    assert recording_instance.size == 1024
+
+
+def test_delete_recording(openvidu_instance, recording_instance, requests_mock):
+    a = requests_mock.delete(urljoin(URL_BASE, 'recordings/TestSession'), status_code=204)
+
+    recording_instance.delete()
+
+    assert a.called_once
+    assert not recording_instance.is_valid
+
+    with pytest.raises(OpenViduRecordingDoesNotExistsError):
+        recording_instance.delete()
+
+    requests_mock.delete(urljoin(URL_BASE, 'recordings/TestSession2'), status_code=409)
+    with pytest.raises(OpenViduRecordingStatusError):
+        openvidu_instance.delete_recording('TestSession2')
+
+
+#
+# Downloading
+#
+
+def test_download_to_file_object(recording_instance, requests_mock):
+    requests_mock.get(recording_instance.url, content=RECORDING_CONTENT)
+
+    target = io.BytesIO()
+    transferred = recording_instance.download(target, chunk_size=4)
+
+    assert transferred == len(RECORDING_CONTENT)
+    assert target.getvalue() == RECORDING_CONTENT
+
+
+def test_download_resume(recording_instance, requests_mock, tmp_path):
+    a = requests_mock.get(recording_instance.url, content=ranged_content)
+    target = tmp_path / 'recording.mp4'
+    target.write_bytes(RECORDING_CONTENT[:10])
+
+    transferred = recording_instance.download(target)
+
+    assert transferred == 6
+    assert a.last_request.headers['Range'] == 'bytes=10-'
+    assert target.read_bytes() == RECORDING_CONTENT
+
+    # Nothing left to download
+    assert recording_instance.download(target) == 0
+    assert a.call_count == 1
+
+
+def test_download_resume_unsupported(recording_instance, requests_mock, tmp_path):
+    requests_mock.get(recording_instance.url, content=RECORDING_CONTENT)
+    target = tmp_path / 'recording.mp4'
+    target.write_bytes(b'garbage')
+
+    recording_instance.download(target)
+
+    assert target.read_bytes() == RECORDING_CONTENT
+
+
+def test_download_parallel(recording_instance, requests_mock, tmp_path):
+    a = requests_mock.get(recording_instance.url, content=ranged_content)
+    target = tmp_path / 'recording.mp4'
+
+    transferred = recording_instance.download(target, parallel=3)
+
+    assert transferred == len(RECORDING_CONTENT)
+    assert a.call_count == 3
+    assert target.read_bytes() == RECORDING_CONTENT
+
+
+def test_download_parallel_failed_range(recording_instance, requests_mock, tmp_path):
+    def failing_range(request, context):
+        if request.headers['Range'].startswith('bytes=6-'):
+            context.status_code = 500
+            return b''
+        return ranged_content(request, context)
+
+    requests_mock.get(recording_instance.url, content=failing_range)
+    target = tmp_path / 'recording.mp4'
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        recording_instance.download(target, parallel=3)
+
+    assert list(tmp_path.iterdir()) == []  # No full size file left behind to be mistaken for a finished download
+
+    a = requests_mock.get(recording_instance.url, content=ranged_content)
+    assert recording_instance.download(target) == len(RECORDING_CONTENT)
+    assert 'Range' not in a.last_request.headers
+    assert target.read_bytes() == RECORDING_CONTENT
+
+
+def test_download_parallel_missing(recording_instance, requests_mock, tmp_path):
+    requests_mock.get(recording_instance.url, status_code=404)
+
+    with pytest.raises(OpenViduRecordingDoesNotExistsError):
+        recording_instance.download(tmp_path / 'recording.mp4', parallel=3)
+
+
+def test_download_not_ready(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings/TestSession2'), json=RECORDINGS['items'][1])
+    recording = openvidu_instance.get_recording('TestSession2')
+
+    with pytest.raises(OpenViduRecordingStatusError):
+        recording.download(io.BytesIO())
+
+
+#
+# Iterating and indexing
+#
+
+def test_iter_recordings_chunked(openvidu_instance, requests_mock, mocker):
+    mocker.patch('pyopenvidu.openvidurecording.LISTING_CHUNK_SIZE', 7)
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), content=json.dumps(RECORDINGS, indent=2).encode())
+
+    recordings = list(openvidu_instance.iter_recordings())
+
+    assert [recording.id for recording in recordings] == ['TestSession', 'TestSession2']
+    assert recordings[0].duration == 5.7
+
+
+def test_iter_recordings_filtered(openvidu_instance, session_instance, requests_mock):
+    reordered = {"items": RECORDINGS['items'], "count": 2}
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), json=reordered)
+
+    assert [rec.id for rec in openvidu_instance.iter_recordings(status='started')] == ['TestSession2']
+    assert [rec.id for rec in openvidu_instance.iter_recordings(session_id='TestSession')] == ['TestSession']
+    assert [rec.id for rec in session_instance.iter_recordings(status='started')] == []
+
+
+def test_iter_recordings_empty(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), json={"count": 0, "items": []})
+
+    assert list(openvidu_instance.iter_recordings()) == []
+
+
+def test_iter_recordings_truncated(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), content=json.dumps(RECORDINGS).encode()[:-20])
+
+    with pytest.raises(ValueError):
+        list(openvidu_instance.iter_recordings())
+
+
+def test_recording_collection(openvidu_instance, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'recordings'), json=RECORDINGS)
+
+    assert len(openvidu_instance.recordings) == 0
+
+    collection = openvidu_instance.fetch_recordings()
+
+    assert collection is openvidu_instance.recordings
+    assert len(collection) == 2
+    assert 'TestSession' in collection
+    assert collection.get('TestSession2').status == 'started'
+    assert [rec.id for rec in collection.by_session('TestSession')] == ['TestSession']
+    assert [rec.id for rec in collection.by_status('ready')] == ['TestSession']
+    assert collection.by_status('failed') == []
+
+    first_created = collection.get('TestSession').created_at
+    assert [rec.id for rec in collection.created_between(start=first_created)] == ['TestSession', 'TestSession2']
+    assert [rec.id for rec in collection.created_between(end=first_created)] == ['TestSession']
+    assert [rec.id for rec in collection.filter(status='started', created_after=first_created)] == ['TestSession2']
+    assert collection.filter(session_id='TestSession', status='started') == []
+
+    with pytest.raises(OpenViduRecordingDoesNotExistsError):
+        collection.get('Nonexistent')
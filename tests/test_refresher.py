@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""Tests for AutoRefresher objects"""
+
+import time
+import asyncio
+import pytest
+from pyopenvidu import OpenVidu
+from pyopenvidu.refresher import AutoRefresher, AsyncAutoRefresher
+from .fixtures import wait_for
+
+SECRET = 'MY_SECRET'
+UNREACHABLE_URL = 'http://127.0.0.1:9/openvidu/api/'
+
+
+def test_adaptive_interval():
+    openvidu = OpenVidu(UNREACHABLE_URL, SECRET, initial_fetch=False)
+    refresher = AutoRefresher(openvidu, min_interval=1, max_interval=5, backoff=2)
+
+    refresher._update_interval(False)
+    assert refresher.interval == 2
+    refresher._update_interval(False)
+    refresher._update_interval(False)
+    assert refresher.interval == 5
+
+    refresher._update_interval(True)
+    assert refresher.interval == 1
+
+
+def test_max_staleness():
+    openvidu = OpenVidu(UNREACHABLE_URL, SECRET, initial_fetch=False)
+    refresher = AutoRefresher(openvidu, min_interval=1, max_interval=30, max_staleness=6)
+    refresher._fetch_duration = 2
+
+    for _ in range(5):
+        refresher._update_interval(False)
+
+    assert refresher.interval == 4
+
+    with pytest.raises(ValueError):
+        AutoRefresher(openvidu, min_interval=2, max_staleness=1)
+
+
+def test_refresher_thread(fake_server):
+    openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+    assert openvidu.staleness is None
+
+    with AutoRefresher(openvidu, min_interval=0.02, max_interval=0.05) as refresher:
+        wait_for(lambda: openvidu.staleness is not None)
+
+        OpenVidu(fake_server.url, SECRET, initial_fetch=False).create_session('TestSession')
+        wait_for(lambda: openvidu.session_count == 1)
+
+        assert openvidu.staleness < 0.5
+        assert refresher.last_error is None
+
+    requests = fake_server.request_count
+    time.sleep(0.1)
+    assert fake_server.request_count == requests
+
+
+def test_refresher_backs_off_on_errors():
+    openvidu = OpenVidu(UNREACHABLE_URL, SECRET, initial_fetch=False)
+
+    with AutoRefresher(openvidu, min_interval=0.01, max_interval=0.04) as refresher:
+        wait_for(lambda: refresher.interval == 0.04)
+        assert refresher.last_error is not None
+
+    assert openvidu.staleness is None
+
+
+def test_async_refresher(fake_server):
+    openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+
+    async def run():
+        async with AsyncAutoRefresher(openvidu, min_interval=0.02, max_interval=0.05):
+            openvidu.create_session('TestSession')
+            for _ in range(100):
+                if openvidu.session_count == 1 and openvidu.staleness is not None:
+                    break
+                await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+
+    assert openvidu.session_count == 1
+    assert openvidu.staleness is not None
+
+
+def test_async_refresher_sync_context_manager(fake_server):
+    openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+
+    async def run():
+        refresher = AsyncAutoRefresher(openvidu)
+        with pytest.raises(TypeError):
+            with refresher:
+                pass
+
+        assert refresher._task is None
+
+    asyncio.run(run())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+"""Tests for recording and replaying the REST traffic"""
+
+import time
+import pytest
+import requests
+from pyopenvidu import OpenVidu, OpenViduReplayError, OpenViduSessionExistsError
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from pyopenvidu.replay import TrafficRecorder, ReplayTransport, RecordedExchange, read_recording
+
+SECRET = 'MY_SECRET'
+URL = 'http://replay.openvidu.io/openvidu/api/'
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = tmp_path / 'traffic.jsonl.gz'
+
+    with FakeOpenViduServer(SECRET, latency=0.05) as server:
+        openvidu = OpenVidu(server.url, SECRET, initial_fetch=False)
+
+        with TrafficRecorder(openvidu, path) as recorder:
+            session = openvidu.create_session('TestSession')
+            session.create_webrtc_connection()
+            openvidu.fetch()
+
+            with pytest.raises(OpenViduSessionExistsError):
+                openvidu.create_session('TestSession')
+
+            openvidu.get_session('TestSession').fetch()
+
+        assert recorder.count == 5
+        openvidu.close()
+
+    return path
+
+
+def replayed_openvidu(recording, speed=None) -> OpenVidu:
+    return OpenVidu(URL, SECRET, initial_fetch=False, transport=ReplayTransport.from_recording(recording, speed))
+
+
+def test_recording_file(recording):
+    exchanges = list(read_recording(recording))
+
+    assert [(e.method, e.url, e.status_code) for e in exchanges] == [
+        ('POST', 'sessions', 200),
+        ('POST', 'sessions/TestSession/connection', 200),
+        ('GET', 'sessions', 200),
+        ('POST', 'sessions', 409),
+        ('GET', 'sessions/TestSession', 200),
+    ]
+    assert exchanges[0].json == {'customSessionId': 'TestSession'}
+    assert all(e.duration >= 0.05 for e in exchanges)
+    assert exchanges[0].offset < exchanges[1].offset < exchanges[2].offset
+
+
+def test_recorder_restores_transport(recording, tmp_path):
+    openvidu = OpenVidu(URL, SECRET, initial_fetch=False, transport=ReplayTransport.from_recording(recording))
+    recorder = TrafficRecorder(openvidu, tmp_path / 'other.jsonl.gz')
+    recorder.close()
+
+    assert '_send' not in vars(openvidu._session)
+
+
+def test_nested_recorders(recording, tmp_path):
+    openvidu = replayed_openvidu(recording)
+
+    with TrafficRecorder(openvidu, tmp_path / 'outer.jsonl.gz') as outer:
+        openvidu.create_session('TestSession')
+
+        with TrafficRecorder(openvidu, tmp_path / 'inner.jsonl.gz') as inner:
+            openvidu.get_session('TestSession').create_webrtc_connection()
+
+        openvidu.fetch()  # Recorded by the outer one only
+
+    assert (outer.count, inner.count) == (3, 1)
+    assert [e.url for e in read_recording(tmp_path / 'inner.jsonl.gz')] == ['sessions/TestSession/connection']
+    assert '_send' not in vars(openvidu._session)
+
+
+def test_replay(recording):
+    openvidu = replayed_openvidu(recording)
+
+    session = openvidu.create_session('TestSession')
+    connection = session.create_webrtc_connection()
+    assert connection.token
+
+    assert openvidu.fetch()
+    assert openvidu.get_session('TestSession').connection_count == 1
+    assert openvidu._session.remaining == 2
+
+
+def test_replay_latency(recording):
+    start = time.monotonic()
+    replayed_openvidu(recording, speed=1.0).create_session('TestSession')
+    original = time.monotonic() - start
+
+    start = time.monotonic()
+    replayed_openvidu(recording, speed=10.0).create_session('TestSession')
+    compressed = time.monotonic() - start
+
+    assert original >= 0.05
+    assert compressed < original
+
+
+def test_replay_falls_back_to_url(recording):
+    openvidu = replayed_openvidu(recording)
+
+    # The body differs from the recorded one, the next response of the url is served
+    session = openvidu.create_session('OtherSession')
+    assert session.id == 'TestSession'
+
+
+def test_replay_exhausted(recording):
+    openvidu = replayed_openvidu(recording)
+    openvidu.fetch()
+
+    with pytest.raises(OpenViduReplayError):
+        openvidu.fetch()
+
+
+def test_replay_errors_and_timeouts():
+    exchanges = [
+        RecordedExchange(0.0, 0.0, 'GET', 'sessions', None, None, error='ConnectTimeout'),
+        RecordedExchange(0.1, 0.5, 'GET', 'sessions', None, None, 200, {}, b'{"numberOfElements": 0, "content": []}'),
+    ]
+    openvidu = OpenVidu(URL, SECRET, initial_fetch=False, timeout=0.05,
+                        transport=ReplayTransport.from_recording(exchanges))
+
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        openvidu.fetch()
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        openvidu.fetch()
+
+
+def test_binary_body_roundtrip():
+    exchange = RecordedExchange(0.0, 0.1, 'GET', 'recordings/a/a.mp4', None, None, 200, {}, b'\xff\x00\xfe')
+
+    assert RecordedExchange.from_json(exchange.to_json()) == exchange
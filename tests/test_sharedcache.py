@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+"""Tests for SharedSessionCache object"""
+
+import time
+from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError
+from pyopenvidu.sharedcache import SharedSessionCache
+from .fixtures import wait_for
+
+SECRET = 'MY_SECRET'
+UNREACHABLE_URL = 'http://127.0.0.1:9/openvidu/api/'
+
+
+def session_exists(openvidu: OpenVidu, session_id: str) -> bool:
+    try:
+        openvidu.get_session(session_id)
+        return True
+    except OpenViduSessionDoesNotExistsError:
+        return False
+
+
+def test_shared_cache(fake_server, tmp_path):
+    path = tmp_path / 'sessions.snapshot'
+    leader_openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+    follower_openvidu = OpenVidu(UNREACHABLE_URL, SECRET, initial_fetch=False)  # Must not make any requests
+
+    leader_openvidu.create_session('TestSession')
+
+    with SharedSessionCache(leader_openvidu, path, interval=0.05) as leader:
+        wait_for(lambda: path.exists())
+
+        with SharedSessionCache(follower_openvidu, path, interval=0.05) as follower:
+            time.sleep(0.1)
+            assert leader.is_leader
+            assert not follower.is_leader
+
+            assert follower_openvidu.get_session('TestSession').id == 'TestSession'
+
+            leader_openvidu.create_session('TestSession2')
+            wait_for(lambda: session_exists(follower_openvidu, 'TestSession2'))
+            assert follower_openvidu.session_count == 2
+
+            # Fetching only checks the snapshot
+            assert not follower_openvidu.fetch()
+
+            # The follower takes over, when the leader is gone
+            leader.stop()
+            wait_for(lambda: follower.is_leader)
+            follower_openvidu._session.base_url = fake_server.url  # Make it reachable for the new leader
+
+            leader_openvidu.get_session('TestSession').close()
+            wait_for(lambda: not session_exists(follower_openvidu, 'TestSession'))
+
+
+def test_shared_cache_explicit_roles(fake_server, tmp_path):
+    path = tmp_path / 'sessions.snapshot'
+    leader_openvidu = OpenVidu(fake_server.url, SECRET, initial_fetch=False)
+    follower_openvidu = OpenVidu(UNREACHABLE_URL, SECRET, initial_fetch=False)
+
+    with SharedSessionCache(leader_openvidu, path, interval=0.05, leader=True), \
+            SharedSessionCache(follower_openvidu, path, interval=0.05, leader=False) as follower:
+        leader_openvidu.create_session('TestSession')
+        wait_for(lambda: session_exists(follower_openvidu, 'TestSession'))
+
+        assert not follower.is_leader
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""Tests for snapshot saving and loading"""
+
+import pytest
+from copy import deepcopy
+from urllib.parse import urljoin
+from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError
+from pyopenvidu.snapshot import SessionSnapshot, write_snapshot
+from .fixtures import URL_BASE, SECRET, SESSIONS
+
+
+@pytest.fixture
+def snapshot_path(openvidu_instance, tmp_path):
+    path = tmp_path / 'sessions.snapshot'
+    openvidu_instance.save_snapshot(path)
+    yield path
+
+
+def test_snapshot_file(tmp_path):
+    path = tmp_path / 'sessions.snapshot'
+    write_snapshot(path, SESSIONS['content'])
+
+    snapshot = SessionSnapshot(path)
+
+    assert snapshot.session_ids == ['TestSession', 'TestSession2']
+    assert len(snapshot) == 2
+    assert 'TestSession' in snapshot
+    assert snapshot.read('TestSession2') == SESSIONS['content'][1]
+
+    snapshot.close()
+
+
+def test_snapshot_invalid_file(tmp_path):
+    path = tmp_path / 'sessions.snapshot'
+
+    path.write_bytes(b'NOTASNAPSHOTFILE')
+    with pytest.raises(ValueError):
+        SessionSnapshot(path)
+
+    write_snapshot(path, SESSIONS['content'])
+    path.write_bytes(path.read_bytes()[:20])
+    with pytest.raises(ValueError):
+        SessionSnapshot(path)
+
+
+def test_load_snapshot_lazy(snapshot_path, requests_mock):
+    a = requests_mock.get(urljoin(URL_BASE, 'sessions'), json=SESSIONS)
+    openvidu = OpenVidu(URL_BASE, SECRET, initial_fetch=False)
+
+    assert openvidu.load_snapshot(snapshot_path, reconcile=False) is None
+
+    assert openvidu._openvidu_sessions == {}
+    session = openvidu.get_session('TestSession2')
+    assert session.get_connection('ipc_IPCAM_rtsp_A8MJ_91_191_213_49_554_live_mpeg4_sdp').network_cache == 2000
+    assert list(openvidu._openvidu_sessions) == ['TestSession2']
+
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        openvidu.get_session('Nonexistent')
+
+    assert openvidu.session_count == 2
+    assert not a.called
+
+
+def test_load_snapshot_reconcile(snapshot_path, requests_mock):
+    NEW_SESSIONS = deepcopy(SESSIONS)
+    NEW_SESSIONS['content'][1]['recording'] = False
+    NEW_SESSIONS['content'][0]['recording'] = False  # This is the same as before
+    a = requests_mock.get(urljoin(URL_BASE, 'sessions'), json=NEW_SESSIONS)
+
+    openvidu = OpenVidu(URL_BASE, SECRET, initial_fetch=False)
+    openvidu.load_snapshot(snapshot_path, reconcile=False)
+    unchanged = openvidu.get_session('TestSession')
+
+    openvidu.load_snapshot(snapshot_path).join()
+
+    assert a.called_once
+    assert not openvidu.get_session('TestSession2').is_being_recorded
+    assert not openvidu.fetch()
+
+    # A new snapshot was loaded since, so the old objects are not kept
+    assert openvidu.get_session('TestSession') is not unchanged
+
+
+def test_load_snapshot_unchanged(snapshot_path, requests_mock):
+    requests_mock.get(urljoin(URL_BASE, 'sessions'), json=SESSIONS)
+    openvidu = OpenVidu(URL_BASE, SECRET, initial_fetch=False)
+    openvidu.load_snapshot(snapshot_path, reconcile=False)
+
+    session = openvidu.get_session('TestSession')
+
+    assert not openvidu.fetch()
+    assert openvidu.get_session('TestSession') is session
+
+
+def test_save_snapshot_skips_closed(openvidu_instance, requests_mock, tmp_path):
+    requests_mock.delete(urljoin(URL_BASE, 'sessions/TestSession'), status_code=204)
+    openvidu_instance.get_session('TestSession').close()
+
+    path = tmp_path / 'sessions.snapshot'
+    openvidu_instance.save_snapshot(path)
+
+    snapshot = SessionSnapshot(path)
+    assert snapshot.session_ids == ['TestSession2']
+    snapshot.close()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+
+"""Tests for the transports"""
+
+import asyncio
+import shutil
+import socket
+import ssl
+import subprocess
+from urllib.parse import quote
+import pytest
+import requests
+import urllib3
+from pyopenvidu import OpenVidu, OpenViduSessionDoesNotExistsError
+from pyopenvidu.fakeserver import FakeOpenViduServer
+from pyopenvidu.transport import Transport, RequestsTransport, TransportResponse, Urllib3Transport
+
+SECRET = 'MY_SECRET'
+UNREACHABLE_URL = 'http://127.0.0.1:9/openvidu/api/'
+TRANSPORT_NAMES = ['requests', 'urllib3', 'async', 'http2']
+
+
+@pytest.fixture
+def fake_server():
+    with FakeOpenViduServer(SECRET) as server:
+        yield server
+
+
+def create_openvidu(url: str, transport: str, **kwargs) -> OpenVidu:
+    if transport in ('async', 'http2'):
+        pytest.importorskip('httpx')
+
+    if transport == 'http2':
+        pytest.importorskip('h2')
+
+    return OpenVidu(url, SECRET, initial_fetch=False, transport=transport, **kwargs)
+
+
+@pytest.mark.parametrize('transport', TRANSPORT_NAMES)
+def test_session_lifecycle(fake_server, transport):
+    openvidu = create_openvidu(fake_server.url, transport)
+
+    session = openvidu.create_session('TestSession')
+    connection = session.create_webrtc_connection(role='MODERATOR')
+    assert connection.token
+
+    assert openvidu.fetch()
+    assert openvidu.get_session('TestSession').connection_count == 1
+    assert openvidu.get_config()['VERSION']
+
+    session.close()
+    with pytest.raises(OpenViduSessionDoesNotExistsError):
+        openvidu.get_session('TestSession').fetch()
+
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', TRANSPORT_NAMES)
+def test_errors_are_translated(transport):
+    openvidu = create_openvidu(UNREACHABLE_URL, transport)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        openvidu.fetch()
+
+    with FakeOpenViduServer(SECRET, latency=0.3) as server:
+        openvidu = create_openvidu(server.url, transport, timeout=0.05)
+
+        with pytest.raises(requests.exceptions.Timeout):
+            openvidu.fetch()
+
+    with FakeOpenViduServer('OTHER_SECRET') as server:
+        openvidu = create_openvidu(server.url, transport)
+
+        with pytest.raises(requests.exceptions.HTTPError) as e:
+            openvidu.fetch()
+
+        assert e.value.response.status_code == 401
+
+
+def test_custom_transport_class(fake_server):
+    class CountingTransport(RequestsTransport):
+        calls = 0
+
+        def _send(self, *args):
+            CountingTransport.calls += 1
+            return super()._send(*args)
+
+    openvidu = create_openvidu(fake_server.url, CountingTransport)
+    openvidu.fetch()
+
+    assert CountingTransport.calls == 1
+    assert isinstance(openvidu._session, Transport)
+
+
+def test_async_transport_arequest(fake_server):
+    pytest.importorskip('httpx')
+    openvidu = create_openvidu(fake_server.url, 'async')
+
+    async def run():
+        return await asyncio.gather(*(openvidu._session.arequest('GET', 'sessions') for _ in range(5)))
+
+    responses = asyncio.run(run())
+    openvidu.close()
+
+    assert [r.json()['numberOfElements'] for r in responses] == [0] * 5
+
+
+def test_transport_response():
+    released = []
+    chunks = [b'{"a": ', b'1}']
+    r = TransportResponse('http://localhost/', 200, {'Content-Type': 'application/json; charset=utf-8'},
+                          stream=lambda size: iter(chunks), release=lambda: released.append(True))
+
+    assert r.ok
+    assert r.encoding == 'utf-8'
+    assert r.json() == {'a': 1}
+    assert released == [True]
+    assert list(r.iter_content(4)) == [b'{"a"', b': 1}']
+
+    r = TransportResponse('http://localhost/', 404, {}, content=b'')
+    assert not r.ok
+    with pytest.raises(requests.exceptions.HTTPError):
+        r.raise_for_status()
+
+
+def test_urllib3_transport_options():
+    transport = Urllib3Transport('https://localhost/', ('OPENVIDUAPP', SECRET), verify=False, pool_size=3)
+
+    assert transport.pool.connection_pool_kw['ssl_context'].verify_mode == ssl.CERT_NONE
+    assert transport.pool.connection_pool_kw['maxsize'] == 3
+    assert transport._base_headers['authorization'].startswith('Basic ')
+
+
+def test_http2_transport_negotiates_http2(fake_server):
+    openvidu = create_openvidu(fake_server.url, 'http2')
+
+    # HTTP/2 is offered during the TLS handshake, the plain http fake server is reached through HTTP/1.1
+    assert openvidu._session.client._transport._pool._http2
+    openvidu.create_session('TestSession')
+    openvidu.fetch()
+    assert openvidu.session_count == 1
+
+    openvidu.close()
+
+
+@pytest.fixture
+def tls_fake_server(tmp_path, monkeypatch):
+    if shutil.which('openssl') is None:
+        pytest.skip('openssl is required to create a certificate')
+
+    cert, key = str(tmp_path / 'cert.pem'), str(tmp_path / 'key.pem')
+    subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+                    '-days', '1', '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1'],
+                   check=True, capture_output=True)
+
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+
+    # requests prefers these to the verify argument
+    monkeypatch.delenv('REQUESTS_CA_BUNDLE', raising=False)
+    monkeypatch.delenv('CURL_CA_BUNDLE', raising=False)
+
+    with FakeOpenViduServer(SECRET, ssl_context=context) as server:
+        yield server, cert
+
+
+def ssl_context_of(openvidu: OpenVidu) -> ssl.SSLContext:
+    transport = openvidu._session
+    if isinstance(transport, RequestsTransport):
+        return transport.session.get_adapter(transport.base_url)._ssl_context
+
+    return transport.pool.connection_pool_kw['ssl_context']
+
+
+def pool_manager_of(openvidu: OpenVidu) -> urllib3.PoolManager:
+    transport = openvidu._session
+    if isinstance(transport, RequestsTransport):
+        return transport.session.get_adapter(transport.base_url).poolmanager
+
+    return transport.pool
+
+
+def connection_pool(openvidu: OpenVidu) -> urllib3.HTTPConnectionPool:
+    pool_manager = pool_manager_of(openvidu)
+    return pool_manager.pools[next(iter(pool_manager.pools.keys()))]  # Every request goes to the same server
+
+
+@pytest.mark.parametrize('transport', TRANSPORT_NAMES)
+def test_warm_up_opens_connections(fake_server, transport):
+    openvidu = create_openvidu(fake_server.url, transport, warm_up=3)
+
+    assert fake_server.request_count == 3
+    openvidu.fetch()
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', ['requests', 'urllib3'])
+def test_warm_up_fills_pool(fake_server, transport):
+    openvidu = create_openvidu(fake_server.url, transport, warm_up=3, pool_size=3)
+
+    pool = connection_pool(openvidu)
+
+    assert pool.pool.qsize() == 3
+    assert sum(connection is not None and connection.sock is not None for connection in pool.pool.queue) == 3
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', ['requests', 'urllib3'])
+def test_keep_alive_closes_idle_connections(fake_server, transport):
+    openvidu = create_openvidu(fake_server.url, transport, keep_alive=0.0)
+    openvidu.fetch()
+
+    pool = connection_pool(openvidu)
+
+    connection = pool._get_conn()
+    assert connection.sock is None  # Closed for being idle, reconnected on the next request
+    pool._put_conn(connection)
+
+    openvidu.fetch()
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', ['requests', 'urllib3'])
+def test_tls_session_reuse(tls_fake_server, transport):
+    server, cert = tls_fake_server
+    openvidu = create_openvidu(server.url, transport, verify=cert)
+    openvidu.fetch()
+
+    pool_manager_of(openvidu).clear()
+    openvidu.fetch()
+
+    connections = list(ssl_context_of(openvidu)._connections['127.0.0.1'])
+    assert any(connection.session_reused for connection in connections if not connection._closed)
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', ['requests', 'urllib3'])
+def test_tls_session_reuse_disabled(tls_fake_server, transport):
+    server, cert = tls_fake_server
+    openvidu = create_openvidu(server.url, transport, verify=cert, tls_session_reuse=False)
+
+    openvidu.fetch()
+    pool_manager_of(openvidu).clear()
+    openvidu.fetch()
+
+    if transport == 'requests':
+        assert openvidu._session.session.get_adapter(server.url)._ssl_context is None
+    else:
+        assert type(ssl_context_of(openvidu)) is ssl.SSLContext
+    openvidu.close()
+
+
+@pytest.mark.parametrize('tls_session_reuse', [True, False])
+@pytest.mark.parametrize('transport', ['requests', 'urllib3'])
+def test_tls_default_verify(tls_fake_server, transport, tls_session_reuse):
+    server, cert = tls_fake_server
+    openvidu = create_openvidu(server.url, transport, tls_session_reuse=tls_session_reuse)
+
+    # Verified against certifi, which doesn't trust the test certificate
+    with pytest.raises(requests.exceptions.ConnectionError, match='CERTIFICATE_VERIFY_FAILED'):
+        openvidu.fetch()
+    openvidu.close()
+
+
+@pytest.mark.parametrize('tls_session_reuse', [True, False])
+@pytest.mark.parametrize('transport', ['requests', 'urllib3'])
+def test_tls_verify_disabled(tls_fake_server, transport, tls_session_reuse):
+    server, cert = tls_fake_server
+    openvidu = create_openvidu(server.url, transport, verify=False, tls_session_reuse=tls_session_reuse)
+
+    openvidu.fetch()
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', ['async', 'http2'])
+def test_tls_async_transports(tls_fake_server, transport):
+    server, cert = tls_fake_server
+    openvidu = create_openvidu(server.url, transport, verify=cert, warm_up=2)
+
+    openvidu.create_session('TestSession')
+    openvidu.fetch()
+    assert openvidu.session_count == 1
+    openvidu.close()
+
+
+@pytest.fixture
+def unix_fake_server(tmp_path):
+    if not hasattr(socket, 'AF_UNIX'):
+        pytest.skip('Unix domain sockets are not supported')
+
+    with FakeOpenViduServer(SECRET, unix_socket=str(tmp_path / 'openvidu.sock')) as server:
+        yield server
+
+
+@pytest.mark.parametrize('transport', TRANSPORT_NAMES)
+def test_unix_socket_url(unix_fake_server, transport):
+    openvidu = create_openvidu(unix_fake_server.url, transport)
+
+    session = openvidu.create_session('TestSession')
+    connection = session.create_webrtc_connection()
+    connection.fetch()
+    openvidu.fetch()
+
+    assert openvidu.session_count == 1
+    assert unix_fake_server.request_count == 4
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', TRANSPORT_NAMES)
+def test_unix_socket_option(unix_fake_server, transport):
+    openvidu = create_openvidu('http://openvidu.example.com/openvidu/api/', transport,
+                               unix_socket=unix_fake_server._unix_socket)
+
+    openvidu.create_session('TestSession')
+    assert openvidu.get_config()['VERSION']
+    openvidu.close()
+
+
+@pytest.mark.parametrize('transport', TRANSPORT_NAMES)
+def test_unix_socket_missing(tmp_path, transport):
+    openvidu = create_openvidu(f"unix://{quote(str(tmp_path / 'missing.sock'), safe='')}/openvidu/api/", transport)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        openvidu.fetch()
+    openvidu.close()